@@ -0,0 +1,66 @@
+# File: bench_build.py
+# Author: Ryoichi Ando (ryoichi.ando@zozo.com)
+# License: Apache v2.0
+
+# Time Scene.build on four square sheets of increasing resolution.
+# Run from the repository root, e.g. "python benchmarks/bench_build.py 300 500",
+# and check out an earlier revision to get the numbers to compare against.
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from frontend._asset_ import AssetManager  # noqa: E402
+from frontend._plot_ import PlotManager  # noqa: E402
+from frontend._scene_ import Scene  # noqa: E402
+
+
+def make_scene(res: int, count: int) -> Scene:
+    xs = np.linspace(0, 1, res)
+    x, y = np.meshgrid(xs, xs)
+    vert = np.stack([x.ravel(), y.ravel(), np.zeros(res * res)], axis=1)
+    idx = np.arange(res * res).reshape(res, res)
+    a, b = idx[:-1, :-1].ravel(), idx[1:, :-1].ravel()
+    c, d = idx[:-1, 1:].ravel(), idx[1:, 1:].ravel()
+    tri = np.concatenate([np.stack([a, b, c], 1), np.stack([b, d, c], 1)])
+    asset = AssetManager()
+    asset.add.tri("sheet", vert, tri)
+    scene = Scene("bench", PlotManager(), asset, lambda: None)
+    for i in range(count):
+        scene.add("sheet").at(i, 0, 0)
+    return scene
+
+
+def main():
+    parser = argparse.ArgumentParser(description="time Scene.build")
+    parser.add_argument("res", type=int, nargs="*", default=[100, 300, 500])
+    parser.add_argument("--count", type=int, default=4, help="sheets per scene")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    # The first build compiles the numba kernels, so keep it out of the timings
+    with contextlib.redirect_stderr(io.StringIO()):
+        make_scene(4, 1).build()
+
+    print(f"{'verts':>10} {'best':>9} {'median':>9}")
+    for res in args.res:
+        timing = []
+        for _ in range(args.repeat):
+            scene = make_scene(res, args.count)
+            with contextlib.redirect_stderr(io.StringIO()):
+                start = time.perf_counter()
+                scene.build()
+                timing.append(time.perf_counter() - start)
+        n_vert = args.count * res * res
+        print(f"{n_vert:>10,d} {min(timing):8.3f}s {np.median(timing):8.3f}s")
+
+
+if __name__ == "__main__":
+    main()
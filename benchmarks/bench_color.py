@@ -0,0 +1,70 @@
+# File: bench_color.py
+# Author: Ryoichi Ando (ryoichi.ando@zozo.com)
+# License: Apache v2.0
+
+# Time FixedScene.color on a sheet with dynamic area coloring.
+# Run from the repository root, e.g. "python benchmarks/bench_color.py 708",
+# which gives one million faces. NUMBA_NUM_THREADS sets the thread count.
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from frontend._asset_ import AssetManager  # noqa: E402
+from frontend._plot_ import PlotManager  # noqa: E402
+from frontend._scene_ import Scene  # noqa: E402
+
+
+def make_scene(res: int) -> Scene:
+    xs = np.linspace(0, 1, res)
+    x, y = np.meshgrid(xs, xs)
+    vert = np.stack([x.ravel(), y.ravel(), np.zeros(res * res)], axis=1)
+    idx = np.arange(res * res).reshape(res, res)
+    a, b = idx[:-1, :-1].ravel(), idx[1:, :-1].ravel()
+    c, d = idx[:-1, 1:].ravel(), idx[1:, 1:].ravel()
+    tri = np.concatenate([np.stack([a, b, c], 1), np.stack([b, d, c], 1)])
+    asset = AssetManager()
+    asset.add.tri("sheet", vert, tri)
+    scene = Scene("bench", PlotManager(), asset, lambda: None)
+    scene.add("sheet").dyn_color("area")
+    return scene
+
+
+def main():
+    parser = argparse.ArgumentParser(description="time FixedScene.color")
+    parser.add_argument("res", type=int, nargs="*", default=[300, 708])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--target", type=float, default=30.0, help="target rate in Hz")
+    args = parser.parse_args()
+
+    import numba
+
+    print(f"numba threads: {numba.get_num_threads()}")
+    print(f"{'faces':>10} {'median':>9} {'rate':>8}  target {args.target:g} Hz")
+    rng = np.random.default_rng(0)
+    for res in args.res:
+        with contextlib.redirect_stderr(io.StringIO()):
+            fixed = make_scene(res).build()
+        vert = fixed.vertex()
+        vert = vert * (1.0 + 0.3 * rng.random((len(vert), 1)))
+        fixed.color(vert)
+        timing = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            fixed.color(vert)
+            timing.append(time.perf_counter() - start)
+        median = float(np.median(timing))
+        rate = 1.0 / median
+        status = "met" if rate >= args.target else "missed"
+        print(f"{len(fixed._tri):>10,d} {1000 * median:7.1f}ms {rate:6.1f}Hz  {status}")
+
+
+if __name__ == "__main__":
+    main()
@@ -17,6 +17,7 @@ __all__ = [
     "SceneInfo",
     "ObjectAdder",
     "FixedScene",
+    "Precision",
     "Object",
     "InvisibleAdder",
     "Wall",
@@ -35,6 +36,15 @@ __all__ = [
     "SessionExport",
     "SessionOutput",
     "SessionGet",
+    "Scheduler",
+    "Job",
+    "Sweep",
+    "ProgressChannel",
+    "Checkpoint",
+    "DeltaDecoder",
+    "FrameIndex",
+    "FrameStore",
+    "Trajectory",
     "CppRustDocStringParser",
     "Param",
     "Utils",
@@ -48,6 +58,7 @@ from ._scene_ import (
     SceneInfo,
     ObjectAdder,
     FixedScene,
+    Precision,
     Object,
     InvisibleAdder,
     Wall,
@@ -65,5 +76,8 @@ from ._session_ import (
     SessionGet,
     Param,
 )
+from ._scheduler_ import Scheduler, Job, Sweep
+from ._progress_ import ProgressChannel
+from ._frame_ import Checkpoint, DeltaDecoder, FrameIndex, FrameStore, Trajectory
 from ._parse_ import CppRustDocStringParser
 from ._utils_ import Utils
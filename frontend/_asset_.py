@@ -2,6 +2,7 @@
 # Author: Ryoichi Ando (ryoichi.ando@zozo.com)
 # License: Apache v2.0
 
+import hashlib
 import numpy as np
 
 
@@ -11,9 +12,15 @@ class AssetManager:
     def __init__(self):
         """Initialize the asset manager."""
         self._mesh: dict[str, tuple] = {}
+        self._hash: dict[str, str] = {}
         self._add = AssetUploader(self)
         self._fetch = AssetFetcher(self)
 
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if "_hash" not in state:
+            self._hash = {}
+
     def list(self) -> list[str]:
         """List all the assets in the manager.
 
@@ -32,6 +39,8 @@ class AssetManager:
         """
         if name in self._mesh.keys():
             del self._mesh[name]
+            if name in self._hash.keys():
+                del self._hash[name]
             return True
         else:
             return False
@@ -39,6 +48,7 @@ class AssetManager:
     def clear(self):
         """Clear all the assets in the manager."""
         self._mesh = {}
+        self._hash = {}
 
     @property
     def add(self) -> "AssetUploader":
@@ -176,6 +186,29 @@ class AssetFetcher:
                 result["W"] = mesh[2]
             return result
 
+    def hash(self, name: str) -> str:
+        """Get the content hash of the asset.
+
+        The hash is computed on first request and memoized until the asset is removed.
+
+        Args:
+            name (str): The name of the asset.
+
+        Returns:
+            str: The hex digest of the asset type and arrays.
+        """
+        if name not in self._manager._mesh.keys():
+            raise Exception(f"Asset {name} does not exist")
+        elif name not in self._manager._hash.keys():
+            mesh = self._manager._mesh[name]
+            h = hashlib.blake2b(mesh[0].encode(), digest_size=16)
+            for arr in mesh[1:]:
+                arr = np.ascontiguousarray(arr)
+                h.update(str((arr.dtype, arr.shape)).encode())
+                h.update(arr.tobytes())
+            self._manager._hash[name] = h.hexdigest()
+        return self._manager._hash[name]
+
     def tri(self, name: str) -> tuple[np.ndarray, np.ndarray]:
         """Get the triangle mesh data.
 
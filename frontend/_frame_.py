@@ -0,0 +1,885 @@
+# File: _frame_.py
+# Author: Ryoichi Ando (ryoichi.ando@zozo.com)
+# License: Apache v2.0
+
+import bisect
+import ctypes
+import numpy as np
+import os
+import struct
+import sys
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from numba import njit, prange
+from typing import Callable, Hashable, Iterable, Optional
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+_EVENT = struct.Struct("iIII")
+
+
+class _Inotify:
+    """Minimal ctypes binding of the Linux inotify API for a single directory."""
+
+    _libc = None
+
+    def __init__(self, path: str):
+        """Start watching a directory.
+
+        Args:
+            path (str): The directory to watch.
+
+        Raises:
+            OSError: If inotify is unavailable or the watch cannot be added.
+        """
+        if _Inotify._libc is None:
+            _Inotify._libc = ctypes.CDLL(None, use_errno=True)
+        libc = _Inotify._libc
+        self._fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        mask = (
+            IN_CLOSE_WRITE
+            | IN_MOVED_FROM
+            | IN_MOVED_TO
+            | IN_CREATE
+            | IN_DELETE
+            | IN_DELETE_SELF
+            | IN_MOVE_SELF
+        )
+        if libc.inotify_add_watch(self._fd, os.fsencode(path), mask) < 0:
+            errno = ctypes.get_errno()
+            os.close(self._fd)
+            raise OSError(errno, f"inotify_add_watch failed for {path}")
+
+    def read(self) -> list[tuple[int, str]]:
+        """Read the pending events without blocking.
+
+        Returns:
+            list[tuple[int, str]]: The event masks and file names.
+        """
+        events = []
+        while True:
+            try:
+                buffer = os.read(self._fd, 65536)
+            except BlockingIOError:
+                return events
+            offset = 0
+            while offset < len(buffer):
+                _, mask, _, length = _EVENT.unpack_from(buffer, offset)
+                offset += _EVENT.size
+                name = buffer[offset : offset + length].rstrip(b"\0")
+                offset += length
+                events.append((mask, os.fsdecode(name)))
+
+    def close(self):
+        """Stop watching and release the descriptor."""
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+class FrameIndex:
+    """Incrementally tracks the frames written to a session output directory.
+
+    The solver writes one ``vert_N.bin`` per frame. Instead of listing and
+    parsing the whole directory on every query, the index keeps the set of
+    frames in sorted order, and updates them from directory-change
+    notifications on Linux. Elsewhere, or when inotify is unavailable, it
+    only rescans the directory when its modification time changes, and
+    probes for the next frame file at the current frame spacing in between.
+    """
+
+    def __init__(self, path: str, prefix: str = "vert_", suffix: str = ".bin"):
+        """Initialize the frame index.
+
+        Args:
+            path (str): The output directory to track.
+            prefix (str, optional): The frame file name prefix. Defaults to "vert_".
+            suffix (str, optional): The frame file name suffix. Defaults to ".bin".
+        """
+        self._path = path
+        self._prefix = prefix
+        self._suffix = suffix
+        self._lock = threading.Lock()
+        self._reset()
+
+    def __getstate__(self):
+        return {"_path": self._path, "_prefix": self._prefix, "_suffix": self._suffix}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+        self._reset()
+
+    def __del__(self):
+        watch = getattr(self, "_watch", None)
+        if watch is not None:
+            watch.close()
+
+    @property
+    def path(self) -> str:
+        """Get the tracked directory."""
+        return self._path
+
+    def _reset(self):
+        self._frames: set[int] = set()
+        self._sorted: list[int] = []
+        self._latest = -1
+        self._stat: Optional[tuple[int, int]] = None
+        self._watch: Optional[_Inotify] = None
+        self._watched = -1
+        self._notify = sys.platform.startswith("linux")
+
+    def _parse(self, name: str) -> Optional[int]:
+        if name.startswith(self._prefix) and name.endswith(self._suffix):
+            number = name[len(self._prefix) : len(name) - len(self._suffix)]
+            if number.isdigit():
+                return int(number)
+        return None
+
+    def _add(self, frame: int):
+        if frame not in self._frames:
+            self._frames.add(frame)
+            bisect.insort(self._sorted, frame)
+            self._latest = self._sorted[-1]
+
+    def _remove(self, frame: int):
+        if frame in self._frames:
+            self._frames.discard(frame)
+            del self._sorted[bisect.bisect_left(self._sorted, frame)]
+            self._latest = self._sorted[-1] if self._sorted else -1
+
+    def _clear(self):
+        self._frames.clear()
+        self._sorted.clear()
+        self._latest = -1
+
+    def _scan(self):
+        self._clear()
+        for name in os.listdir(self._path):
+            frame = self._parse(name)
+            if frame is not None:
+                self._frames.add(frame)
+        self._sorted = sorted(self._frames)
+        self._latest = self._sorted[-1] if self._sorted else -1
+
+    def _close_watch(self):
+        if self._watch is not None:
+            self._watch.close()
+            self._watch = None
+
+    def _refresh_notify(self, inode: int) -> bool:
+        if self._watch is not None and self._watched != inode:
+            # Replaced while a file inside still pinned the old directory
+            self._close_watch()
+        if self._watch is None:
+            try:
+                self._watch = _Inotify(self._path)
+            except (OSError, AttributeError):
+                self._notify = False
+                return False
+            self._watched = inode
+            self._scan()
+            return True
+        for mask, name in self._watch.read():
+            if mask & (IN_Q_OVERFLOW | IN_IGNORED | IN_DELETE_SELF | IN_MOVE_SELF):
+                self._close_watch()
+                self._clear()
+                try:
+                    return self._refresh_notify(os.stat(self._path).st_ino)
+                except FileNotFoundError:
+                    return True
+            frame = self._parse(name)
+            if frame is not None:
+                if mask & (IN_DELETE | IN_MOVED_FROM):
+                    self._remove(frame)
+                else:
+                    self._add(frame)
+        return True
+
+    def _refresh_probe(self, stat: os.stat_result):
+        key = (stat.st_ino, stat.st_mtime_ns)
+        if self._stat != key:
+            self._scan()
+        self._stat = key
+        # A file created within the same modification time tick as the last
+        # scan leaves the time unchanged, so probe at the spacing of the last
+        # two frames, which follows both consecutive and strided output
+        if self._latest >= 0:
+            stride = self._latest - self._sorted[-2] if len(self._sorted) > 1 else 1
+            while os.path.exists(self._file(self._latest + stride)):
+                self._add(self._latest + stride)
+
+    def _file(self, frame: int) -> str:
+        return os.path.join(self._path, f"{self._prefix}{frame}{self._suffix}")
+
+    def refresh(self) -> "FrameIndex":
+        """Bring the index up to date with the directory.
+
+        Returns:
+            FrameIndex: The frame index.
+        """
+        with self._lock:
+            try:
+                stat = os.stat(self._path)
+            except FileNotFoundError:
+                stat = None
+            if stat is None:
+                self._close_watch()
+                self._clear()
+                self._stat = None
+            elif not (self._notify and self._refresh_notify(stat.st_ino)):
+                self._refresh_probe(stat)
+        return self
+
+    def latest(self) -> Optional[int]:
+        """Get the latest frame number.
+
+        Returns:
+            Optional[int]: The highest frame number written so far, or None if no frame exists.
+        """
+        self.refresh()
+        return None if self._latest < 0 else self._latest
+
+    def exists(self, frame: int) -> bool:
+        """Check whether a frame has been written.
+
+        Args:
+            frame (int): The frame number.
+
+        Returns:
+            bool: True if the frame file exists.
+        """
+        self.refresh()
+        return frame in self._frames
+
+    def frames(self) -> list[int]:
+        """Get the sorted list of written frame numbers.
+
+        Returns:
+            list[int]: The frame numbers.
+        """
+        self.refresh()
+        with self._lock:
+            return list(self._sorted)
+
+    def between(self, start: int, end: int) -> list[int]:
+        """Get the sorted written frame numbers in a range.
+
+        Args:
+            start (int): The exclusive lower bound.
+            end (int): The inclusive upper bound.
+
+        Returns:
+            list[int]: The frame numbers n with start < n <= end.
+        """
+        self.refresh()
+        with self._lock:
+            lo = bisect.bisect_right(self._sorted, start)
+            return self._sorted[lo : bisect.bisect_right(self._sorted, end)]
+
+    def path_of(self, frame: int) -> str:
+        """Get the file path of a frame.
+
+        Args:
+            frame (int): The frame number.
+
+        Returns:
+            str: The path to the frame file.
+        """
+        return self._file(frame)
+
+
+class Trajectory:
+    """Read-only view of a single-file trajectory written by the solver.
+
+    With the ``trajectory`` parameter enabled, the solver appends every
+    video frame to ``trajectory.bin``, which is preallocated for the full
+    run. The whole run is exposed as a zero-copy ``np.memmap`` of shape
+    ``(frames, verts, 3)``. Only frames below the committed frame count in
+    the header are ever returned, so the file can be followed while the
+    solver is still writing.
+    """
+
+    MAGIC = b"PPFTRAJ\0"
+    HEADER = np.dtype(
+        [
+            ("magic", "S8"),
+            ("version", "<u4"),
+            ("header_size", "<u4"),
+            ("vert_count", "<u8"),
+            ("capacity", "<u8"),
+            ("count", "<u8"),
+            ("data_offset", "<u8"),
+            ("index_offset", "<u8"),
+            ("reserved", "<u8"),
+        ]
+    )
+
+    def __init__(self, path: str):
+        """Open a trajectory file.
+
+        Args:
+            path (str): The path to trajectory.bin.
+
+        Raises:
+            ValueError: If the file is not a trajectory file.
+        """
+        self._path = path
+        self._open()
+
+    def __getstate__(self):
+        return {"_path": self._path}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._open()
+
+    def _open(self):
+        self._inode = os.stat(self._path).st_ino
+        self._map = np.memmap(self._path, dtype=np.uint8, mode="r")
+        if len(self._map) < self.HEADER.itemsize:
+            raise ValueError(f"{self._path} is too short for a trajectory header")
+        self._header = self._map[: self.HEADER.itemsize].view(self.HEADER)
+        header = self._header[0]
+        if header["magic"] != self.MAGIC.rstrip(b"\0"):
+            raise ValueError(f"{self._path} is not a trajectory file")
+        capacity = int(header["capacity"])
+        self._vert_count = int(header["vert_count"])
+        index_offset = int(header["index_offset"])
+        data_offset = int(header["data_offset"])
+        self._time = self._map[index_offset : index_offset + 8 * capacity].view("<f8")
+        self._data = self._map[
+            data_offset : data_offset + 12 * self._vert_count * capacity
+        ].view("<f4")
+        self._data = self._data.reshape(capacity, self._vert_count, 3)
+
+    @staticmethod
+    def exists(path: str) -> bool:
+        """Check whether a trajectory file is present.
+
+        Args:
+            path (str): The path to trajectory.bin.
+
+        Returns:
+            bool: True if the file exists.
+        """
+        return os.path.exists(path)
+
+    @property
+    def path(self) -> str:
+        """Get the path to the trajectory file."""
+        return self._path
+
+    @property
+    def inode(self) -> int:
+        """Get the inode of the mapped file."""
+        return self._inode
+
+    def stale(self) -> bool:
+        """Check whether the file has been replaced since it was opened.
+
+        Returns:
+            bool: True if the path now refers to a different file or is gone.
+        """
+        try:
+            return os.stat(self._path).st_ino != self._inode
+        except FileNotFoundError:
+            return True
+
+    @property
+    def capacity(self) -> int:
+        """Get the number of preallocated frames."""
+        return len(self._data)
+
+    @property
+    def vert_count(self) -> int:
+        """Get the number of vertices per frame."""
+        return self._vert_count
+
+    def __len__(self) -> int:
+        """Get the number of committed frames."""
+        return int(self._header[0]["count"])
+
+    def latest(self) -> Optional[int]:
+        """Get the latest committed frame number.
+
+        Returns:
+            Optional[int]: The latest frame number, or None if no frame is committed yet.
+        """
+        count = len(self)
+        return count - 1 if count else None
+
+    @property
+    def data(self) -> np.ndarray:
+        """Get a zero-copy (frames, verts, 3) view of the committed frames."""
+        return self._data[: len(self)]
+
+    @property
+    def time(self) -> np.ndarray:
+        """Get the simulation time of each committed frame."""
+        return self._time[: len(self)]
+
+    def frame(self, n: int) -> Optional[np.ndarray]:
+        """Get a zero-copy view of a committed frame.
+
+        Args:
+            n (int): The frame number.
+
+        Returns:
+            Optional[np.ndarray]: The (verts, 3) vertex positions, or None if the frame is not committed yet or was skipped.
+        """
+        if 0 <= n < len(self) and not np.isnan(self._time[n]):
+            return self._data[n]
+        return None
+
+
+@njit(parallel=True)
+def _apply_delta(
+    width: np.ndarray,
+    offset: np.ndarray,
+    payload: np.ndarray,
+    block: int,
+    step: np.float32,
+    recon: np.ndarray,
+):
+    for b in prange(len(width)):
+        w = width[b]
+        if w == 0:
+            continue
+        start = b * block
+        end = min(start + block, len(recon))
+        for i in range(start, end):
+            k = offset[b] + (i - start) * w
+            q = np.int64(0)
+            for j in range(w):
+                q |= np.int64(payload[k + j]) << (8 * j)
+            if q >= np.int64(1) << (8 * w - 1):
+                q -= np.int64(1) << (8 * w)
+            recon[i] = recon[i] + np.float32(q) * step
+
+
+class DeltaDecoder:
+    """Random-access decoder of the compressed frames written by the solver.
+
+    With the ``codec_step`` parameter set, the solver writes ``vert_N.qbin``
+    files holding either a raw keyframe or fixed-point deltas from the
+    previous frame, each coordinate being within ``codec_step / 2`` of the
+    solver output. A frame is decoded from its keyframe by replaying at most
+    ``codec_keyframe`` deltas, skipping frames left out by the output
+    stride. The last decoded frame is kept, so reading frames in order
+    decodes a single delta per frame.
+    """
+
+    MAGIC = b"PPFQ"
+    HEADER = np.dtype(
+        [
+            ("magic", "S4"),
+            ("version", "u1"),
+            ("kind", "u1"),
+            ("gap", "<u2"),
+            ("count", "<u4"),
+            ("block", "<u4"),
+            ("step", "<f4"),
+            ("keyframe", "<u4"),
+        ]
+    )
+    SUFFIX = ".qbin"
+
+    def __init__(self, path: str):
+        """Initialize the decoder.
+
+        Args:
+            path (str): The output directory holding the vert_N.qbin files.
+        """
+        self._index = FrameIndex(path, suffix=self.SUFFIX)
+        self._lock = threading.Lock()
+        self._source: Optional[tuple[int, int]] = None
+        self._frame = -1
+        self._recon: Optional[np.ndarray] = None
+
+    @staticmethod
+    def exists(path: str) -> bool:
+        """Check whether a directory holds compressed frames.
+
+        Args:
+            path (str): The output directory.
+
+        Returns:
+            bool: True if the first keyframe is present.
+        """
+        return os.path.exists(os.path.join(path, f"vert_0{DeltaDecoder.SUFFIX}"))
+
+    @property
+    def path(self) -> str:
+        """Get the output directory."""
+        return self._index.path
+
+    @property
+    def index(self) -> FrameIndex:
+        """Get the frame index of the compressed frames."""
+        return self._index
+
+    def _read(self, n: int) -> tuple[np.void, np.ndarray, int]:
+        path = self._index.path_of(n)
+        inode = os.stat(path).st_ino
+        data = np.fromfile(path, dtype=np.uint8)
+        if len(data) < self.HEADER.itemsize:
+            raise ValueError(f"{path} is too short for a frame header")
+        header = data[: self.HEADER.itemsize].view(self.HEADER)[0]
+        if header["magic"] != self.MAGIC:
+            raise ValueError(f"{path} is not a compressed frame")
+        return header, data[self.HEADER.itemsize :], inode
+
+    def _apply(self, header: np.void, body: np.ndarray):
+        count, block = int(header["count"]), int(header["block"])
+        n_block = (count + block - 1) // block
+        width = body[:n_block]
+        length = np.minimum(block, count - block * np.arange(n_block))
+        size = width.astype(np.int64) * length
+        offset = np.concatenate(([0], np.cumsum(size)[:-1])).astype(np.int64)
+        payload = body[n_block:]
+        if len(payload) < size.sum() or not np.isin(width, (0, 1, 2, 4)).all():
+            raise ValueError("corrupted delta frame")
+        _apply_delta(width, offset, payload, block, header["step"], self._recon)
+
+    def decode(self, n: int) -> np.ndarray:
+        """Decode a frame.
+
+        Args:
+            n (int): The frame number.
+
+        Returns:
+            np.ndarray: The read-only vertex positions of shape (N, 3).
+
+        Raises:
+            FileNotFoundError: If a frame in the chain is missing.
+            ValueError: If a frame in the chain is malformed.
+        """
+        with self._lock:
+            header, body, inode = self._read(n)
+            key = int(header["keyframe"])
+            if key == n:
+                source = (key, inode)
+            else:
+                key_header, key_body, key_inode = self._read(key)
+                source = (key, key_inode)
+            if self._source != source or not key <= self._frame <= n:
+                if key != n:
+                    header, body = key_header, key_body
+                if header["kind"] != 0:
+                    raise ValueError(f"frame {key} is not a keyframe")
+                count = int(header["count"])
+                self._recon = body[: 4 * count].view("<f4").copy()
+                self._source, self._frame = source, key
+            for m in self._index.between(self._frame, n):
+                header, body, _ = self._read(m)
+                if (
+                    header["kind"] != 1
+                    or int(header["keyframe"]) != key
+                    or int(header["gap"]) != m - self._frame
+                ):
+                    raise ValueError(f"frame {m} does not follow frame {self._frame}")
+                self._apply(header, body)
+                self._frame = m
+            if self._frame != n:
+                raise ValueError(f"frame {n} is not in the index")
+            vert = self._recon.reshape(-1, 3).copy()
+        vert.flags.writeable = False
+        return vert
+
+
+class Checkpoint:
+    """Solver state read from a ``checkpoint/state_N.bin`` file.
+
+    The solver saves its positions and those of the previous step together
+    with the previous step size, from which the velocity is recovered. The
+    header mirrors the layout written by ``src/checkpoint.rs``.
+    """
+
+    MAGIC = b"PPFCKPT\0"
+    VERSION = 1
+    HEADER = np.dtype(
+        [
+            ("magic", "S8"),
+            ("version", "<u4"),
+            ("frame", "<i4"),
+            ("time", "<f8"),
+            ("prev_dt", "<f4"),
+            ("reserved", "<u4"),
+            ("count", "<u8"),
+        ]
+    )
+
+    def __init__(
+        self,
+        frame: int,
+        time: float,
+        prev_dt: float,
+        curr: np.ndarray,
+        prev: np.ndarray,
+    ):
+        """Initialize the checkpoint.
+
+        Args:
+            frame (int): The video frame number.
+            time (float): The simulation time.
+            prev_dt (float): The previous step size.
+            curr (np.ndarray): The current positions (N, 3).
+            prev (np.ndarray): The positions at the previous step (N, 3).
+        """
+        self.frame = frame
+        self.time = time
+        self.prev_dt = prev_dt
+        self.curr = curr
+        self.prev = prev
+
+    @classmethod
+    def load(cls, path: str) -> "Checkpoint":
+        """Read a checkpoint file.
+
+        Args:
+            path (str): The path to state_N.bin.
+
+        Returns:
+            Checkpoint: The checkpoint.
+
+        Raises:
+            ValueError: If the file is not a complete checkpoint of a supported version.
+        """
+        data = np.fromfile(path, dtype=np.uint8)
+        if len(data) < cls.HEADER.itemsize:
+            raise ValueError(f"{path} is too short for a checkpoint header")
+        header = data[: cls.HEADER.itemsize].view(cls.HEADER)[0]
+        if header["magic"] != cls.MAGIC.rstrip(b"\0"):
+            raise ValueError(f"{path} is not a checkpoint file")
+        if header["version"] != cls.VERSION:
+            raise ValueError(f"{path} has unsupported version {header['version']}")
+        count = int(header["count"])
+        if len(data) != cls.HEADER.itemsize + 24 * count:
+            raise ValueError(f"{path} is truncated")
+        vert = data[cls.HEADER.itemsize :].view("<f4").reshape(2, count, 3)
+        return cls(
+            int(header["frame"]),
+            float(header["time"]),
+            float(header["prev_dt"]),
+            vert[0],
+            vert[1],
+        )
+
+    @property
+    def velocity(self) -> np.ndarray:
+        """Get the velocity recovered from the last step."""
+        return (self.curr - self.prev) / np.float32(self.prev_dt)
+
+
+class FrameStore:
+    """Byte-budgeted LRU cache of memory-mapped frames with read-ahead.
+
+    Frames are located through a callback that returns a cache key and a
+    loader for a frame number, so the store serves per-frame files and
+    trajectory files alike. Loaded frames are kept in least-recently-used
+    order until the byte budget or the entry limit is exceeded. When frames
+    are requested sequentially, the next ``read_ahead`` frames are loaded
+    and paged in on background threads.
+    """
+
+    def __init__(
+        self,
+        locate: Callable[[int], Optional[tuple[Hashable, Callable[[], np.ndarray]]]],
+        budget: int = 512 * 1024 * 1024,
+        read_ahead: int = 8,
+        max_entries: int = 512,
+    ):
+        """Initialize the frame store.
+
+        Args:
+            locate (Callable): Maps a frame number to a (key, loader) pair, or None if the frame does not exist.
+            budget (int, optional): The maximal number of cached bytes. Defaults to 512 MiB.
+            read_ahead (int, optional): The number of frames to load ahead of sequential reads. Defaults to 8.
+            max_entries (int, optional): The maximal number of cached frames, which bounds the open mappings. Defaults to 512.
+        """
+        self._locate = locate
+        self._budget = budget
+        self._read_ahead = read_ahead
+        self._max_entries = max_entries
+        self._cache: OrderedDict[Hashable, np.ndarray] = OrderedDict()
+        self._size = 0
+        self._pending: set[Hashable] = set()
+        self._last: Optional[int] = None
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._generation: dict[str, int] = {}
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def size(self) -> int:
+        """Get the number of cached bytes."""
+        return self._size
+
+    def __len__(self) -> int:
+        """Get the number of cached frames."""
+        return len(self._cache)
+
+    def clear(self):
+        """Drop all cached frames."""
+        with self._lock:
+            self._cache.clear()
+            self._size = 0
+            self._last = None
+
+    def _lookup(self, key: Hashable) -> Optional[np.ndarray]:
+        with self._lock:
+            vert = self._cache.get(key)
+            if vert is not None:
+                self._cache.move_to_end(key)
+            return vert
+
+    def _insert(self, key: Hashable, vert: np.ndarray):
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return
+            self._cache[key] = vert
+            self._size += vert.nbytes
+            while len(self._cache) > 1 and (
+                self._size > self._budget or len(self._cache) > self._max_entries
+            ):
+                _, evicted = self._cache.popitem(last=False)
+                self._size -= evicted.nbytes
+
+    def _load(
+        self, key: Hashable, load: Callable[[], np.ndarray]
+    ) -> Optional[np.ndarray]:
+        try:
+            vert = load()
+        except (ValueError, FileNotFoundError):
+            return None
+        if vert is not None:
+            self._insert(key, vert)
+        return vert
+
+    def get(self, n: int) -> Optional[np.ndarray]:
+        """Get the vertex positions of a frame.
+
+        Args:
+            n (int): The frame number.
+
+        Returns:
+            Optional[np.ndarray]: The read-only (verts, 3) vertex positions, or None if the frame is unavailable.
+        """
+        located = self._locate(n)
+        if located is None:
+            return None
+        key, load = located
+        vert = self._lookup(key)
+        if vert is None:
+            self.misses += 1
+            vert = self._load(key, load)
+        else:
+            self.hits += 1
+        sequential = self._last is not None and n == self._last + 1
+        self._last = n
+        if sequential and self._read_ahead > 0:
+            self.prefetch(range(n + 1, n + 1 + self._read_ahead), "sequential")
+        return vert
+
+    def capacity(self, frame_bytes: int) -> int:
+        """Get the number of frames of a given size that fit in the cache.
+
+        Args:
+            frame_bytes (int): The size of one frame in bytes.
+
+        Returns:
+            int: The number of frames.
+        """
+        return max(1, min(self._budget // max(1, frame_bytes), self._max_entries))
+
+    @staticmethod
+    def coarse_to_fine(count: int, limit: int) -> list[int]:
+        """Order frames so that every Nth frame comes first, then every N/2th, and so on.
+
+        Args:
+            count (int): The number of frames.
+            limit (int): The maximal number of frames to return.
+
+        Returns:
+            list[int]: The frame numbers in coarse-to-fine order.
+        """
+        order, seen = [], np.zeros(count, dtype=bool)
+        stride = 1
+        while 2 * stride < count:
+            stride *= 2
+        while stride >= 1 and len(order) < limit:
+            for n in range(0, count, stride):
+                if not seen[n]:
+                    seen[n] = True
+                    order.append(n)
+            stride //= 2
+        return order[:limit]
+
+    @staticmethod
+    def _touch(vert: Optional[np.ndarray]) -> Optional[np.ndarray]:
+        if vert is not None:
+            # Read one value per page so the frame is resident
+            vert.reshape(-1)[::1024].sum()
+        return vert
+
+    def fetch(self, n: int) -> Optional[np.ndarray]:
+        """Get a frame like get() and page it in before returning.
+
+        Args:
+            n (int): The frame number.
+
+        Returns:
+            Optional[np.ndarray]: The vertex positions, or None if the frame is unavailable.
+        """
+        return self._touch(self.get(n))
+
+    def prefetch(self, frames: Iterable[int], tag: Optional[str] = None):
+        """Load frames into the cache on background threads.
+
+        Args:
+            frames (Iterable[int]): The frame numbers to load, in order of priority.
+            tag (Optional[str], optional): If given, a later prefetch with the same tag cancels the remaining frames of this one.
+        """
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=2, thread_name_prefix="frame-read-ahead"
+                )
+            generation = None
+            if tag is not None:
+                generation = self._generation.get(tag, 0) + 1
+                self._generation[tag] = generation
+        self._executor.submit(self._warm, list(frames), tag, generation)
+
+    def _warm(self, frames: list[int], tag: Optional[str], generation: Optional[int]):
+        for n in frames:
+            if tag is not None and self._generation.get(tag) != generation:
+                return
+            located = self._locate(n)
+            if located is None:
+                continue
+            key, load = located
+            with self._lock:
+                if key in self._cache or key in self._pending:
+                    continue
+                self._pending.add(key)
+            try:
+                self._touch(self._load(key, load))
+            finally:
+                with self._lock:
+                    self._pending.discard(key)
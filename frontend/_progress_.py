@@ -0,0 +1,213 @@
+# File: _progress_.py
+# Author: Ryoichi Ando (ryoichi.ando@zozo.com)
+# License: Apache v2.0
+
+import asyncio
+import json
+import os
+import select
+import socket
+import tempfile
+import threading
+import uuid
+from typing import Any, Optional
+
+
+class ProgressChannel:
+    """Class to receive the events pushed by the solver.
+
+    The channel binds a Unix datagram socket that the solver is pointed at
+    with ``--progress-socket``. Every event is appended to a list, so any
+    number of consumers can follow it from their own position and wake up
+    as soon as something arrives. Blocking waits are served by a reader
+    thread started on first use, and awaits by a reader registered on the
+    running event loop, so a channel used only from asyncio costs no thread.
+    Events are dictionaries with an ``"event"`` field of ``"start"``,
+    ``"frame"``, ``"finished"`` or ``"error"``.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        """Initialize the ProgressChannel class.
+
+        Args:
+            path (Optional[str], optional): The socket path. Defaults to a new path in the temporary directory, which keeps it within the length limit of Unix socket paths.
+        """
+        if path is None:
+            path = os.path.join(
+                tempfile.gettempdir(), f"ppf-progress-{uuid.uuid4().hex[:12]}.sock"
+            )
+        if os.path.exists(path):
+            os.remove(path)
+        self._path = path
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._socket.bind(path)
+        self._socket.setblocking(False)
+        self._events: list[dict[str, Any]] = []
+        self._closed = False
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._waiters: list[asyncio.Future] = []
+
+    def __enter__(self) -> "ProgressChannel":
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    @property
+    def path(self) -> str:
+        """Get the socket path."""
+        return self._path
+
+    @property
+    def closed(self) -> bool:
+        """Check if the channel is closed."""
+        return self._closed
+
+    def _drain(self):
+        """Append the pending events without blocking and wake the waiters."""
+        with self._cond:
+            received = False
+            while not self._closed:
+                try:
+                    data = self._socket.recv(65536)
+                except OSError:
+                    break
+                try:
+                    self._events.append(json.loads(data.decode()))
+                    received = True
+                except ValueError:
+                    continue
+            if received or self._closed:
+                self._cond.notify_all()
+                waiters, self._waiters = self._waiters, []
+                for future in waiters:
+                    future.get_loop().call_soon_threadsafe(_resolve, future)
+
+    def _receive(self):
+        while not self._closed:
+            try:
+                ready, _, _ = select.select([self._socket], [], [], 0.5)
+            except (OSError, ValueError):
+                break
+            if ready:
+                self._drain()
+
+    def events(self, start: int = 0) -> list[dict[str, Any]]:
+        """Get the events received so far.
+
+        Args:
+            start (int, optional): The number of events to skip. Defaults to 0.
+
+        Returns:
+            list[dict[str, Any]]: The events in the order they arrived.
+        """
+        self._drain()
+        with self._cond:
+            return self._events[start:]
+
+    def wait(
+        self, start: int = 0, timeout: Optional[float] = None
+    ) -> list[dict[str, Any]]:
+        """Wait for events beyond those already seen.
+
+        Args:
+            start (int, optional): The number of events already seen. Defaults to 0.
+            timeout (Optional[float], optional): The maximum time to wait in seconds. Defaults to None.
+
+        Returns:
+            list[dict[str, Any]]: The new events, empty on timeout or when the channel is closed.
+        """
+        self._drain()
+        with self._cond:
+            if self._thread is None and not self._closed:
+                self._thread = threading.Thread(target=self._receive, daemon=True)
+                self._thread.start()
+            self._cond.wait_for(
+                lambda: len(self._events) > start or self._closed, timeout
+            )
+            return self._events[start:]
+
+    async def await_events(
+        self, start: int = 0, timeout: Optional[float] = None
+    ) -> list[dict[str, Any]]:
+        """Asynchronously wait for events beyond those already seen.
+
+        This is the asyncio counterpart of wait().
+
+        Args:
+            start (int, optional): The number of events already seen. Defaults to 0.
+            timeout (Optional[float], optional): The maximum time to wait in seconds. Defaults to None.
+
+        Returns:
+            list[dict[str, Any]]: The new events, empty on timeout or when the channel is closed.
+        """
+        loop = asyncio.get_running_loop()
+        self._drain()
+        with self._cond:
+            if len(self._events) > start or self._closed:
+                return self._events[start:]
+            if self._loop is not loop:
+                if self._loop is not None and not self._loop.is_closed():
+                    self._loop.call_soon_threadsafe(
+                        self._loop.remove_reader, self._socket.fileno()
+                    )
+                loop.add_reader(self._socket.fileno(), self._drain)
+                self._loop = loop
+            future = loop.create_future()
+            self._waiters.append(future)
+        try:
+            await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            with self._cond:
+                if future in self._waiters:
+                    self._waiters.remove(future)
+        with self._cond:
+            return self._events[start:]
+
+    def latest(self, event: str = "frame", **fields) -> Optional[dict[str, Any]]:
+        """Get the latest event of a kind.
+
+        Args:
+            event (str, optional): The kind of event. Defaults to "frame".
+            **fields: Values the event must have, such as ``written=True``.
+
+        Returns:
+            Optional[dict[str, Any]]: The event, or None if none has arrived.
+        """
+        self._drain()
+        with self._cond:
+            for entry in reversed(self._events):
+                if entry.get("event") == event and all(
+                    entry.get(key) == value for key, value in fields.items()
+                ):
+                    return entry
+        return None
+
+    def close(self):
+        """Stop receiving and remove the socket."""
+        if not self._closed:
+            loop = self._loop
+            if loop is not None and not loop.is_closed():
+                try:
+                    running = asyncio.get_running_loop()
+                except RuntimeError:
+                    running = None
+                if running is loop:
+                    loop.remove_reader(self._socket.fileno())
+                else:
+                    loop.call_soon_threadsafe(loop.remove_reader, self._socket.fileno())
+            with self._cond:
+                self._closed = True
+            self._drain()
+            self._socket.close()
+            if os.path.exists(self._path):
+                os.remove(self._path)
+
+
+def _resolve(future: asyncio.Future):
+    if not future.done():
+        future.set_result(None)
@@ -10,9 +10,9 @@ import os
 import time
 import colorsys
 from scipy.sparse import csr_matrix
-from numba import njit
+from numba import njit, prange
 from dataclasses import dataclass
-from typing import Optional
+from typing import Optional, Union
 from enum import Enum
 from ._plot_ import PlotManager, Plot
 from ._asset_ import AssetManager
@@ -296,10 +296,58 @@ class SpinData:
 
 @dataclass
 class PinKeyframe:
-    """Represents a single keyframe for pinned vertices."""
+    """Represents a single keyframe for pinned vertices.
 
-    position: np.ndarray
+    A keyframe is either dense, holding the target ``position`` of every
+    pinned vertex, or affine, holding a 3x4 ``transform`` applied to the
+    rest positions of the pinned vertices. ``frame`` is the 3x4 asset
+    transform of the object when the keyframe was made, so that rotating
+    or scaling the object afterwards does not move the pin targets, just
+    as it does not move dense positions.
+    """
+
+    position: Optional[np.ndarray]
     time: float
+    transform: Optional[np.ndarray] = None
+    frame: Optional[np.ndarray] = None
+
+    def rebase(self, frame: np.ndarray) -> "PinKeyframe":
+        """Get the keyframe with its transform applying to the rest positions under another frame.
+
+        Args:
+            frame (np.ndarray): The 3x4 asset transform of the object.
+
+        Returns:
+            PinKeyframe: The rebased keyframe, or this keyframe if there is nothing to rebase.
+        """
+        if (
+            self.transform is None
+            or self.frame is None
+            or np.array_equal(self.frame, frame)
+        ):
+            return self
+        else:
+            bottom = np.array([[0.0, 0.0, 0.0, 1.0]])
+            transform, old, new = (
+                np.vstack([m, bottom]) for m in [self.transform, self.frame, frame]
+            )
+            rebased = transform @ old @ np.linalg.inv(new)
+            return PinKeyframe(None, self.time, rebased[:3], frame)
+
+    def resolve(self, rest: np.ndarray) -> np.ndarray:
+        """Get the target positions of the pinned vertices.
+
+        Args:
+            rest (np.ndarray): The rest positions of the pinned vertices.
+
+        Returns:
+            np.ndarray: The target positions.
+        """
+        if self.transform is None:
+            assert self.position is not None
+            return self.position
+        else:
+            return _affine_vertex(rest, self.transform)
 
 
 @dataclass
@@ -314,6 +362,70 @@ class PinData:
     pull_strength: float = 0.0
 
 
+@dataclass
+class Precision:
+    """Represents the storage precision of a fixed scene and its export.
+
+    ``index`` is "auto", "uint32" or "uint64". "auto" picks uint32 whenever
+    every index fits. ``position`` is "float64" or "float32" and ``color``
+    is "uint8", "float32" or "float64".
+    """
+
+    index: str = "auto"
+    position: str = "float64"
+    color: str = "uint8"
+
+
+@dataclass
+class InstanceData:
+    """Represents an asset shared by several objects and the per-instance table.
+
+    The template holds the untransformed asset vertices, the concatenation
+    block and rank of each vertex, and the asset elements in local indices.
+    Row ``j`` of the table places instance ``j``: its affine transform, the
+    concatenated index where each of its vertex blocks starts, the first row
+    of its rod, triangle and tetrahedral elements, its displacement map
+    reference, velocity and color.
+    """
+
+    vert: np.ndarray
+    block: np.ndarray
+    rank: np.ndarray
+    rod: np.ndarray
+    tri: np.ndarray
+    tet: np.ndarray
+    transform: np.ndarray
+    vert_offset: np.ndarray
+    elm_offset: np.ndarray
+    dmap: np.ndarray
+    velocity: np.ndarray
+    color: np.ndarray
+
+    def count(self) -> int:
+        """Get the number of instances."""
+        return len(self.transform)
+
+    def map(self) -> np.ndarray:
+        """Get the concatenated vertex indices of each instance.
+
+        Returns:
+            np.ndarray: The (count, #vert) array of concatenated indices.
+        """
+        return self.vert_offset[:, self.block] + self.rank
+
+    def row(self, slot: int, count: int) -> np.ndarray:
+        """Get the concatenated element rows of each instance.
+
+        Args:
+            slot (int): 0 for rods, 1 for triangles and 2 for tetrahedra.
+            count (int): The number of elements of the template.
+
+        Returns:
+            np.ndarray: The (count, #element) array of concatenated rows.
+        """
+        return self.elm_offset[:, slot, None] + np.arange(count)
+
+
 class PinHolder:
     """Class to manage pinning behavior of objects."""
 
@@ -362,11 +474,20 @@ class PinHolder:
         Returns:
             PinHolder: The pinholder with the updated position.
         """
-        delta_pos = np.array(delta_pos).reshape((-1, 3))
-        if not self._data.keyframe:
-            target = self._obj.vertex(False)[self._data.index] + delta_pos
+        delta_pos = np.array(delta_pos, dtype=np.float64).reshape((-1, 3))
+        last = self._data.keyframe[-1] if self._data.keyframe else None
+        if len(delta_pos) == 1 and (last is None or last.transform is not None):
+            if last is None:
+                transform, frame = np.eye(3, 4), self._obj._affine()
+            else:
+                transform, frame = last.transform.copy(), last.frame
+            transform[:, 3] += delta_pos[0]
+            return self._move_affine(transform, time, frame)
+        rest = self._obj.vertex(False)[self._data.index]
+        if last is None:
+            target = rest + delta_pos
         else:
-            target = self._data.keyframe[-1].position + delta_pos
+            target = last.rebase(self._obj._affine()).resolve(rest) + delta_pos
         return self.move_to(target, time)
 
     def scale(self, scale: float, time: float) -> "PinHolder":
@@ -381,10 +502,8 @@ class PinHolder:
         """
         vertex = self._obj.vertex(False)[self._data.index]
         mean = np.mean(vertex, axis=0)
-        vertex = vertex - mean
-        vertex = vertex * scale
-        vertex = vertex + mean
-        return self.move_to(vertex, time)
+        transform = np.hstack([scale * np.eye(3), ((1 - scale) * mean)[:, None]])
+        return self._move_affine(transform, time, self._obj._affine())
 
     def hold(self, time: float) -> "PinHolder":
         """Hold the object in its current position for a specified time.
@@ -434,11 +553,29 @@ class PinHolder:
         self._add_movement(target, time)
         return self
 
-    def _add_movement(self, target_pos: np.ndarray, time: float):
+    def _move_affine(
+        self, transform: np.ndarray, time: float, frame: Optional[np.ndarray]
+    ) -> "PinHolder":
+        if time == 0:
+            raise Exception("time must be greater than zero")
+
+        if not self.keyframe:
+            self._add_movement(None, 0, np.eye(3, 4), frame)
+
+        self._add_movement(None, time, transform, frame)
+        return self
+
+    def _add_movement(
+        self,
+        target_pos: Optional[np.ndarray],
+        time: float,
+        transform: Optional[np.ndarray] = None,
+        frame: Optional[np.ndarray] = None,
+    ):
         final_time = self._data.keyframe[-1].time if self._data.keyframe else None
         if final_time is not None and time <= final_time:
             raise Exception("time must be greater than the last time")
-        self._data.keyframe.append(PinKeyframe(target_pos, time))
+        self._data.keyframe.append(PinKeyframe(target_pos, time, transform, frame))
 
     def spin(
         self,
@@ -500,25 +637,136 @@ class EnumColor(Enum):
     AREA = 1
 
 
+_AREA_COLOR = EnumColor.AREA.value
+
+
 @njit
 def _area(f: np.ndarray, vert: np.ndarray) -> float:
-    a, b, c = vert[f[0]], vert[f[1]], vert[f[2]]
-    area = 0.5 * float(np.linalg.norm(np.cross(b - a, c - a)))
-    return area
+    a, b, c = f[0], f[1], f[2]
+    e0 = vert[b, 0] - vert[a, 0], vert[b, 1] - vert[a, 1], vert[b, 2] - vert[a, 2]
+    e1 = vert[c, 0] - vert[a, 0], vert[c, 1] - vert[a, 1], vert[c, 2] - vert[a, 2]
+    x = e0[1] * e1[2] - e0[2] * e1[1]
+    y = e0[2] * e1[0] - e0[0] * e1[2]
+    z = e0[0] * e1[1] - e0[1] * e1[0]
+    return 0.5 * np.sqrt(x * x + y * y + z * z)
 
 
-@njit
+@njit(parallel=True)
 def _compute_area(vert: np.ndarray, tri: np.ndarray, area: np.ndarray):
-    for i, f in enumerate(tri):
-        area[i] = _area(f, vert)
+    for i in prange(len(tri)):
+        area[i] = _area(tri[i], vert)
 
 
 @njit
-def _compute_area_change(
-    vert: np.ndarray, tri: np.ndarray, init_area: np.ndarray, rat: np.ndarray
+def _hsv_to_rgb(h: float, s: float, v: float) -> tuple[float, float, float]:
+    i = int(h * 6.0)
+    f = h * 6.0 - i
+    p, q, t = v * (1.0 - s), v * (1.0 - s * f), v * (1.0 - s * (1.0 - f))
+    i = i % 6
+    if i == 0:
+        return v, t, p
+    elif i == 1:
+        return q, v, p
+    elif i == 2:
+        return p, v, t
+    elif i == 3:
+        return p, q, v
+    elif i == 4:
+        return t, p, v
+    else:
+        return v, p, q
+
+
+@njit(parallel=True, fastmath=True)
+def _gather_vertex_color(
+    vert: np.ndarray,
+    tri: np.ndarray,
+    init_area: np.ndarray,
+    face_color: np.ndarray,
+    face_intensity: np.ndarray,
+    max_area: float,
+    indptr: np.ndarray,
+    indices: np.ndarray,
+    weight: np.ndarray,
+    base: np.ndarray,
+    scale: float,
+    face: np.ndarray,
+    out: np.ndarray,
 ):
-    for i, f in enumerate(tri):
-        rat[i] = _area(f, vert) / init_area[i]
+    # The strain color of each face is computed once into the face buffer,
+    # then each vertex gathers the weighted average of its faces by CSR row
+    for i in prange(len(tri)):
+        if face_color[i] == _AREA_COLOR:
+            rat = _area(tri[i], vert) / init_area[i]
+            val = max(0.0, min(1.0, (rat - 1.0) / (max_area - 1.0)))
+            hue = 240.0 * (1.0 - val) / 360.0
+            r, g, b = _hsv_to_rgb(hue, 0.75, 1.0)
+            face[i, 0], face[i, 1], face[i, 2], face[i, 3] = face_intensity[i], r, g, b
+        else:
+            face[i, 0], face[i, 1], face[i, 2], face[i, 3] = 0.0, 0.0, 0.0, 0.0
+    for i in prange(len(out)):
+        intensity, r, g, b = 0.0, 0.0, 0.0, 0.0
+        for k in range(indptr[i], indptr[i + 1]):
+            j, w = indices[k], weight[k]
+            intensity += w * face[j, 0]
+            r += w * face[j, 1]
+            g += w * face[j, 2]
+            b += w * face[j, 3]
+        out[i, 0] = (1.0 - intensity) * scale * base[i, 0] + intensity * r
+        out[i, 1] = (1.0 - intensity) * scale * base[i, 1] + intensity * g
+        out[i, 2] = (1.0 - intensity) * scale * base[i, 2] + intensity * b
+
+
+def _assign_index(map: np.ndarray, elm: np.ndarray, count: int) -> int:
+    """Assign concatenated indices to the unassigned vertices of elements.
+
+    Vertices are numbered in the order they first appear when the elements
+    are traversed row by row, which is the ordering the solver expects.
+
+    Args:
+        map (np.ndarray): The local to concatenated index map. Unassigned entries are -1.
+        elm (np.ndarray): The elements referring to the local indices.
+        count (int): The next concatenated index to assign.
+
+    Returns:
+        int: The next concatenated index after the assignment.
+    """
+    flat = np.asarray(elm, dtype=np.int64).ravel()
+    flat = flat[map[flat] == -1]
+    if len(flat):
+        _, first = np.unique(flat, return_index=True)
+        order = flat[np.sort(first)]
+        map[order] = np.arange(count, count + len(order))
+        count += len(order)
+    return count
+
+
+def _concat(blocks: list[np.ndarray]) -> np.ndarray:
+    """Concatenate a list of arrays, returning an empty array if the list is empty."""
+    if len(blocks):
+        return np.concatenate(blocks)
+    else:
+        return np.zeros(0)
+
+
+def _affine_vertex(vert: np.ndarray, transform: np.ndarray) -> np.ndarray:
+    """Apply a 3x4 affine transform to an array of vertices."""
+    return vert @ transform[:, :3].T + transform[:, 3]
+
+
+def _unpack_color(color: np.ndarray) -> np.ndarray:
+    """Convert stored vertex colors to floating point RGB values."""
+    if color.dtype == np.uint8:
+        return color / 255.0
+    else:
+        return color
+
+
+def _complement(index: np.ndarray, n: int) -> np.ndarray:
+    """Get a mask of the entries in range(n) that are not listed in index."""
+    mask = np.ones(n, dtype=bool)
+    mask[index] = False
+    return mask
 
 
 class FixedScene:
@@ -531,8 +779,8 @@ class FixedScene:
         displacement: np.ndarray,
         vert: tuple[np.ndarray, np.ndarray],
         color: np.ndarray,
-        dyn_face_color: list[EnumColor],
-        dyn_face_intensity: list[float],
+        dyn_face_color: np.ndarray,
+        dyn_face_intensity: np.ndarray,
         vel: np.ndarray,
         uv: np.ndarray,
         rod: np.ndarray,
@@ -545,6 +793,7 @@ class FixedScene:
         shell_vert_range: tuple[int, int],
         rod_count: int,
         shell_count: int,
+        precision: Optional[Precision] = None,
     ):
         """Initialize the fixed scene.
 
@@ -554,8 +803,8 @@ class FixedScene:
             displacement (np.ndarray): The displacement of the vertices.
             vert (np.ndarray, np.ndarray): The vertices of the scene. The first array is the displacement map reference.
             color (np.ndarray): The colors of the vertices.
-            dyn_face_color (list[EnumColor]): The dynamic face colors.
-            dyn_face_intensity (list[float]): The dynamic face color intensity.
+            dyn_face_color (np.ndarray): The EnumColor value of each face.
+            dyn_face_intensity (np.ndarray): The dynamic face color intensity.
             vel (np.ndarray): The velocities of the vertices.
             uv (np.ndarray): The UV coordinates of the vertices.
             rod (np.ndarray): The rod elements.
@@ -568,35 +817,47 @@ class FixedScene:
             shell_vert_range (tuple[int, int]): The index range of the shell vertices.
             rod_count (int): The number of rod elements.
             shell_count (int): The number of shell elements.
+            precision (Optional[Precision], optional): The storage precision. Defaults to Precision().
         """
 
         self._plot = plot
         self._name = name
+        self._precision = Precision() if precision is None else precision
+        index = self._index_dtype(len(vert[1]))
         self._displacement = displacement
-        self._vert = vert
-        self._color = color
-        self._dyn_face_color = dyn_face_color
-        self._dyn_face_intensity = dyn_face_intensity
+        self._vert = (
+            vert[0].astype(np.uint32, copy=False),
+            vert[1].astype(self._precision.position, copy=False),
+        )
+        self._color = self._pack_color(color)
+        self._dyn_face_color = np.asarray(dyn_face_color, dtype=np.uint8)
+        self._dyn_face_intensity = np.asarray(dyn_face_intensity, dtype=np.float64)
         self._vel = vel
         self._uv = uv
-        self._rod = rod
+        self._rod = rod.astype(index, copy=False)
         self._rod_length_factor = rod_length_factor
-        self._tri = tri
-        self._tet = tet
+        self._tri = tri.astype(index, copy=False)
+        self._tet = tet.astype(index, copy=False)
         self._pin: list[PinData] = []
         self._spin: list[SpinData] = []
-        self._static_vert = (np.zeros(0, dtype=np.uint32), np.zeros(0))
-        self._static_color = np.zeros(0)
-        self._static_tri = np.zeros(0)
-        self._stitch_ind = np.zeros(0)
+        self._static_vert = (
+            np.zeros(0, dtype=np.uint32),
+            np.zeros(0, dtype=self._precision.position),
+        )
+        self._static_color = self._pack_color(np.zeros(0))
+        self._static_tri = np.zeros(0, dtype=index)
+        self._stitch_ind = np.zeros(0, dtype=index)
         self._stitch_w = np.zeros(0)
+        self._record = np.zeros(0, dtype=index)
+        self._instance: list[InstanceData] = []
+        self._kinematics: Optional[dict] = None
         self._wall = wall
         self._sphere = sphere
         self._rod_vert_range = rod_vert_range
         self._shell_vert_range = shell_vert_range
         self._rod_count = rod_count
         self._shell_count = shell_count
-        self._has_dyn_color = any(entry != EnumColor.NONE for entry in dyn_face_color)
+        self._has_dyn_color = bool(np.any(self._dyn_face_color != EnumColor.NONE.value))
 
         assert len(self._vert[0]) == len(self._color)
         assert len(self._vert[1]) == len(self._color)
@@ -608,21 +869,162 @@ class FixedScene:
         else:
             self._area = np.zeros(0)
 
-        if self._has_dyn_color:
-            sum = np.zeros(len(self._vert[0])) + 0.0001
-            rows, cols, vals = [], [], []
-            for i, f in enumerate(self._tri):
-                for j in f:
-                    rows.append(j)
-                    cols.append(i)
-                    vals.append(1.0)
-                    sum[j] += 1
+        # Built on the first call to color() and kept in the pickled state
+        self._face_to_vert_mat: Optional[csr_matrix] = None
+
+    def _face_to_vert(self) -> csr_matrix:
+        """Get the operator averaging face values onto their vertices.
+
+        Returns:
+            csr_matrix: The (#vert, #tri) averaging matrix.
+        """
+        if self._face_to_vert_mat is None:
+            n_vert, n_tri = len(self._vert[1]), len(self._tri)
+            rows = self._tri.ravel().astype(np.int64)
+            count = np.bincount(rows, minlength=n_vert)
+            order = np.argsort(rows, kind="stable")
+            indptr = np.concatenate([[0], np.cumsum(count)])
+            data = 1.0 / (count.astype(np.float64) + 0.0001)
             self._face_to_vert_mat = csr_matrix(
-                (vals, (rows, cols)), shape=(len(sum), len(self._tri))
+                (data[rows[order]], order // 3, indptr), shape=(n_vert, n_tri)
+            )
+        return self._face_to_vert_mat
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_kinematics"] = None
+        if self._instance:
+            # Instanced vertices and elements are stored once in their
+            # templates and are re-expanded when the scene is loaded
+            index = self._instance_index()
+            vert = _complement(index["vert"], len(self._vert[1]))
+            state["_vert"] = (self._vert[0][vert], self._vert[1][vert])
+            state["_color"] = self._color[vert]
+            state["_vel"] = self._vel[vert]
+            for key in ["rod", "tri", "tet"]:
+                elm = getattr(self, f"_{key}")
+                state[f"_{key}"] = elm[_complement(index[key], len(elm))]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._kinematics = None
+        if "_precision" not in state:
+            self._precision = Precision(index="uint64", color="float64")
+        if "_record" not in state:
+            self._record = np.zeros(0, dtype=self._index_dtype(len(self._vert[1])))
+        if isinstance(self._dyn_face_color, list):
+            self._dyn_face_color = np.array(
+                [entry.value for entry in self._dyn_face_color], dtype=np.uint8
             )
-            self._face_to_vert_mat = self._face_to_vert_mat.multiply(1.0 / sum[:, None])
+            self._dyn_face_intensity = np.asarray(self._dyn_face_intensity)
+        if self._face_to_vert_mat is not None:
+            self._face_to_vert_mat = csr_matrix(self._face_to_vert_mat)
+        if self.__dict__.get("_instance"):
+            self._expand_instance()
+        else:
+            self._instance = []
+
+    def _instance_index(self) -> dict[str, np.ndarray]:
+        """Get the concatenated vertex indices and element rows of all instances.
+
+        Returns:
+            dict[str, np.ndarray]: The instanced "vert", "rod", "tri" and "tet" entries.
+        """
+        result = {}
+        for key, slot in [("vert", -1), ("rod", 0), ("tri", 1), ("tet", 2)]:
+            index = [np.zeros(0, dtype=np.int64)]
+            for inst in self._instance:
+                if slot < 0:
+                    index.append(inst.map().ravel())
+                else:
+                    count = len(getattr(inst, key))
+                    index.append(inst.row(slot, count).ravel())
+            result[key] = np.concatenate(index)
+        return result
+
+    def _expand_instance(self):
+        """Expand the compact instanced state into the full scene arrays."""
+        n_vert = len(self._vert[1]) + sum(
+            inst.count() * len(inst.vert) for inst in self._instance
+        )
+        index = self._instance_index()
+        rest = _complement(index["vert"], n_vert)
+        vert_dmap = np.zeros(n_vert, dtype=self._vert[0].dtype)
+        vert = np.zeros((n_vert, 3), dtype=self._vert[1].dtype)
+        color = np.zeros((n_vert, 3), dtype=self._color.dtype)
+        vel = np.zeros((n_vert, 3))
+        vert_dmap[rest], vert[rest] = self._vert
+        color[rest], vel[rest] = self._color, self._vel
+        for inst in self._instance:
+            for j, map in enumerate(inst.map()):
+                vert[map] = _affine_vertex(inst.vert, inst.transform[j])
+                vert_dmap[map] = inst.dmap[j]
+                color[map] = self._pack_color(inst.color[j])
+                vel[map] = inst.velocity[j]
+        self._vert = (vert_dmap, vert)
+        self._color, self._vel = color, vel
+        for slot, (key, width) in enumerate([("rod", 2), ("tri", 3), ("tet", 4)]):
+            elm = getattr(self, f"_{key}")
+            n_elm = len(elm) + len(index[key])
+            if n_elm:
+                full = np.zeros((n_elm, width), dtype=self._index_dtype(n_vert))
+                if len(elm):
+                    full[_complement(index[key], n_elm)] = elm
+                for inst in self._instance:
+                    local = getattr(inst, key)
+                    if len(local):
+                        rows = inst.row(slot, len(local))
+                        for map, row in zip(inst.map(), rows):
+                            full[row] = map[local]
+                setattr(self, f"_{key}", full)
+
+    def _index_dtype(self, n: int) -> type:
+        """Get the index type for indexing into n entries.
+
+        Args:
+            n (int): The number of entries to index.
+
+        Returns:
+            type: The numpy index type.
+        """
+        index = self._precision.index
+        if index == "auto":
+            return np.uint32 if n < 2**32 else np.uint64
+        elif index == "uint32":
+            if n >= 2**32:
+                raise Exception(f"{n} entries do not fit in uint32 indices")
+            return np.uint32
+        elif index == "uint64":
+            return np.uint64
+        else:
+            raise Exception(f"unknown index type {index}")
+
+    def _pack_color(self, color: np.ndarray) -> np.ndarray:
+        """Convert floating point RGB values to the stored color type."""
+        if self._precision.color == "uint8":
+            return np.round(np.clip(color, 0.0, 1.0) * 255.0).astype(np.uint8)
         else:
-            self._face_to_vert_mat = None
+            return np.asarray(color).astype(self._precision.color, copy=False)
+
+    def _nbytes(self) -> tuple[int, int]:
+        """Get the bytes held by the bulk arrays, and the bytes at full precision.
+
+        Returns:
+            tuple[int, int]: The current bytes and the bytes with 64-bit entries.
+        """
+        arrays = [
+            self._vert[1],
+            self._color,
+            self._rod,
+            self._tri,
+            self._tet,
+            self._static_vert[1],
+            self._static_color,
+            self._static_tri,
+            self._stitch_ind,
+        ]
+        return (sum(a.nbytes for a in arrays), sum(8 * a.size for a in arrays))
 
     def report(self) -> "FixedScene":
         """Print a summary of the scene."""
@@ -641,6 +1043,12 @@ class FixedScene:
             data["#static_tri"] = len(self._static_tri)
         if len(self._stitch_ind) and len(self._stitch_w):
             data["#stitch_ind"] = len(self._stitch_ind)
+        if len(self._instance):
+            data["#instance"] = sum(inst.count() for inst in self._instance)
+        nbytes, full_nbytes = self._nbytes()
+        data["memory"] = (
+            f"{nbytes / 2**20:.1f}MB (saved {(full_nbytes - nbytes) / 2**20:.1f}MB)"
+        )
         for key, value in data.items():
             if isinstance(value, int):
                 data[key] = [f"{value:,}"]
@@ -670,7 +1078,6 @@ class FixedScene:
             color (np.ndarray): The vertex color of the scene.
         """
         if self._has_dyn_color:
-            assert self._face_to_vert_mat is not None
             assert self._area is not None
 
             max_area = 2.0
@@ -678,24 +1085,27 @@ class FixedScene:
             if "max-area" in hint:
                 max_area = hint["max-area"]
 
-            rat = np.zeros(len(self._tri))
-            face_color = np.zeros((len(self._tri), 3))
-            intensity = np.zeros(len(self._tri))
-            _compute_area_change(vert, self._tri, self._area, rat)
-
-            for i in range(len(face_color)):
-                if self._dyn_face_color[i] != EnumColor.NONE:
-                    val = max(0.0, min(1.0, (rat[i] - 1.0) / (max_area - 1.0)))
-                    intensity[i] = self._dyn_face_intensity[i]
-                    hue = 240.0 * (1.0 - val) / 360.0
-                    face_color[i] = np.array(colorsys.hsv_to_rgb(hue, 0.75, 1.0))
-            intensity = self._face_to_vert_mat.dot(intensity)
-            color = (1.0 - intensity[:, None]) * self._color + intensity[
-                :, None
-            ] * self._face_to_vert_mat.dot(face_color)
+            mat = self._face_to_vert()
+            color = np.empty((len(self._color), 3))
+            scale = 1.0 / 255.0 if self._color.dtype == np.uint8 else 1.0
+            _gather_vertex_color(
+                vert,
+                self._tri,
+                self._area,
+                self._dyn_face_color,
+                self._dyn_face_intensity,
+                max_area,
+                mat.indptr,
+                mat.indices,
+                mat.data,
+                self._color,
+                scale,
+                np.empty((len(self._tri), 4)),
+                color,
+            )
             return color
         else:
-            return self._color
+            return _unpack_color(self._color)
 
     def vertex(self, transform: bool = True) -> np.ndarray:
         """Get the vertices of the scene.
@@ -754,7 +1164,9 @@ class FixedScene:
                 )
                 tri = np.concatenate([self._tri, self._static_tri + len(vert)])
                 vert = np.concatenate([vert, static_vert], axis=0)
-                color = np.concatenate([color, self._static_color], axis=0)
+                color = np.concatenate(
+                    [color, _unpack_color(self._static_color)], axis=0
+                )
             else:
                 tri = self._tri
 
@@ -801,6 +1213,10 @@ class FixedScene:
                 raise Exception(f"file {path} already exists")
         else:
             os.makedirs(path)
+        index_type = self._index_dtype(
+            max(len(self._vert[1]), len(self._static_vert[1]))
+        )
+        position_type = np.dtype(self._precision.position)
         info_path = os.path.join(path, "info.toml")
         with open(info_path, "w") as f:
             f.write("[count]\n")
@@ -820,8 +1236,25 @@ class FixedScene:
             f.write(f"shell_vert_end = {self._shell_vert_range[1]}\n")
             f.write(f"rod_count = {self._rod_count}\n")
             f.write(f"shell_count = {self._shell_count}\n")
+            f.write(f"instance = {len(self._instance)}\n")
+            f.write(f"record = {len(self._record)}\n")
+            f.write("\n")
+
+            f.write("[precision]\n")
+            f.write(f'index = "{np.dtype(index_type).name}"\n')
+            f.write(f'position = "{position_type.name}"\n')
+            f.write(f'color = "{self._color.dtype.name}"\n')
             f.write("\n")
 
+            for i, inst in enumerate(self._instance):
+                f.write(f"[instance-{i}]\n")
+                f.write(f"count = {inst.count()}\n")
+                f.write(f"vert = {len(inst.vert)}\n")
+                f.write(f"rod = {len(inst.rod)}\n")
+                f.write(f"tri = {len(inst.tri)}\n")
+                f.write(f"tet = {len(inst.tet)}\n")
+                f.write("\n")
+
             for i, pin in enumerate(self._pin):
                 f.write(f"[pin-{i}]\n")
                 f.write(f"keyframe = {len(pin.keyframe)}\n")
@@ -855,55 +1288,98 @@ class FixedScene:
         self._displacement.astype(np.float64).tofile(
             os.path.join(bin_path, "displacement.bin")
         )
-        self._vert[0].astype(np.uint32).tofile(os.path.join(bin_path, "vert_dmap.bin"))
-        self._vert[1].astype(np.float64).tofile(os.path.join(bin_path, "vert.bin"))
-        self._color.astype(np.float32).tofile(os.path.join(bin_path, "color.bin"))
-        self._vel.astype(np.float32).tofile(os.path.join(bin_path, "vel.bin"))
+        # Instanced vertices and elements are left out of the flat arrays
+        # and written once per asset with a per-instance table
+        index = self._instance_index()
+        vert = _complement(index["vert"], len(self._vert[1]))
+        rod = self._rod[_complement(index["rod"], len(self._rod))]
+        tri = self._tri[_complement(index["tri"], len(self._tri))]
+        tet = self._tet[_complement(index["tet"], len(self._tet))]
+
+        self._vert[0][vert].astype(np.uint32).tofile(
+            os.path.join(bin_path, "vert_dmap.bin")
+        )
+        self._vert[1][vert].astype(position_type).tofile(
+            os.path.join(bin_path, "vert.bin")
+        )
+        self._color.tofile(os.path.join(bin_path, "color.bin"))
+        self._vel[vert].astype(np.float32).tofile(os.path.join(bin_path, "vel.bin"))
         if np.linalg.norm(self._uv) > 0:
             self._uv.astype(np.float32).tofile(os.path.join(bin_path, "uv.bin"))
 
-        if len(self._rod):
-            self._rod.astype(np.uint64).tofile(os.path.join(bin_path, "rod.bin"))
+        if len(rod):
+            rod.astype(index_type).tofile(os.path.join(bin_path, "rod.bin"))
         if len(self._rod_length_factor):
             self._rod_length_factor.astype(np.float32).tofile(
                 os.path.join(bin_path, "rod_length_factor.bin")
             )
-        if len(self._tri):
-            self._tri.astype(np.uint64).tofile(os.path.join(bin_path, "tri.bin"))
-        if len(self._tet):
-            self._tet.astype(np.uint64).tofile(os.path.join(bin_path, "tet.bin"))
+        if len(tri):
+            tri.astype(index_type).tofile(os.path.join(bin_path, "tri.bin"))
+        if len(tet):
+            tet.astype(index_type).tofile(os.path.join(bin_path, "tet.bin"))
+        for i, inst in enumerate(self._instance):
+            inst_dir = os.path.join(bin_path, f"instance-{i}")
+            os.makedirs(inst_dir)
+            inst.vert.astype(np.float64).tofile(os.path.join(inst_dir, "vert.bin"))
+            inst.block.astype(np.uint8).tofile(os.path.join(inst_dir, "block.bin"))
+            inst.rank.astype(np.uint64).tofile(os.path.join(inst_dir, "rank.bin"))
+            for key in ["rod", "tri", "tet"]:
+                elm = getattr(inst, key)
+                if len(elm):
+                    elm.astype(index_type).tofile(os.path.join(inst_dir, f"{key}.bin"))
+            inst.transform.astype(np.float64).tofile(
+                os.path.join(inst_dir, "transform.bin")
+            )
+            offset = np.hstack([inst.vert_offset, inst.elm_offset])
+            offset.astype(np.uint64).tofile(os.path.join(inst_dir, "offset.bin"))
+            inst.dmap.astype(np.uint32).tofile(os.path.join(inst_dir, "dmap.bin"))
+            inst.velocity.astype(np.float32).tofile(os.path.join(inst_dir, "vel.bin"))
         if len(self._static_vert):
             self._static_vert[0].astype(np.uint32).tofile(
                 os.path.join(bin_path, "static_vert_dmap.bin")
             )
-            self._static_vert[1].astype(np.float64).tofile(
+            self._static_vert[1].astype(position_type).tofile(
                 os.path.join(bin_path, "static_vert.bin")
             )
-            self._static_tri.astype(np.uint64).tofile(
+            self._static_tri.astype(index_type).tofile(
                 os.path.join(bin_path, "static_tri.bin")
             )
-            self._static_color.astype(np.float32).tofile(
-                os.path.join(bin_path, "static_color.bin")
-            )
+            self._static_color.tofile(os.path.join(bin_path, "static_color.bin"))
         if len(self._stitch_ind) and len(self._stitch_w):
-            self._stitch_ind.astype(np.uint64).tofile(
+            self._stitch_ind.astype(index_type).tofile(
                 os.path.join(bin_path, "stitch_ind.bin")
             )
             self._stitch_w.astype(np.float32).tofile(
                 os.path.join(bin_path, "stitch_w.bin")
             )
+        if len(self._record):
+            self._record.astype(index_type).tofile(
+                os.path.join(bin_path, "record-ind.bin")
+            )
         for i, pin in enumerate(self._pin):
             with open(os.path.join(bin_path, f"pin-ind-{i}.bin"), "wb") as f:
-                np.array(pin.index, dtype=np.uint64).tofile(f)
+                np.array(pin.index, dtype=index_type).tofile(f)
             if len(pin.keyframe):
                 target_dir = os.path.join(bin_path, f"pin-{i}")
                 os.makedirs(target_dir)
                 with open(os.path.join(bin_path, f"pin-timing-{i}.bin"), "wb") as f:
                     time_array = [entry.time for entry in pin.keyframe]
                     np.array(time_array, dtype=np.float64).tofile(f)
+                affine = [entry.transform is not None for entry in pin.keyframe]
+                with open(os.path.join(bin_path, f"pin-kind-{i}.bin"), "wb") as f:
+                    np.array(affine, dtype=np.uint8).tofile(f)
+                if any(affine):
+                    transform = [
+                        e.transform for e in pin.keyframe if e.transform is not None
+                    ]
+                    with open(
+                        os.path.join(bin_path, f"pin-transform-{i}.bin"), "wb"
+                    ) as f:
+                        np.array(transform, dtype=np.float64).tofile(f)
                 for j, entry in enumerate(pin.keyframe):
-                    with open(os.path.join(target_dir, f"{j}.bin"), "wb") as f:
-                        np.array(entry.position, dtype=np.float64).tofile(f)
+                    if entry.transform is None:
+                        with open(os.path.join(target_dir, f"{j}.bin"), "wb") as f:
+                            np.array(entry.position, dtype=position_type).tofile(f)
             if len(pin.spin):
                 spin_dir = os.path.join(path, "spin")
                 os.makedirs(spin_dir, exist_ok=True)
@@ -992,6 +1468,7 @@ class FixedScene:
             pin_data (list[PinData]): A list of pinning data.
         """
         self._pin = pin
+        self._kinematics = None
 
     def set_spin(self, spin: list[SpinData]):
         """Set the spinning data of all the objects.
@@ -1011,9 +1488,12 @@ class FixedScene:
             tri (np.ndarray): The triangle elements of the static mesh.
             color (np.ndarray): The colors of the static mesh.
         """
-        self._static_vert = vert
-        self._static_tri = tri
-        self._static_color = color
+        self._static_vert = (
+            vert[0].astype(np.uint32, copy=False),
+            vert[1].astype(self._precision.position, copy=False),
+        )
+        self._static_tri = tri.astype(self._index_dtype(len(vert[1])), copy=False)
+        self._static_color = self._pack_color(color)
 
     def set_stitch(self, ind: np.ndarray, w: np.ndarray):
         """Set the stitch data.
@@ -1022,59 +1502,167 @@ class FixedScene:
             ind (np.ndarray): The stitch indices.
             w (np.ndarray): The stitch weights.
         """
-        self._stitch_ind = ind
+        self._stitch_ind = ind.astype(self._index_dtype(len(self._vert[1])), copy=False)
         self._stitch_w = w
 
-    def time(self, time: float) -> np.ndarray:
-        """Compute the vertex positions at a specific time.
+    def set_record(self, ind: np.ndarray):
+        """Set the vertices recorded in the strided output frames.
 
         Args:
-            time (float): The time to compute the vertex positions.
+            ind (np.ndarray): The sorted indices of the recorded vertices.
+        """
+        self._record = ind.astype(self._index_dtype(len(self._vert[1])), copy=False)
 
-        Returns:
-            np.ndarray: The vertex positions at the specified time.
+    @property
+    def record(self) -> np.ndarray:
+        """Get the indices of the recorded vertices, empty if all are recorded."""
+        return self._record
+
+    def set_instance(self, instance: list[InstanceData]):
+        """Set the instancing data.
+
+        The full vertex and element arrays must already hold the expanded
+        instances. The instancing data is used to store and export them compactly.
+
+        Args:
+            instance (list[InstanceData]): A list of instancing data.
         """
-        vert = self._vert[1].copy()
-        for pin in self._pin:
-            last_time = pin.keyframe[-1].time if len(pin.keyframe) else 0.0
-            last_position = (
-                pin.keyframe[-1].position if len(pin.keyframe) else vert[pin.index]
-            )
-            for i, entry in enumerate(pin.keyframe):
-                next_entry = pin.keyframe[i + 1] if i + 1 < len(pin.keyframe) else None
-                if entry.time >= last_time:
-                    vert[pin.index] = last_position
-                    break
-                elif next_entry is not None:
-                    if time >= entry.time and time < next_entry.time:
-                        t1, t2 = entry.time, next_entry.time
-                        q1, q2 = entry.position, next_entry.position
-                        r = (time - t1) / (t2 - t1)
-                        if pin.transition == "smooth":
-                            r = r * r * (3.0 - 2.0 * r)
-                        vert[pin.index] = q1 * (1 - r) + q2 * r
-                        break
+        self._instance = instance
+
+    def _kinematic_table(self) -> dict:
+        """Get the keyframe tables of all pins, building them on first use.
+
+        Pins whose keyframes are all affine keep their stacked transforms.
+        Dense keyframe positions of the other pins are stacked into one
+        array so that the keyframe pair active for each of their vertices
+        can be fetched with a single gather.
+
+        Returns:
+            dict: The per-vertex "displacement", whether any vertex is
+            "moving", the per-pin "index", "timing" and "transform" arrays,
+            the stacked "position" array, and the "row" of each densely
+            pinned vertex in the first keyframe of its pin together with
+            its pin "stride".
+        """
+        if self._kinematics is None:
+            index, timing, transform = [], [], []
+            position, row, stride = [], [], []
+            start = 0
+            for pin in self._pin:
+                ind = np.asarray(pin.index, dtype=np.int64)
+                index.append(ind)
+                timing.append(np.array([entry.time for entry in pin.keyframe]))
+                affine = [entry.transform is not None for entry in pin.keyframe]
+                if len(pin.keyframe) and all(affine):
+                    transform.append(np.array([e.transform for e in pin.keyframe]))
+                else:
+                    transform.append(None)
+                    if len(pin.keyframe):
+                        rest = self._vert[1][ind]
+                        position.extend(e.resolve(rest) for e in pin.keyframe)
+                        row.append(start + np.arange(len(ind)))
+                        stride.append(np.full(len(ind), len(ind)))
+                        start += len(pin.keyframe) * len(ind)
+            self._kinematics = {
+                "displacement": self._displacement[self._vert[0]],
+                "moving": bool(np.any(self._vel)),
+                "index": index,
+                "timing": timing,
+                "transform": transform,
+                "position": _concat(position).reshape(-1, 3),
+                "row": _concat(row).astype(np.int64),
+                "stride": _concat(stride).astype(np.int64),
+            }
+        return self._kinematics
+
+    def time(self, time: Union[float, np.ndarray]) -> np.ndarray:
+        """Compute the vertex positions at a specific time or at many times.
+
+        Args:
+            time (float or np.ndarray): The time or a 1D array of times.
+
+        Returns:
+            np.ndarray: The (N, 3) vertex positions at the specified time, or a (T, N, 3) block for an array of T times.
+        """
+        times = np.atleast_1d(np.asarray(time, dtype=np.float64))
+        table = self._kinematic_table()
+        vert = np.repeat(self._vert[1][None, :, :], len(times), axis=0)
+
+        # Pick the active keyframe pair of every pin
+        coeff = []
+        for pin, timing in zip(self._pin, table["timing"]):
+            if len(timing):
+                last = len(timing) - 1
+                seg = np.searchsorted(timing, times, side="right") - 1
+                end = np.searchsorted(timing, timing[-1], side="left")
+                inside = (seg >= 0) & (seg < end)
+                seg = np.where(inside, seg, last)
+                nxt = np.minimum(seg + 1, last)
+                r = np.zeros(len(times))
+                t1, t2 = timing[seg[inside]], timing[nxt[inside]]
+                r[inside] = (times[inside] - t1) / (t2 - t1)
+                if pin.transition == "smooth":
+                    r = r * r * (3.0 - 2.0 * r)
+                coeff.append((seg, nxt, r))
+            else:
+                coeff.append(None)
+
+        # Gather all densely pinned vertices at once
+        first, second, ratio = [], [], []
+        for ind, transform, c in zip(table["index"], table["transform"], coeff):
+            if c is not None and transform is None:
+                seg, nxt, r = c
+                first.append(np.repeat(seg[:, None], len(ind), axis=1))
+                second.append(np.repeat(nxt[:, None], len(ind), axis=1))
+                ratio.append(np.repeat(r[:, None], len(ind), axis=1))
+        if len(first):
+            row, stride = table["row"], table["stride"]
+            first, second = np.hstack(first), np.hstack(second)
+            ratio = np.hstack(ratio)[:, :, None]
+            q1 = table["position"][row + first * stride]
+            q2 = table["position"][row + second * stride]
+            target = q1 * (1 - ratio) + q2 * ratio
+
+        offset = 0
+        for pin, ind, transform, c in zip(
+            self._pin, table["index"], table["transform"], coeff
+        ):
+            if transform is not None:
+                seg, nxt, r = c
+                r = r[:, None, None]
+                blend = transform[seg] * (1 - r) + transform[nxt] * r
+                rest = self._vert[1][ind]
+                linear = np.swapaxes(blend[:, :, :3], 1, 2)
+                vert[:, ind] = rest @ linear + blend[:, None, :, 3]
+            elif c is not None:
+                vert[:, ind] = target[:, offset : offset + len(ind)]
+                offset += len(ind)
             for p in pin.spin:
-                t = min(time, p.t_end) - p.t_start
-                if t > 0:
+                t = np.minimum(times, p.t_end) - p.t_start
+                active = np.where(t > 0)[0]
+                if len(active):
                     radian_velocity = p.angular_velocity / 180.0 * np.pi
-                    angle = radian_velocity * t
+                    angle = (radian_velocity * t[active])[:, None, None]
                     axis = p.axis / np.linalg.norm(p.axis)
 
                     # Rodrigues rotation formula
                     cos_theta = np.cos(angle)
                     sin_theta = np.sin(angle)
-                    points = vert[pin.index] - p.center
+                    points = vert[active[:, None], ind] - p.center
                     rotated = (
                         points * cos_theta
                         + np.cross(axis, points) * sin_theta
-                        + np.outer(np.dot(points, axis), axis) * (1.0 - cos_theta)
+                        + (points @ axis)[:, :, None] * axis * (1.0 - cos_theta)
                     )
-                    vert[pin.index] = rotated + p.center
+                    vert[active[:, None], ind] = rotated + p.center
 
-        vert += time * self._vel
-        vert += self._displacement[self._vert[0]]
-        return vert
+        if table["moving"]:
+            vert += times[:, None, None] * self._vel
+        vert += table["displacement"]
+        if np.ndim(time) == 0:
+            return vert[0]
+        else:
+            return vert
 
     def check_intersection(self) -> "FixedScene":
         """Check for self-intersections and intersections with the static mesh.
@@ -1144,7 +1732,7 @@ class FixedScene:
                     self._static_vert[1] + self._displacement[self._static_vert[0]]
                 )
                 static_color = np.zeros_like(static_vert)
-                static_color[:, :] = self._static_color
+                static_color[:, :] = _unpack_color(self._static_color)
                 if len(tri):
                     tri = np.vstack([tri, self._static_tri + len(vert)])
                 else:
@@ -1349,17 +1937,24 @@ class Scene:
                 result = max(result, np.max(vert[:, _axis[axis]]))
         return result
 
-    def build(self) -> FixedScene:
+    def build(self, precision: Optional[Precision] = None) -> FixedScene:
         """Build the fixed scene from the current scene.
 
+        Per-object contributions (transformed vertices, remapped elements, colors
+        and pins) are cached on each object and only recomputed when the object
+        or anything preceding it in the vertex ordering has changed.
+
+        Args:
+            precision (Optional[Precision], optional): The storage precision of the fixed scene. Defaults to Precision().
+
         Returns:
             FixedScene: The built fixed scene.
         """
         pbar = tqdm(total=10, desc="build", ncols=70)
         for _, obj in self._object.items():
             obj.update_static()
+            obj._dirty = False
 
-        concat_count = 0
         dyn_objects = [
             (name, obj) for name, obj in self._object.items() if not obj.static
         ]
@@ -1369,64 +1964,23 @@ class Scene:
             if obj._color is None:
                 obj.default_color(r, g, b)
 
-        def add_entry(
-            map,
-            entry,
-        ):
-            nonlocal concat_count
-            for e in entry:
-                for vi in e:
-                    if map[vi] == -1:
-                        map[vi] = concat_count
-                        concat_count += 1
-
-        tag = {}
-        for name, obj in dyn_objects:
-            vert = obj.get("V")
-            if vert is not None:
-                tag[name] = [-1] * len(vert)
-
         pbar.update(1)
-        for name, obj in dyn_objects:
-            if obj.get("T") is None:
-                map = tag[name]
-                edge = obj.get("E")
-                if edge is not None:
-                    add_entry(
-                        map,
-                        edge,
-                    )
-        rod_vert_start, rod_vert_end = 0, concat_count
-
-        for name, obj in dyn_objects:
-            if obj.get("T") is None:
-                map, tri = tag[name], obj.get("F")
-                if tri is not None:
-                    add_entry(
-                        map,
-                        tri,
-                    )
-        shell_vert_start, shell_vert_end = rod_vert_end, concat_count
+        block_count = np.zeros((n, 4), dtype=np.int64)
+        for i, (_, obj) in enumerate(dyn_objects):
+            block, _ = obj._topology()
+            block_count[i] = np.bincount(block, minlength=4)
+        block_start = np.concatenate([[0], np.cumsum(block_count.sum(axis=0))])
+        block_offset = block_start[:4] + np.cumsum(block_count, axis=0) - block_count
+        concat_count = int(block_start[4])
+        rod_vert_start, rod_vert_end = 0, int(block_start[1])
+        shell_vert_start, shell_vert_end = rod_vert_end, int(block_start[2])
 
         pbar.update(1)
-        for name, obj in dyn_objects:
-            map, tri = tag[name], obj.get("F")
-            if tri is not None:
-                add_entry(
-                    map,
-                    tri,
-                )
+        remap = {}
+        for i, (name, obj) in enumerate(dyn_objects):
+            remap[name] = obj._remap(block_offset[i])
 
         pbar.update(1)
-        for name, obj in dyn_objects:
-            vert = obj.get("V")
-            if vert is not None:
-                map = tag[name]
-                for i in range(len(vert)):
-                    if map[i] == -1:
-                        map[i] = concat_count
-                        concat_count += 1
-
         dmap = {}
         concat_displacement = []
         concat_vert_dmap = np.zeros(concat_count, dtype=np.uint32)
@@ -1447,12 +2001,7 @@ class Scene:
         concat_static_color = []
         concat_stitch_ind = []
         concat_stitch_w = []
-
-        def vec_map(map, elm):
-            result = elm.copy()
-            for i in range(len(elm)):
-                result[i] = [map[vi] for vi in elm[i]]
-            return result
+        concat_record = []
 
         for name, obj in self._object.items():
             dmap[name] = len(concat_displacement)
@@ -1461,86 +2010,96 @@ class Scene:
 
         pbar.update(1)
         for name, obj in dyn_objects:
-            map = tag[name]
-            vert, uv = obj.vertex(False), obj._uv
-            if vert is not None:
-                concat_vert[map] = vert
-                concat_vert_dmap[map] = [dmap[name]] * len(map)
-                concat_vel[map] = obj._velocity
-                concat_color[map] = obj.get("color")
-            if uv is not None:
-                concat_uv[map] = uv
+            map = remap[name]["map"]
+            concat_vert[map] = obj._rest_vertex()
+            concat_vert_dmap[map] = dmap[name]
+            concat_vel[map] = obj._velocity
+            concat_color[map] = obj._vertex_color()
+            if obj._uv is not None:
+                concat_uv[map] = obj._uv
 
         pbar.update(1)
-        for name, obj in dyn_objects:
-            map = tag[name]
-            edge = obj.get("E")
+        elm_offset = np.zeros((n, 3), dtype=np.int64)
+        rod_count, tri_count, tet_count = 0, 0, 0
+        for i, (name, obj) in enumerate(dyn_objects):
+            edge = remap[name].get("E")
+            elm_offset[i, 0] = rod_count
             if edge is not None and obj.get("T") is None:
-                concat_rod.extend(vec_map(map, edge))
-                concat_rod_length_factor.extend([obj._rod_length_factor] * len(edge))
-        rod_count = len(concat_rod)
+                concat_rod.append(edge)
+                rod_count += len(edge)
+                concat_rod_length_factor.append(
+                    np.full(len(edge), obj._rod_length_factor)
+                )
 
         pbar.update(1)
-        for name, obj in dyn_objects:
-            map = tag[name]
-            tri = obj.get("F")
+        for i, (name, obj) in enumerate(dyn_objects):
+            tri = remap[name].get("F")
             if tri is not None and obj.get("T") is None:
-                t = vec_map(map, tri)
-                concat_tri.extend(t)
-                concat_dyn_tri_color.extend([obj._dyn_color] * len(t))
-                concat_dyn_tri_intensity.extend([obj._dyn_intensity] * len(t))
-        shell_count = len(concat_tri)
+                elm_offset[i, 1] = tri_count
+                concat_tri.append(tri)
+                tri_count += len(tri)
+                concat_dyn_tri_color.append(
+                    np.full(len(tri), obj._dyn_color.value, dtype=np.uint8)
+                )
+                concat_dyn_tri_intensity.append(np.full(len(tri), obj._dyn_intensity))
+        shell_count = tri_count
 
         pbar.update(1)
-        for name, obj in dyn_objects:
-            map = tag[name]
-            tet, tri = obj.get("T"), obj.get("F")
+        for i, (name, obj) in enumerate(dyn_objects):
+            tet, tri = remap[name].get("T"), remap[name].get("F")
             if tet is not None and tri is not None:
-                t = vec_map(map, tri)
-                concat_tri.extend(t)
-                concat_dyn_tri_color.extend([obj._dyn_color] * len(t))
-                concat_dyn_tri_intensity.extend([obj._dyn_intensity] * len(t))
+                elm_offset[i, 1] = tri_count
+                concat_tri.append(tri)
+                tri_count += len(tri)
+                concat_dyn_tri_color.append(
+                    np.full(len(tri), obj._dyn_color.value, dtype=np.uint8)
+                )
+                concat_dyn_tri_intensity.append(np.full(len(tri), obj._dyn_intensity))
 
-        for name, obj in dyn_objects:
-            map = tag[name]
-            tet = obj.get("T")
+        for i, (name, obj) in enumerate(dyn_objects):
+            tet = remap[name].get("T")
+            elm_offset[i, 2] = tet_count
             if tet is not None:
-                concat_tet.extend(vec_map(map, tet))
+                concat_tet.append(tet)
+                tet_count += len(tet)
 
         pbar.update(1)
         for name, obj in dyn_objects:
-            map = tag[name]
-            for p in obj._pin:
+            pin_index = obj._pin_index(remap[name]["map"])
+            for p, index in zip(obj._pin, pin_index):
                 concat_pin.append(
                     PinData(
-                        index=[map[vi] for vi in p.index],
-                        keyframe=p.keyframe,
+                        index=index,
+                        keyframe=[k.rebase(obj._affine()) for k in p.keyframe],
                         spin=p.spinner,
                         should_unpin=p.should_unpin,
                         pull_strength=p.pull_strength,
                         transition=p.transition,
                     )
                 )
-            stitch_ind = obj.get("Ind")
+            if obj._record is not None:
+                concat_record.append(remap[name]["map"][obj._record])
+            stitch_ind = remap[name].get("Ind")
             stitch_w = obj.get("W")
             if stitch_ind is not None and stitch_w is not None:
-                concat_stitch_ind.extend(vec_map(map, stitch_ind))
-                concat_stitch_w.extend(stitch_w)
+                concat_stitch_ind.append(stitch_ind)
+                concat_stitch_w.append(stitch_w)
 
         pbar.update(1)
+        static_count = 0
         for name, obj in self._object.items():
             if obj.static:
-                color = obj.get("color")
-                offset = len(concat_static_vert)
-                tri, vert = obj.get("F"), obj.get("V")
+                tri, vert = obj.get("F"), obj._rest_vertex()
                 if tri is not None:
-                    concat_static_tri.extend(tri + offset)
-                if vert is not None:
-                    concat_static_vert.extend(obj.apply_transform(vert, False))
-                    concat_static_color.extend([color] * len(vert))
-                    concat_static_vert_dmap.extend([dmap[name]] * len(vert))
+                    concat_static_tri.append(tri + static_count)
+                concat_static_vert.append(vert)
+                concat_static_color.append(obj._vertex_color())
+                concat_static_vert_dmap.append(np.full(len(vert), dmap[name]))
+                static_count += len(vert)
 
         self._save_func()
+        reused = sum(not obj._dirty for obj in self._object.values())
+        pbar.set_postfix_str(f"reused {reused}/{len(self._object)}")
         pbar.update(1)
 
         fixed = FixedScene(
@@ -1549,38 +2108,88 @@ class Scene:
             concat_displacement,
             (concat_vert_dmap, concat_vert),
             concat_color,
-            concat_dyn_tri_color,
-            concat_dyn_tri_intensity,
+            _concat(concat_dyn_tri_color),
+            _concat(concat_dyn_tri_intensity),
             concat_vel,
             concat_uv,
-            np.array(concat_rod),
-            np.array(concat_rod_length_factor),
-            np.array(concat_tri),
-            np.array(concat_tet),
+            _concat(concat_rod),
+            _concat(concat_rod_length_factor),
+            _concat(concat_tri),
+            _concat(concat_tet),
             self._wall,
             self._sphere,
             (rod_vert_start, rod_vert_end),
             (shell_vert_start, shell_vert_end),
             rod_count,
             shell_count,
+            precision,
         )
 
         if len(concat_pin):
             fixed.set_pin(concat_pin)
 
+        if len(concat_record):
+            fixed.set_record(np.unique(np.concatenate(concat_record)))
+
         if len(concat_static_vert):
             fixed.set_static(
-                (np.array(concat_static_vert_dmap), np.array(concat_static_vert)),
-                np.array(concat_static_tri),
-                np.array(concat_static_color),
+                (_concat(concat_static_vert_dmap), _concat(concat_static_vert)),
+                _concat(concat_static_tri),
+                _concat(concat_static_color),
             )
 
         if len(concat_stitch_ind) and len(concat_stitch_w):
             fixed.set_stitch(
-                np.array(concat_stitch_ind),
-                np.array(concat_stitch_w),
+                _concat(concat_stitch_ind),
+                _concat(concat_stitch_w),
             )
 
+        group: dict[str, list[int]] = {}
+        for i, (_, obj) in enumerate(dyn_objects):
+            if obj._instanceable():
+                group.setdefault(obj._asset.fetch.hash(obj._name), []).append(i)
+        concat_instance = []
+        for member in group.values():
+            if len(member) > 1:
+                obj = dyn_objects[member[0]][1]
+                vert, tet = obj.get("V"), obj.get("T")
+                block, rank = obj._topology()
+                rod, tri = obj.get("E"), obj.get("F")
+                elm = [
+                    (
+                        np.zeros((0, 2), dtype=np.int64)
+                        if rod is None or tet is not None
+                        else rod
+                    ),
+                    np.zeros((0, 3), dtype=np.int64) if tri is None else tri,
+                    np.zeros((0, 4), dtype=np.int64) if tet is None else tet,
+                ]
+                objs = [dyn_objects[i][1] for i in member]
+                concat_instance.append(
+                    InstanceData(
+                        vert=np.asarray(vert, dtype=np.float64),
+                        block=block,
+                        rank=rank,
+                        rod=np.asarray(elm[0], dtype=np.int64),
+                        tri=np.asarray(elm[1], dtype=np.int64),
+                        tet=np.asarray(elm[2], dtype=np.int64),
+                        transform=np.array([o._affine() for o in objs]),
+                        vert_offset=block_offset[member],
+                        elm_offset=elm_offset[member],
+                        dmap=np.array(
+                            [dmap[dyn_objects[i][0]] for i in member], dtype=np.uint32
+                        ),
+                        velocity=np.array(
+                            [o._velocity for o in objs], dtype=np.float64
+                        ),
+                        color=np.array(
+                            [o.get("color") for o in objs], dtype=np.float64
+                        ),
+                    )
+                )
+        if len(concat_instance):
+            fixed.set_instance(concat_instance)
+
         return fixed
 
 
@@ -1591,8 +2200,22 @@ class Object:
         self._asset = asset
         self._name = name
         self._static = False
+        self._cache: dict[str, tuple] = {}
+        self._dirty = False
         self.clear()
 
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_cache"] = {}
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._cache = {}
+        self._dirty = False
+        if "_record" not in state:
+            self._record = None
+
     @property
     def name(self) -> str:
         """Get name of the object."""
@@ -1620,6 +2243,7 @@ class Object:
         self._normalize = False
         self._stitch = None
         self._uv = None
+        self._record: Optional[list[int]] = None
 
     def report(self):
         """Report the object data."""
@@ -2031,6 +2655,162 @@ class Object:
                 vert_flag[i] = 1
         self._static = np.sum(vert_flag) == len(vert)
 
+    def _cached(self, name: str, key: tuple, compute):
+        """Get a cached build contribution, recomputing it when the key changes.
+
+        Args:
+            name (str): The name of the cache entry.
+            key (tuple): The key the cached value was computed for.
+            compute (Callable): The function computing the value on a miss.
+
+        Returns:
+            Any: The cached or freshly computed value.
+        """
+        entry = self._cache.get(name)
+        if entry is not None and entry[0] == key:
+            return entry[1]
+        else:
+            self._dirty = True
+            value = compute()
+            self._cache[name] = (key, value)
+            return value
+
+    def _transform_key(self) -> tuple:
+        """Get the cache key of the asset and the transformation state."""
+        key = (
+            self._asset.fetch.hash(self._name),
+            self._rotation.tobytes(),
+            float(self._scale),
+            self._normalize,
+        )
+        if self._normalize:
+            key += (
+                np.asarray(self._center).tobytes(),
+                np.asarray(self._bbox).tobytes(),
+            )
+        return key
+
+    def _topology(self) -> tuple[np.ndarray, np.ndarray]:
+        """Get the concatenation block and the rank of each vertex in its block.
+
+        Block 0 holds rod vertices, 1 shell vertices, 2 solid surface vertices
+        and 3 the remaining vertices. Within a block, vertices are ranked by
+        their first appearance in the elements.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: The block and rank of each vertex.
+        """
+
+        def compute():
+            vert, tet = self.get("V"), self.get("T")
+            assert vert is not None
+            rank = np.full(len(vert), -1, dtype=np.int64)
+            block = np.full(len(vert), 3, dtype=np.int8)
+            if tet is None:
+                entries = [(0, self.get("E")), (1, self.get("F"))]
+            else:
+                entries = [(2, self.get("F"))]
+            for i, elm in entries:
+                if elm is not None:
+                    free = rank == -1
+                    _assign_index(rank, elm, 0)
+                    block[free & (rank != -1)] = i
+            rest = np.where(rank == -1)[0]
+            rank[rest] = np.arange(len(rest))
+            return block, rank
+
+        return self._cached("topology", (self._asset.fetch.hash(self._name),), compute)
+
+    def _remap(self, offset: np.ndarray) -> dict[str, np.ndarray]:
+        """Get the concatenated vertex indices and the remapped elements.
+
+        Args:
+            offset (np.ndarray): The concatenated index where each block of this object starts.
+
+        Returns:
+            dict[str, np.ndarray]: The index map and the remapped E, F, T and Ind arrays.
+        """
+
+        def compute():
+            block, rank = self._topology()
+            map = offset[block] + rank
+            result = {"map": map}
+            for key in ["E", "F", "T", "Ind"]:
+                elm = self.get(key)
+                if elm is not None:
+                    result[key] = map[np.asarray(elm, dtype=np.int64)]
+            return result
+
+        stitch = self.get("Ind")
+        key = (
+            self._asset.fetch.hash(self._name),
+            offset.tobytes(),
+            None if stitch is None else np.asarray(stitch).tobytes(),
+        )
+        return self._cached("remap", key, compute)
+
+    def _pin_index(self, map: np.ndarray) -> list[list[int]]:
+        """Get the concatenated vertex indices of each pin.
+
+        Args:
+            map (np.ndarray): The concatenated vertex indices of this object.
+
+        Returns:
+            list[list[int]]: The remapped indices of each pin.
+        """
+
+        def compute():
+            return [
+                map[np.asarray(p.index, dtype=np.int64)].tolist() for p in self._pin
+            ]
+
+        key = (map.tobytes(),) + tuple(
+            np.asarray(p.index, dtype=np.int64).tobytes() for p in self._pin
+        )
+        return self._cached("pin", key, compute)
+
+    def _affine(self) -> np.ndarray:
+        """Get the 3x4 affine transform from the asset to the untranslated object."""
+        transform = self._scale * self._rotation
+        shift = np.zeros(3)
+        if self._normalize:
+            transform = transform / np.max(self._bbox)
+            shift = -transform @ np.asarray(self._center).ravel()
+        return np.hstack([transform, shift[:, None]])
+
+    def _rest_vertex(self) -> np.ndarray:
+        """Get the transformed but untranslated vertices of the object."""
+
+        def compute():
+            vert = self.get("V")
+            assert vert is not None
+            return _affine_vertex(vert, self._affine())
+
+        return self._cached("vertex", self._transform_key(), compute)
+
+    def _instanceable(self) -> bool:
+        """Check whether the object can share its asset with other instances."""
+        return (
+            not self.static
+            and self._stitch is None
+            and np.asarray(self.get("color")).shape == (3,)
+        )
+
+    def _vertex_color(self) -> np.ndarray:
+        """Get the per-vertex color of the object."""
+        vert = self.get("V")
+        assert vert is not None
+        key = (
+            None if self._color is None else np.asarray(self._color).tobytes(),
+            tuple(self._static_color),
+            tuple(self._default_color),
+            self.static,
+            len(vert),
+        )
+        return self._cached(
+            "color", key, lambda: np.broadcast_to(self.get("color"), (len(vert), 3))
+        )
+
     def pin(self, ind: Optional[list[int]] = None) -> PinHolder:
         """Set specified vertices as pinned.
 
@@ -2052,6 +2832,27 @@ class Object:
         self._pin.append(holder)
         return holder
 
+    def record(self, ind: Optional[list[int]] = None) -> "Object":
+        """Record only selected vertices in the strided output frames.
+
+        Once any object selects vertices, frames other than the full
+        snapshots hold only the selected vertices of all the objects.
+        Repeated calls extend the selection.
+
+        Args:
+            ind (Optional[list[int]], optional): The indices of the vertices to record, e.g. from grab().
+            If None, all vertices of the object are recorded. Defaults to None.
+
+        Returns:
+            Object: The object.
+        """
+        if self.static:
+            raise Exception("object is static")
+        if ind is None:
+            ind = list(range(len(self.vertex(False))))
+        self._record = sorted(set(self._record or []) | set(ind))
+        return self
+
     def stitch(self, name: str) -> "Object":
         """Apply stitch to the object.
 
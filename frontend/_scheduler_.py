@@ -0,0 +1,435 @@
+# File: _scheduler_.py
+# Author: Ryoichi Ando (ryoichi.ando@zozo.com)
+# License: Apache v2.0
+
+from ._utils_ import Utils
+import pandas as pd
+import os
+import threading
+import time
+from typing import Any, Optional, Union
+
+QUEUED = "queued"
+RUNNING = "running"
+FINISHED = "finished"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+
+class Job:
+    """Class to track a solver run queued on a scheduler."""
+
+    def __init__(self, session: Any, param: Any, retries: int):
+        """Initialize the Job class.
+
+        Args:
+            session (Session): The session to run.
+            param (Param): The simulation parameters, copied at submission.
+            retries (int): How many times a failed run is started again.
+        """
+        self._session = session
+        self._param = param
+        self._retries = retries
+        self._status = QUEUED
+        self._attempts = 0
+        self._gpu: Optional[int] = None
+        self._returncode: Optional[int] = None
+        self._error: Optional[Exception] = None
+        self._cancel = False
+        self._submitted = time.time()
+        self._started: Optional[float] = None
+        self._ended: Optional[float] = None
+        self._done = threading.Event()
+
+    @property
+    def name(self) -> str:
+        """Get the name of the session."""
+        return self._session.info.name
+
+    @property
+    def session(self) -> Any:
+        """Get the session."""
+        return self._session
+
+    @property
+    def status(self) -> str:
+        """Get the status: queued, running, finished, failed or cancelled."""
+        return self._status
+
+    @property
+    def attempts(self) -> int:
+        """Get the number of times the solver was started."""
+        return self._attempts
+
+    @property
+    def gpu(self) -> Optional[int]:
+        """Get the device the job runs or last ran on."""
+        return self._gpu
+
+    @property
+    def returncode(self) -> Optional[int]:
+        """Get the exit code of the last run."""
+        return self._returncode
+
+    @property
+    def error(self) -> Optional[Exception]:
+        """Get the exception raised when the solver could not be started."""
+        return self._error
+
+    def done(self) -> bool:
+        """Check if the job has finished, failed or was cancelled.
+
+        Returns:
+            bool: True if the job will not run again, False otherwise.
+        """
+        return self._done.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Wait for the job to finish, fail or be cancelled.
+
+        Args:
+            timeout (Optional[float], optional): The maximum time to wait in seconds. Defaults to None.
+
+        Returns:
+            bool: True if the job is done, False on timeout.
+        """
+        return self._done.wait(timeout)
+
+
+class Scheduler:
+    """Class to run queued sessions concurrently, each pinned to one GPU.
+
+    Jobs are started in submission order as soon as a slot is free. Each
+    running job gets the least loaded device through ``CUDA_VISIBLE_DEVICES``.
+    A run fails when the solver exits without writing ``finished.txt``.
+    A failed run is started again while it has retries left, resuming from
+    its latest checkpoint when there is one.
+    """
+
+    def __init__(
+        self,
+        max_jobs: Optional[int] = None,
+        gpus: Optional[list[int]] = None,
+        program: Optional[str] = None,
+        retries: int = 0,
+        poll: float = 0.5,
+    ):
+        """Initialize the Scheduler class.
+
+        Args:
+            max_jobs (Optional[int], optional): The maximum number of concurrent runs. Defaults to one per device.
+            gpus (Optional[list[int]], optional): The devices to use. Defaults to all the devices reported by ``nvidia-smi``. An empty list leaves ``CUDA_VISIBLE_DEVICES`` untouched.
+            program (Optional[str], optional): The solver executable. Defaults to the release build of the project.
+            retries (int, optional): The default number of retries of a failed run. Defaults to 0.
+            poll (float, optional): The interval in seconds to check the running solvers. Defaults to 0.5.
+        """
+        if gpus is None:
+            gpus = list(range(Utils.get_gpu_count()))
+        if max_jobs is None:
+            max_jobs = max(1, len(gpus))
+        if max_jobs < 1:
+            raise ValueError("max_jobs must be positive")
+        self._gpus = list(gpus)
+        self._max_jobs = max_jobs
+        self._program = program
+        self._retries = retries
+        self._poll = poll
+        self._jobs: list[Job] = []
+        self._running: list[Job] = []
+        self._lock = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+
+    def submit(self, session: Any, param: Any, retries: Optional[int] = None) -> Job:
+        """Queue a session to run.
+
+        Args:
+            session (Session): The initialized session.
+            param (Param): The simulation parameters.
+            retries (Optional[int], optional): The number of retries of a failed run. Defaults to that of the scheduler.
+
+        Returns:
+            Job: The queued job.
+        """
+        session._check_ready()
+        job = Job(session, param.copy(), self._retries if retries is None else retries)
+        with self._lock:
+            if any(
+                not other.done() and other.session.info.path == session.info.path
+                for other in self._jobs
+            ):
+                raise ValueError(f"Session {job.name} is already scheduled")
+            self._jobs.append(job)
+            session._job = job
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._dispatch, daemon=True)
+                self._thread.start()
+            self._lock.notify_all()
+        return job
+
+    def _find(self, job: Union[Job, str]) -> Job:
+        if isinstance(job, Job):
+            return job
+        for entry in reversed(self._jobs):
+            if entry.name == job:
+                return entry
+        raise ValueError(f"Job {job} does not exist")
+
+    def cancel(self, job: Union[Job, str]) -> bool:
+        """Cancel a queued or running job.
+
+        Args:
+            job (Union[Job, str]): The job or the name of its session.
+
+        Returns:
+            bool: True if the job was cancelled, False if it was already done.
+        """
+        with self._lock:
+            job = self._find(job)
+            if job.done():
+                return False
+            job._cancel = True
+            if job.status == QUEUED:
+                self._finish(job, CANCELLED)
+            else:
+                job.session.terminate()
+            self._lock.notify_all()
+        return True
+
+    def jobs(self) -> list[Job]:
+        """Get the submitted jobs in submission order.
+
+        Returns:
+            list[Job]: The jobs.
+        """
+        with self._lock:
+            return list(self._jobs)
+
+    def status(self) -> pd.DataFrame:
+        """Get the status of the submitted jobs.
+
+        Returns:
+            pd.DataFrame: One row per job with its session name, status, device, attempts, exit code, latest frame, elapsed seconds and the error that kept it from starting.
+        """
+        rows = []
+        for job in self.jobs():
+            if job._started is None:
+                elapsed = None
+            else:
+                elapsed = (job._ended or time.time()) - job._started
+            rows.append(
+                {
+                    "name": job.name,
+                    "status": job.status,
+                    "gpu": job.gpu,
+                    "attempts": job.attempts,
+                    "returncode": job.returncode,
+                    "frame": job.session.get.latest_frame(),
+                    "elapsed": elapsed,
+                    "error": None if job.error is None else str(job.error),
+                }
+            )
+        return pd.DataFrame(
+            rows,
+            columns=[
+                "name",
+                "status",
+                "gpu",
+                "attempts",
+                "returncode",
+                "frame",
+                "elapsed",
+                "error",
+            ],
+        )
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Wait for all the submitted jobs to be done.
+
+        Args:
+            timeout (Optional[float], optional): The maximum time to wait in seconds. Defaults to None.
+
+        Returns:
+            bool: True if all the jobs are done, False on timeout.
+        """
+        deadline = None if timeout is None else time.time() + timeout
+        for job in self.jobs():
+            remaining = None if deadline is None else max(0.0, deadline - time.time())
+            if not job.wait(remaining):
+                return False
+        return True
+
+    def shutdown(self):
+        """Cancel all the jobs that are not done and wait for the solvers to exit."""
+        for job in self.jobs():
+            self.cancel(job)
+        self.wait()
+
+    def _finish(self, job: Job, status: str):
+        job._status = status
+        job._ended = time.time()
+        job._done.set()
+
+    def _next_gpu(self) -> Optional[int]:
+        if not self._gpus:
+            return None
+        load = {gpu: 0 for gpu in self._gpus}
+        for job in self._running:
+            if job.gpu in load:
+                load[job.gpu] += 1
+        return min(self._gpus, key=lambda gpu: load[gpu])
+
+    def _launch(self, job: Job):
+        session = job.session
+        resume = job.attempts > 0 and len(session.get.checkpoints()) > 0
+        env = dict(os.environ)
+        job._gpu = self._next_gpu()
+        if job.gpu is not None:
+            env["CUDA_VISIBLE_DEVICES"] = str(job.gpu)
+        session._param = job._param
+        session._spawn(job._param, resume, self._program, env)
+        job._attempts += 1
+        job._returncode = None
+        job._status = RUNNING
+        if job._started is None:
+            job._started = time.time()
+
+    def _reap(self, job: Job):
+        session = job.session
+        job._returncode = session.process.wait(0)
+        finished = os.path.exists(os.path.join(session.output.path, "finished.txt"))
+        if job._cancel:
+            self._finish(job, CANCELLED)
+        elif job.returncode == 0 and finished:
+            self._finish(job, FINISHED)
+        elif job.attempts <= job._retries:
+            job._status = QUEUED
+        else:
+            self._finish(job, FAILED)
+
+    def _dispatch(self):
+        with self._lock:
+            while True:
+                exited = [job for job in self._running if not job.session.is_running()]
+                for job in exited:
+                    self._running.remove(job)
+                    self._reap(job)
+                for job in self._jobs:
+                    if len(self._running) >= self._max_jobs:
+                        break
+                    if job.status == QUEUED and not job._cancel:
+                        try:
+                            self._launch(job)
+                            self._running.append(job)
+                        except Exception as e:
+                            job._error = e
+                            self._finish(job, FAILED)
+                if not self._running and all(job.done() for job in self._jobs):
+                    self._thread = None
+                    return
+                self._lock.wait(self._poll)
+
+
+class Sweep:
+    """Class to track the sessions of a parameter sweep."""
+
+    METRICS = {
+        "time-per-frame": "mean",
+        "time-per-step": "mean",
+        "newton-steps": "mean",
+        "pcg-iter": "mean",
+        "num-contact": "max",
+        "max-sigma": "max",
+    }
+
+    def __init__(
+        self,
+        name: str,
+        values: list[dict[str, Any]],
+        sessions: list[Any],
+        scheduler: Scheduler,
+    ):
+        """Initialize the Sweep class.
+
+        Args:
+            name (str): The name of the sweep.
+            values (list[dict[str, Any]]): The swept parameter values of each session.
+            sessions (list[Session]): The sessions, one per combination of values.
+            scheduler (Scheduler): The scheduler running the sessions.
+        """
+        self._name = name
+        self._values = values
+        self._sessions = sessions
+        self._scheduler = scheduler
+        self._jobs: list[Job] = []
+
+    @property
+    def name(self) -> str:
+        """Get the name of the sweep."""
+        return self._name
+
+    @property
+    def sessions(self) -> list[Any]:
+        """Get the sessions in the order of the combinations."""
+        return self._sessions
+
+    @property
+    def jobs(self) -> list[Job]:
+        """Get the scheduled jobs in the order of the combinations."""
+        return self._jobs
+
+    @property
+    def scheduler(self) -> Scheduler:
+        """Get the scheduler running the sessions."""
+        return self._scheduler
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Wait for all the runs to be done.
+
+        Args:
+            timeout (Optional[float], optional): The maximum time to wait in seconds. Defaults to None.
+
+        Returns:
+            bool: True if all the runs are done, False on timeout.
+        """
+        deadline = None if timeout is None else time.time() + timeout
+        for job in self._jobs:
+            remaining = None if deadline is None else max(0.0, deadline - time.time())
+            if not job.wait(remaining):
+                return False
+        return True
+
+    def cancel(self):
+        """Cancel all the runs that are not done."""
+        for job in self._jobs:
+            self._scheduler.cancel(job)
+
+    def summary(self, metrics: Optional[dict[str, str]] = None) -> pd.DataFrame:
+        """Collect the swept values and the summary metrics of every run.
+
+        Args:
+            metrics (Optional[dict[str, str]], optional): The log names to reduce, mapped to "mean", "max", "min", "sum" or "last". Defaults to the timings, solver iterations, contact count and stretch.
+
+        Returns:
+            pd.DataFrame: One row per run with the session name, swept values, status, latest frame and metrics.
+        """
+        if metrics is None:
+            metrics = self.METRICS
+        reduce = {
+            "mean": lambda x: sum(x) / len(x),
+            "max": max,
+            "min": min,
+            "sum": sum,
+            "last": lambda x: x[-1],
+        }
+        for key, how in metrics.items():
+            if how not in reduce:
+                raise ValueError(f"Unknown reduction {how} for {key}")
+        rows = []
+        for values, session, job in zip(self._values, self._sessions, self._jobs):
+            row = {"name": session.info.name, **values, "status": job.status}
+            row["frame"] = session.get.latest_frame()
+            for key, how in metrics.items():
+                entries = session.get.log.numbers(key)
+                row[key] = reduce[how]([y for _, y in entries]) if entries else None
+            rows.append(row)
+        return pd.DataFrame(rows)
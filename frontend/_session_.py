@@ -6,9 +6,12 @@ from ._scene_ import FixedScene
 from ._plot_ import Plot
 from ._utils_ import Utils
 from ._parse_ import ParamParser, CppRustDocStringParser
+from ._frame_ import Checkpoint, DeltaDecoder, FrameIndex, FrameStore, Trajectory
+from ._scheduler_ import Scheduler, Sweep
+from ._progress_ import ProgressChannel
 from tqdm import tqdm
 import pandas as pd
-import signal
+import json
 import subprocess
 import numpy as np
 import shutil
@@ -17,10 +20,19 @@ import os
 import threading
 import time
 import copy
-from typing import Any, Optional
+import itertools
+import asyncio
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Iterator, Optional
 
+# Directory within that of a scene holding the exports shared by sweeps
+SWEEP_DIR = ".sweep"
+
+# Default of Session.init, so that an explicit None from a failed frame or
+# checkpoint lookup is not mistaken for a request to start from rest
+_REST_SHAPE = object()
 
-PROCESS_NAME = "ppf-contact"
 CONSOLE_STYLE = """
     <style>
         .no-scroll {
@@ -304,9 +316,8 @@ class SessionManager:
         if name in self._sessions.keys():
             if delete_if_exists:
                 session = self._sessions[name]
-                if is_running():
-                    terminate()
-                self._sessions[name].delete()
+                session.terminate()
+                session.delete()
             else:
                 raise ValueError(f"Session {name} already exists")
         session = Session(self._app_root, self._proj_root, name, self._save_func)
@@ -314,15 +325,18 @@ class SessionManager:
         self._curr = name
         return session.init(scene)
 
-    def _terminate_or_raise(self, force: bool):
-        """Terminate the solver if it is running, or raise an exception.
+    def _terminate_or_raise(self, sessions: "list[Session]", force: bool):
+        """Terminate the solvers of the sessions if running, or raise an exception.
 
         Args:
+            sessions (list[Session]): The sessions to check.
             force (bool): Whether to force termination.
         """
-        if is_running():
+        running = [session for session in sessions if session.is_running()]
+        if running:
             if force:
-                terminate()
+                for session in running:
+                    session.terminate()
             else:
                 raise ValueError("Solver is running. Terminate first.")
 
@@ -333,8 +347,8 @@ class SessionManager:
             name (str): The name of the session.
             force (bool, optional): Whether to force deletion.
         """
-        self._terminate_or_raise(force)
         if name in self._sessions.keys():
+            self._terminate_or_raise([self._sessions[name]], force)
             self._sessions[name].delete()
             del self._sessions[name]
             if name == self._curr:
@@ -346,12 +360,93 @@ class SessionManager:
         Args:
             force (bool, optional): Whether to force clearing.
         """
-        self._terminate_or_raise(force)
+        self._terminate_or_raise([*self._sessions.values()], force)
         for session in self._sessions.values():
             session.delete()
         self._sessions = {}
         self._curr = None
 
+    def scheduler(
+        self,
+        max_jobs: Optional[int] = None,
+        gpus: "Optional[list[int]]" = None,
+        program: Optional[str] = None,
+        retries: int = 0,
+    ) -> Scheduler:
+        """Create a scheduler that runs sessions concurrently.
+
+        Args:
+            max_jobs (Optional[int], optional): The maximum number of concurrent runs. Defaults to one per device.
+            gpus (Optional[list[int]], optional): The devices to use. Defaults to all the detected devices.
+            program (Optional[str], optional): The solver executable. Defaults to the release build of the project.
+            retries (int, optional): The default number of retries of a failed run. Defaults to 0.
+
+        Returns:
+            Scheduler: The scheduler.
+        """
+        return Scheduler(max_jobs, gpus, program, retries)
+
+    def sweep(
+        self,
+        scene: FixedScene,
+        param: Param,
+        grid: "dict[str, list[Any]]",
+        name: str = "",
+        scheduler: Optional[Scheduler] = None,
+    ) -> Sweep:
+        """Run one session per combination of parameter values.
+
+        The scene is exported once to ``.sweep/<name>`` in the directory of
+        the scene and linked into every session, and the runs are dispatched
+        on a scheduler. The export is removed with the last session linking
+        to it.
+
+        Args:
+            scene (FixedScene): The scene object.
+            param (Param): The base simulation parameters.
+            grid (dict[str, list[Any]]): The values to sweep for each parameter key.
+            name (str): The name of the sweep, which prefixes the session names. If not specified, current time is used.
+            scheduler (Optional[Scheduler], optional): The scheduler to run on. Defaults to a new scheduler using all the detected devices.
+
+        Returns:
+            Sweep: The sweep, whose runs are queued.
+        """
+        if name == "":
+            name = time.strftime("sweep-%Y-%m-%d-%H-%M-%S")
+        if not grid:
+            raise ValueError("Grid must have at least one parameter")
+        keys = list(grid.keys())
+        variants = []
+        for values in itertools.product(*grid.values()):
+            variant = param.copy()
+            for key, value in zip(keys, values):
+                variant.set(key, value)
+            variants.append((dict(zip(keys, values)), variant))
+        width = len(str(len(variants) - 1))
+        names = [f"{name}-{i:0{width}d}" for i in range(len(variants))]
+        for session_name in names:
+            if session_name in self._sessions.keys():
+                self._sessions[session_name].terminate()
+                self._sessions[session_name].delete()
+        shared = os.path.expanduser(
+            os.path.join(self._app_root, scene._name, SWEEP_DIR, name)
+        )
+        scene.export_fixed(shared, True)
+        sessions = []
+        for session_name in names:
+            session = Session(
+                self._app_root, self._proj_root, session_name, self._save_func
+            )
+            self._sessions[session_name] = session
+            sessions.append(session._init_linked(scene, shared))
+        self._save_func()
+        if scheduler is None:
+            scheduler = self.scheduler()
+        sweep = Sweep(name, [values for values, _ in variants], sessions, scheduler)
+        for session, (_, variant) in zip(sessions, variants):
+            sweep._jobs.append(scheduler.submit(session, variant))
+        return sweep
+
     def param(self) -> Param:
         """Get a new Param object.
 
@@ -393,6 +488,167 @@ class SessionInfo:
         return self._path
 
 
+class SolverProcess:
+    """Handle to the solver process of a session.
+
+    The process id and start time are recorded in a pidfile in the session
+    directory, so that a reloaded session still finds its solver and a
+    recycled process id is never mistaken for it. Liveness checks only look
+    at this one process.
+    """
+
+    PIDFILE = "solver.pid"
+
+    def __init__(self, path: str):
+        """Initialize the SolverProcess class.
+
+        Args:
+            path (str): The path to the session directory.
+        """
+        self._path = path
+        self._popen: Optional[subprocess.Popen] = None
+        self._proc: Optional[psutil.Process] = None
+        self._stamp = None
+
+    def __getstate__(self):
+        return {"_path": self._path}
+
+    def __setstate__(self, state):
+        self.__init__(state["_path"])
+
+    @property
+    def path(self) -> str:
+        """Get the path to the session directory."""
+        return self._path
+
+    @property
+    def pidfile(self) -> str:
+        """Get the path to the pidfile."""
+        return os.path.join(self._path, self.PIDFILE)
+
+    def start(
+        self,
+        command: list[str],
+        stdout,
+        stderr,
+        cwd: str,
+        env: Optional[dict[str, str]] = None,
+    ) -> subprocess.Popen:
+        """Start the solver and record it in the pidfile.
+
+        Args:
+            command (list[str]): The command line.
+            stdout: The file receiving the standard output.
+            stderr: The file receiving the standard error.
+            cwd (str): The working directory.
+            env (Optional[dict[str, str]], optional): The environment variables. Defaults to the current environment.
+
+        Returns:
+            subprocess.Popen: The started process.
+        """
+        if self.is_running():
+            raise ValueError("Solver is already running. Terminate first.")
+        popen = subprocess.Popen(
+            command,
+            stdout=stdout,
+            stderr=stderr,
+            start_new_session=True,
+            cwd=cwd,
+            env=env,
+        )
+        try:
+            proc = psutil.Process(popen.pid)
+            start_time = proc.create_time()
+        except psutil.Error:
+            proc, start_time = None, 0.0
+        tmp = self.pidfile + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(
+                {"pid": popen.pid, "start_time": start_time, "command": command}, f
+            )
+        os.replace(tmp, self.pidfile)
+        self._popen, self._proc = popen, proc
+        self._stamp = self._pidfile_stamp()
+        return popen
+
+    def _pidfile_stamp(self):
+        try:
+            stat = os.stat(self.pidfile)
+            return (stat.st_ino, stat.st_mtime_ns)
+        except OSError:
+            return None
+
+    def _handle(self) -> Optional[psutil.Process]:
+        """Get the recorded process, reading the pidfile again only when it changed."""
+        stamp = self._pidfile_stamp()
+        if stamp != self._stamp:
+            self._stamp, self._popen, self._proc = stamp, None, None
+            try:
+                with open(self.pidfile, "r") as f:
+                    info = json.load(f)
+                proc = psutil.Process(info["pid"])
+                if abs(proc.create_time() - info["start_time"]) < 1e-3:
+                    self._proc = proc
+            except (OSError, ValueError, KeyError, psutil.Error):
+                pass
+        return self._proc
+
+    @property
+    def pid(self) -> Optional[int]:
+        """Get the process id of the solver, or None if it was never started."""
+        proc = self._handle()
+        return None if proc is None else proc.pid
+
+    def is_running(self) -> bool:
+        """Check if the solver is running.
+
+        Returns:
+            bool: True if the solver is running, False otherwise.
+        """
+        proc = self._handle()
+        if self._popen is not None:
+            return self._popen.poll() is None
+        elif proc is None:
+            return False
+        try:
+            return proc.is_running() and proc.status() != psutil.STATUS_ZOMBIE
+        except psutil.Error:
+            return False
+
+    def wait(self, timeout: Optional[float] = None) -> Optional[int]:
+        """Wait for the solver to exit.
+
+        Args:
+            timeout (Optional[float], optional): The maximum time to wait in seconds. Defaults to None.
+
+        Returns:
+            Optional[int]: The exit code, or None if it is still running or unknown.
+        """
+        proc = self._handle()
+        try:
+            if self._popen is not None:
+                return self._popen.wait(timeout)
+            elif proc is not None:
+                return proc.wait(timeout)
+        except (subprocess.TimeoutExpired, psutil.TimeoutExpired):
+            pass
+        except psutil.NoSuchProcess:
+            pass
+        return None
+
+    def terminate(self):
+        """Terminate the solver if it is running."""
+        if self.is_running():
+            proc = self._handle()
+            try:
+                if self._popen is not None:
+                    self._popen.terminate()
+                elif proc is not None:
+                    proc.terminate()
+            except (ProcessLookupError, psutil.Error):
+                pass
+
+
 class Zippable:
     def __init__(self, dirpath: str):
         self._dirpath = dirpath
@@ -425,27 +681,39 @@ class SessionExport:
     def shell_command(
         self,
         param: Param,
+        resume: bool = False,
+        program: Optional[str] = None,
+        progress: Optional[str] = None,
     ) -> str:
         """Generate a shell command to run the solver.
 
         Args:
             param (Param): The simulation parameters.
+            resume (bool, optional): Whether to continue from the latest checkpoint. Defaults to False.
+            program (Optional[str], optional): The solver executable. Defaults to the release build of the project.
+            progress (Optional[str], optional): The socket the solver pushes its progress to. Defaults to None.
 
         Returns:
             str: The shell command.
         """
         param.export(self._session.info.path)
-        program_path = os.path.join(
-            self._session._proj_root, "target", "release", "ppf-contact-solver"
-        )
-        if os.path.exists(program_path):
-            command = " ".join(
-                [
-                    program_path,
-                    f"--path {self._session.info.path}",
-                    f"--output {self._session.output.path}",
-                ]
+        if program is None:
+            program_path = os.path.join(
+                self._session._proj_root, "target", "release", "ppf-contact-solver"
             )
+        else:
+            program_path = os.path.abspath(os.path.expanduser(program))
+        if os.path.exists(program_path):
+            args = [
+                program_path,
+                f"--path {self._session.info.path}",
+                f"--output {self._session.output.path}",
+            ]
+            if resume:
+                args.append("--resume")
+            if progress is not None:
+                args.append(f"--progress-socket {progress}")
+            command = " ".join(args)
             path = os.path.join(self._session.info.path, "command.sh")
             with open(path, "w") as f:
                 f.write(command)
@@ -487,10 +755,12 @@ class SessionExport:
                 shutil.rmtree(path)
         else:
             os.makedirs(path)
-        for i in tqdm(range(self._session.get.latest_frame()), desc="export", ncols=70):
+        latest = self._session.get.latest_frame()
+        frames = [n for n in self._session.get.vertex_frames() if n < latest]
+        for i, n in enumerate(tqdm(frames, desc="export", ncols=70)):
             self.frame(
                 os.path.join(path, f"frame_{i}.{ext}"),
-                i,
+                n,
                 include_static,
                 options,
                 delete_exist=clear,
@@ -510,6 +780,37 @@ class SessionExport:
 
         return Zippable(path)
 
+    def record(self, path: str = "") -> str:
+        """Export the recorded vertices of every written frame.
+
+        Args:
+            path (str): The path to the .npz file. If set empty, it will use the default path.
+
+        Returns:
+            str: The path to the exported file, holding "frame", "index" and "vert" arrays.
+        """
+        session = self._session
+        if session._fixed is None:
+            raise ValueError("Scene must be initialized")
+        if path == "":
+            path = os.path.join(
+                "export", session._fixed._name, session.info.name, "record.npz"
+            )
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        frames, vert = [], []
+        for n in tqdm(session.get.record_frames(), desc="export", ncols=70):
+            entry = session.get.record(n)
+            if entry is not None:
+                frames.append(n)
+                vert.append(entry)
+        np.savez(
+            path,
+            frame=np.array(frames, dtype=np.int64),
+            index=session.get.record_index(),
+            vert=np.array(vert, dtype=np.float32),
+        )
+        return path
+
     def frame(
         self,
         path: str = "",
@@ -630,6 +931,60 @@ class SessionLog:
             os.path.join(self._session.info.path, "error.log"), n_lines
         )
 
+    async def atail(
+        self,
+        name: str = "stdout",
+        n_lines: Optional[int] = None,
+        follow: bool = True,
+        poll: float = 0.25,
+    ) -> AsyncIterator[str]:
+        """Asynchronously iterate over the lines of the stdout or stderr log.
+
+        The lines already written are yielded first, then the lines appended
+        while the solver runs. Reads only pick up the newly appended bytes.
+
+        Args:
+            name (str, optional): The log, either "stdout" or "stderr". Defaults to "stdout".
+            n_lines (Optional[int], optional): The number of existing lines to start with. Defaults to all of them.
+            follow (bool, optional): Whether to keep yielding new lines until the solver exits. Defaults to True.
+            poll (float, optional): The interval in seconds to check the log for new lines. Defaults to 0.25.
+
+        Yields:
+            str: The log lines without the line break.
+        """
+        if name == "stdout":
+            path = os.path.join(self._session.info.path, "stdout.log")
+        elif name == "stderr":
+            path = os.path.join(self._session.info.path, "error.log")
+        else:
+            raise ValueError(f"Unknown log {name}. Use stdout or stderr.")
+        position, partial, first = 0, b"", True
+        while True:
+            running = follow and self._session.is_running()
+            lines = []
+            if os.path.exists(path):
+                if os.path.getsize(path) < position:
+                    # The log was started over by a new run
+                    position, partial = 0, b""
+                with open(path, "rb") as f:
+                    f.seek(position)
+                    data = f.read()
+                    position = f.tell()
+                lines = (partial + data).split(b"\n")
+                partial = lines.pop()
+                if not running and partial:
+                    lines.append(partial)
+                    partial = b""
+            if first:
+                if n_lines is not None:
+                    lines = lines[-n_lines:] if n_lines > 0 else []
+                first = False
+            for line in lines:
+                yield line.decode(errors="replace")
+            if not running:
+                return
+            await asyncio.sleep(poll)
+
     def numbers(self, name: str):
         """Get a pair of numbers from a log file.
 
@@ -687,27 +1042,116 @@ class SessionGet:
         """
         self._session = session
         self._log = SessionLog(session)
+        self._index: Optional[FrameIndex] = None
+        self._trajectory: Optional[Trajectory] = None
+        self._store: Optional[FrameStore] = None
+        self._decoder: Optional[DeltaDecoder] = None
+        self._record_index: Optional[FrameIndex] = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_trajectory"] = None
+        state["_store"] = None
+        state["_decoder"] = None
+        state["_record_index"] = None
+        return state
 
     @property
     def log(self) -> SessionLog:
         """Get the session log object."""
         return self._log
 
+    def frame_index(self) -> FrameIndex:
+        """Get the frame index of the session output directory.
+
+        Returns:
+            FrameIndex: The frame index.
+        """
+        path = os.path.join(self._session.info.path, "output")
+        if getattr(self, "_index", None) is None or self._index.path != path:
+            self._index = FrameIndex(path)
+        return self._index
+
+    def trajectory(self) -> Optional[Trajectory]:
+        """Get the single-file trajectory of the session, if the solver writes one.
+
+        Returns:
+            Optional[Trajectory]: The trajectory, or None if the output is written per frame.
+        """
+        path = os.path.join(self._session.info.path, "output", "trajectory.bin")
+        trajectory = getattr(self, "_trajectory", None)
+        if trajectory is None or trajectory.path != path or trajectory.stale():
+            try:
+                trajectory = Trajectory(path)
+            except (FileNotFoundError, ValueError):
+                trajectory = None
+            self._trajectory = trajectory
+        return trajectory
+
+    def decoder(self) -> Optional[DeltaDecoder]:
+        """Get the decoder of the compressed output, if the solver writes one.
+
+        Returns:
+            Optional[DeltaDecoder]: The decoder, or None if the frames are not compressed.
+        """
+        path = os.path.join(self._session.info.path, "output")
+        if not DeltaDecoder.exists(path):
+            return None
+        decoder = getattr(self, "_decoder", None)
+        if decoder is None or decoder.path != path:
+            decoder = DeltaDecoder(path)
+            self._decoder = decoder
+        return decoder
+
+    def store(self) -> FrameStore:
+        """Get the frame store shared by all frame readers of the session.
+
+        Returns:
+            FrameStore: The frame store.
+        """
+        if getattr(self, "_store", None) is None:
+            self._store = FrameStore(self._locate)
+        return self._store
+
+    def _locate(
+        self, n: int
+    ) -> Optional[tuple[tuple, Callable[[], Optional[np.ndarray]]]]:
+        trajectory = self.trajectory()
+        if trajectory is not None:
+            if 0 <= n < len(trajectory):
+                key = (trajectory.path, trajectory.inode, n)
+                return key, lambda: trajectory.frame(n)
+            return None
+        decoder = self.decoder()
+        index = self.frame_index() if decoder is None else decoder.index
+        if not index.exists(n):
+            return None
+        path = index.path_of(n)
+        try:
+            key = (path, os.stat(path).st_ino)
+        except FileNotFoundError:
+            return None
+        if decoder is not None:
+            return key, lambda: decoder.decode(n)
+        return key, lambda: np.memmap(path, dtype=np.float32, mode="r").reshape(-1, 3)
+
+    def _latest(self) -> Optional[int]:
+        trajectory = self.trajectory()
+        if trajectory is not None:
+            return trajectory.latest()
+        decoder = self.decoder()
+        if decoder is not None:
+            return decoder.index.latest()
+        return self.frame_index().latest()
+
     def vertex_frame_count(self) -> int:
         """Get the vertex count.
 
         Returns:
             int: The vertex count.
         """
-        path = os.path.join(self._session.info.path, "output")
-        max_frame = 0
-        if os.path.exists(path):
-            files = os.listdir(path)
-            for file in files:
-                if file.startswith("vert") and file.endswith(".bin"):
-                    frame = int(file.split("_")[1].split(".")[0])
-                    max_frame = max(max_frame, frame)
-        return max_frame
+        latest = self._latest()
+        return 0 if latest is None else latest
 
     def latest_frame(self) -> int:
         """Get the latest frame number.
@@ -715,17 +1159,132 @@ class SessionGet:
         Returns:
             int: The latest frame number.
         """
-        path = os.path.join(self._session.info.path, "output")
-        if os.path.exists(path):
-            files = os.listdir(path)
-            frames = []
-            for file in files:
-                if file.startswith("vert") and file.endswith(".bin"):
-                    frame = int(file.split("_")[1].split(".")[0])
-                    frames.append(frame)
-            if len(frames) > 0:
-                return sorted(frames)[-1]
-        return 0
+        latest = self._latest()
+        return 0 if latest is None else latest
+
+    def _frame_bound(self, stop: Optional[int], follow: bool) -> tuple[int, bool]:
+        """Get the frame bound that can be read now and whether more frames may follow."""
+        done = not follow or (
+            os.path.exists(os.path.join(self._session.output.path, "finished.txt"))
+            or not self._session.is_running()
+        )
+        latest = self._latest()
+        bound = 0 if latest is None else latest + 1
+        if stop is not None:
+            bound = min(bound, stop)
+        return bound, not done and (stop is None or bound < stop)
+
+    def frames(
+        self,
+        start: int = 0,
+        stop: Optional[int] = None,
+        step: int = 1,
+        prefetch: int = 8,
+        follow: bool = False,
+        poll: float = 0.1,
+    ) -> Iterator[tuple[int, np.ndarray]]:
+        """Iterate over the vertex frames with background read-ahead.
+
+        Args:
+            start (int, optional): The first frame. Defaults to 0.
+            stop (Optional[int], optional): The frame to stop before. If not specified, all written frames are visited.
+            step (int, optional): The frame step. Defaults to 1.
+            prefetch (int, optional): The number of frames read ahead on a thread pool. Defaults to 8.
+            follow (bool, optional): Whether to keep waiting for frames written by a running solver until it finishes. Defaults to False.
+            poll (float, optional): The polling interval in seconds while following a frame that is still being written, or a solver that pushes no progress. Defaults to 0.1.
+
+        Yields:
+            tuple[int, np.ndarray]: The frame number and the vertex positions.
+        """
+        if step < 1:
+            raise ValueError("step must be positive")
+        if stop is None and not follow:
+            stop, _ = self._frame_bound(None, False)
+        store = self.store()
+        executor = ThreadPoolExecutor(
+            max_workers=max(1, prefetch), thread_name_prefix="frame-iterator"
+        )
+        pending: deque = deque()
+        n = start
+        seen = 0
+        try:
+            while True:
+                bound, more = self._frame_bound(stop, follow)
+                while len(pending) < max(1, prefetch) and n < bound:
+                    pending.append((n, executor.submit(store.fetch, n)))
+                    n += step
+                if pending:
+                    frame, future = pending.popleft()
+                    vert = future.result()
+                    if vert is not None:
+                        yield frame, vert
+                elif more:
+                    # Sleep only while a pushed frame is still being written
+                    if self._session._frame_pending(bound - 1):
+                        time.sleep(poll)
+                    else:
+                        seen = self._session._wait_progress(seen, 1.0)
+                else:
+                    return
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    async def aframes(
+        self,
+        start: int = 0,
+        stop: Optional[int] = None,
+        step: int = 1,
+        prefetch: int = 8,
+        follow: bool = False,
+        poll: float = 0.1,
+    ) -> AsyncIterator[tuple[int, np.ndarray]]:
+        """Asynchronously iterate over the vertex frames with background read-ahead.
+
+        This is the asyncio counterpart of frames(). File reads run in worker
+        threads, so the event loop is never blocked.
+
+        Args:
+            start (int, optional): The first frame. Defaults to 0.
+            stop (Optional[int], optional): The frame to stop before. If not specified, all written frames are visited.
+            step (int, optional): The frame step. Defaults to 1.
+            prefetch (int, optional): The number of frames read ahead concurrently. Defaults to 8.
+            follow (bool, optional): Whether to keep waiting for frames written by a running solver until it finishes. Defaults to False.
+            poll (float, optional): The polling interval in seconds while following a frame that is still being written, or a solver that pushes no progress. Defaults to 0.1.
+
+        Yields:
+            tuple[int, np.ndarray]: The frame number and the vertex positions.
+        """
+        if step < 1:
+            raise ValueError("step must be positive")
+        if stop is None and not follow:
+            stop, _ = await asyncio.to_thread(self._frame_bound, None, False)
+        store = self.store()
+        pending: deque = deque()
+        n = start
+        seen = 0
+        try:
+            while True:
+                bound, more = await asyncio.to_thread(self._frame_bound, stop, follow)
+                while len(pending) < max(1, prefetch) and n < bound:
+                    task = asyncio.ensure_future(asyncio.to_thread(store.fetch, n))
+                    pending.append((n, task))
+                    n += step
+                if pending:
+                    frame, task = pending.popleft()
+                    vert = await task
+                    if vert is not None:
+                        yield frame, vert
+                elif more:
+                    # Sleep only while a pushed frame is still being written
+                    if self._session._frame_pending(bound - 1):
+                        await asyncio.sleep(poll)
+                    else:
+                        seen = await self._session._await_progress(seen, 1.0)
+                else:
+                    return
+        finally:
+            for _, task in pending:
+                task.cancel()
 
     def vertex(self, n: Optional[int] = None) -> Optional[tuple[np.ndarray, int]]:
         """Get the vertex data for a specific frame.
@@ -739,46 +1298,114 @@ class SessionGet:
         if self._session._fixed is None:
             raise ValueError("Scene must be initialized")
         else:
-            path = os.path.join(self._session.info.path, "output")
-            if os.path.exists(path):
+            if n is None:
+                n = self._latest()
                 if n is None:
-                    files = os.listdir(path)
-                    frames = []
-                    for file in files:
-                        if file.startswith("vert") and file.endswith(".bin"):
-                            frame = int(file.split("_")[1].split(".")[0])
-                            frames.append(frame)
-                    if len(frames) > 0:
-                        frames = sorted(frames)
-                        last_frame = frames[-1]
-                        path = os.path.join(path, f"vert_{last_frame}.bin")
-                        try:
-                            with open(path, "rb") as f:
-                                data = f.read()
-                                vert = np.frombuffer(data, dtype=np.float32).reshape(
-                                    -1, 3
-                                )
-                            return (
-                                vert,
-                                last_frame,
-                            )
-                        except ValueError:
-                            return None
-                else:
-                    try:
-                        path = os.path.join(path, f"vert_{n}.bin")
-                        if os.path.exists(path):
-                            with open(path, "rb") as f:
-                                data = f.read()
-                                vert = np.frombuffer(data, dtype=np.float32).reshape(
-                                    -1, 3
-                                )
-                            return (vert, n)
-                    except ValueError:
-                        pass
                     return None
+            vert = self.store().get(n)
+            return None if vert is None else (vert, n)
+
+    def vertex_frames(self) -> list[int]:
+        """Get the numbers of the frames written with all the vertices.
+
+        Returns:
+            list[int]: The sorted frame numbers.
+        """
+        trajectory = self.trajectory()
+        if trajectory is not None:
+            return np.flatnonzero(~np.isnan(trajectory.time)).tolist()
+        decoder = self.decoder()
+        if decoder is not None:
+            return decoder.index.frames()
+        return self.frame_index().frames()
+
+    def checkpoints(self) -> list[int]:
+        """Get the frame numbers of the saved solver checkpoints.
+
+        Returns:
+            list[int]: The sorted frame numbers.
+        """
+        path = os.path.join(self._session.info.path, "output", "checkpoint")
+        if not os.path.isdir(path):
+            return []
+        return sorted(
+            int(name[len("state_") : -len(".bin")])
+            for name in os.listdir(path)
+            if name.startswith("state_") and name.endswith(".bin")
+        )
+
+    def checkpoint(
+        self, n: Optional[int] = None
+    ) -> Optional[tuple[np.ndarray, np.ndarray, int]]:
+        """Get the solver state stored in a checkpoint.
+
+        The result can be passed as the initial state of another session.
+
+        Args:
+            n (Optional[int], optional): The frame number. If not specified, the latest checkpoint is returned. Defaults to None.
+
+        Returns:
+            Optional[tuple[np.ndarray, np.ndarray, int]]: The positions, velocities and frame number, or None if there is no readable checkpoint.
+        """
+        saved = self.checkpoints()
+        if n is not None:
+            saved = [n] if n in saved else []
+        # Like the solver, skip over a latest checkpoint that is damaged
+        for frame in reversed(saved):
+            path = os.path.join(
+                self._session.info.path, "output", "checkpoint", f"state_{frame}.bin"
+            )
+            try:
+                checkpoint = Checkpoint.load(path)
+            except ValueError:
+                continue
+            return checkpoint.curr, checkpoint.velocity, frame
         return None
 
+    def record_index(self) -> np.ndarray:
+        """Get the indices of the vertices recorded in the strided output frames.
+
+        Returns:
+            np.ndarray: The vertex indices, empty if every vertex is recorded.
+        """
+        if self._session._fixed is None:
+            raise ValueError("Scene must be initialized")
+        return self._session._fixed.record
+
+    def record_frames(self) -> list[int]:
+        """Get the numbers of the frames holding the recorded vertices.
+
+        This includes the full snapshots, from which the recorded vertices are taken.
+
+        Returns:
+            list[int]: The sorted frame numbers.
+        """
+        path = os.path.join(self._session.info.path, "output")
+        index = getattr(self, "_record_index", None)
+        if index is None or index.path != path:
+            index = FrameIndex(path, prefix="record_")
+            self._record_index = index
+        return sorted(set(index.frames()) | set(self.vertex_frames()))
+
+    def record(self, n: int) -> Optional[np.ndarray]:
+        """Get the positions of the recorded vertices at a specific frame.
+
+        Args:
+            n (int): The frame number.
+
+        Returns:
+            Optional[np.ndarray]: The (K, 3) positions ordered as record_index(), or None if the frame was not written.
+        """
+        ind = self.record_index()
+        path = os.path.join(self._session.info.path, "output", f"record_{n}.bin")
+        if len(ind) and os.path.exists(path):
+            return np.fromfile(path, dtype=np.float32).reshape(-1, 3)
+        result = self.vertex(n)
+        if result is None:
+            return None
+        vert, _ = result
+        return vert[ind] if len(ind) else vert
+
 
 class Session:
     """Class to manage a simulation session."""
@@ -810,6 +1437,7 @@ class Session:
             "pin": False,
             "stitch": False,
         }
+        self._shared: Optional[str] = None
         self.delete()
 
     @property
@@ -832,6 +1460,93 @@ class Session:
         """Get the session output object."""
         return self._output
 
+    @property
+    def process(self) -> SolverProcess:
+        """Get the handle to the solver process of the session."""
+        process = getattr(self, "_process", None)
+        if process is None or process.path != self.info.path:
+            process = self._process = SolverProcess(self.info.path)
+        return process
+
+    @property
+    def progress(self) -> Optional[ProgressChannel]:
+        """Get the channel receiving the progress of the last started solver."""
+        return getattr(self, "_progress", None)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        # The channel is bound to a socket of this process
+        state.pop("_progress", None)
+        # So is the scheduler running the job
+        state.pop("_job", None)
+        return state
+
+    def _open_progress(self) -> ProgressChannel:
+        """Open a new progress channel, closing the previous one."""
+        if self.progress is not None:
+            self.progress.close()
+        self._progress = ProgressChannel()
+        return self._progress
+
+    def _wait_progress(self, seen: int, timeout: float) -> int:
+        """Wait for the solver to push an event, or sleep when there is no channel.
+
+        Args:
+            seen (int): The number of events already seen.
+            timeout (float): The maximum time to wait in seconds.
+
+        Returns:
+            int: The number of events seen after waiting.
+        """
+        progress = self.progress
+        if progress is None or progress.closed:
+            time.sleep(timeout)
+            return seen
+        return seen + len(progress.wait(seen, timeout))
+
+    async def _await_progress(self, seen: int, timeout: float) -> int:
+        """Await an event pushed by the solver, or sleep when there is no channel.
+
+        Args:
+            seen (int): The number of events already seen.
+            timeout (float): The maximum time to wait in seconds.
+
+        Returns:
+            int: The number of events seen after waiting.
+        """
+        progress = self.progress
+        if progress is None or progress.closed:
+            await asyncio.sleep(timeout)
+            return seen
+        return seen + len(await progress.await_events(seen, timeout))
+
+    def _frame_pending(self, latest: int) -> bool:
+        """Check if a frame newer than the latest readable one was pushed and is being written.
+
+        Args:
+            latest (int): The latest readable frame.
+
+        Returns:
+            bool: True if the channel announced a newer written frame or there is no channel, False otherwise.
+        """
+        progress = self.progress
+        if progress is None or progress.closed:
+            return True
+        pushed = progress.latest(written=True)
+        return pushed is None or pushed["frame"] > latest
+
+    def is_running(self) -> bool:
+        """Check if the solver of this session is running.
+
+        Returns:
+            bool: True if the solver is running, False otherwise.
+        """
+        return self.process.is_running()
+
+    def terminate(self):
+        """Terminate the solver of this session."""
+        self.process.terminate()
+
     def print(self, message):
         """Print a message.
 
@@ -849,26 +1564,54 @@ class Session:
         """Delete the session."""
         if os.path.exists(self.info.path):
             shutil.rmtree(self.info.path)
+        self._release_shared()
+
+    def _release_shared(self):
+        """Forget the linked scene export, removing it if no other session links to it."""
+        shared = getattr(self, "_shared", None)
+        self._shared = None
+        if shared is None or not os.path.isdir(shared):
+            return
+        sweep_dir = os.path.dirname(shared)
+        scene_dir = os.path.dirname(sweep_dir)
+        for name in os.listdir(scene_dir):
+            path = os.path.join(scene_dir, name)
+            if name == SWEEP_DIR or not os.path.isdir(path):
+                continue
+            for item in os.listdir(path):
+                item_path = os.path.join(path, item)
+                if (
+                    os.path.islink(item_path)
+                    and os.path.dirname(os.readlink(item_path)) == shared
+                ):
+                    return
+        shutil.rmtree(shared)
+        if not os.listdir(sweep_dir):
+            os.rmdir(sweep_dir)
 
     def _check_ready(self):
         """Check if the session is ready."""
         if self._fixed is None:
             raise ValueError("Scene must be initialized")
 
-    def init(self, scene: FixedScene) -> "Session":
+    def init(self, scene: FixedScene, initial_state: Any = _REST_SHAPE) -> "Session":
         """Initialize the session with a fixed scene.
 
         Args:
             scene (FixedScene): The fixed scene.
+            initial_state (Any, optional): The state to warm-start from instead of the rest shape of the scene. Accepts an (N, 3) array of positions, the result of ``session.get.vertex()`` or ``session.get.checkpoint()`` of another session, or a (positions, velocities) pair. Without velocities, those of the scene are used. If not specified, the solver starts from the rest shape.
 
         Returns:
             Session: The initialized session.
+
+        Raises:
+            ValueError: If the initial state is None, as returned for a missing frame or checkpoint, or does not match the scene.
         """
         path = os.path.expanduser(
             os.path.join(self._app_root, scene._name, self.info.name)
         )
         self.info.set_path(path)
-        if is_running():
+        if self.is_running():
             self.print("Solver is already running. Teriminate first.")
             if self._in_jupyter_notebook:
                 from IPython.display import display
@@ -876,21 +1619,79 @@ class Session:
                 display(self._terminate_button("Terminate Now"))
             return self
 
+        init = (
+            []
+            if initial_state is _REST_SHAPE
+            else self._initial_state(scene, initial_state)
+        )
         self._fixed = scene
 
         if os.path.exists(self.info.path):
             shutil.rmtree(self.info.path)
         else:
             os.makedirs(self.info.path)
+        self._release_shared()
 
         if self._fixed is not None:
             self._fixed.export_fixed(self.info.path, True)
         else:
             raise ValueError("Scene and param must be initialized")
+        # The solver starts from these instead of the rest shape of the scene
+        for name, x in zip(["init_vert", "init_vel"], init):
+            x.astype(np.float32).tofile(
+                os.path.join(self.info.path, "bin", f"{name}.bin")
+            )
 
         self._save_func()
         return self
 
+    def _initial_state(self, scene: FixedScene, state: Any) -> list[np.ndarray]:
+        """Get the warm-start positions and optional velocities from an initial state."""
+        if state is None:
+            raise ValueError(
+                "initial state is None, the frame or checkpoint it was taken from does not exist"
+            )
+        if isinstance(state, np.ndarray):
+            state = (state,)
+        arrays = [x for x in state if isinstance(x, np.ndarray)]
+        if len(arrays) not in (1, 2):
+            raise ValueError(
+                "initial state must hold positions and optional velocities"
+            )
+        n_vert = len(scene.vertex(False))
+        for x in arrays:
+            if x.shape != (n_vert, 3):
+                raise ValueError(
+                    f"initial state has shape {x.shape}, expected ({n_vert}, 3)"
+                )
+        return arrays
+
+    def _init_linked(self, scene: FixedScene, source: str) -> "Session":
+        """Initialize the session by linking to a scene exported elsewhere.
+
+        Args:
+            scene (FixedScene): The fixed scene.
+            source (str): The directory the scene was exported to.
+
+        Returns:
+            Session: The initialized session.
+        """
+        path = os.path.expanduser(
+            os.path.join(self._app_root, scene._name, self.info.name)
+        )
+        self.info.set_path(path)
+        if self.is_running():
+            raise ValueError("Solver is already running. Terminate first.")
+        self._fixed = scene
+        if os.path.exists(self.info.path):
+            shutil.rmtree(self.info.path)
+        os.makedirs(self.info.path)
+        self._release_shared()
+        for item in os.listdir(source):
+            os.symlink(os.path.join(source, item), os.path.join(self.info.path, item))
+        self._shared = source
+        return self
+
     def finished(self) -> bool:
         """Check if the session is finished.
 
@@ -921,6 +1722,169 @@ class Session:
         Returns:
             Session: The started session.
         """
+        self._param = param
+        return self._launch(param, force, blocking, resume=False)
+
+    def resume(
+        self, param: Optional[Param] = None, force: bool = True, blocking=False
+    ) -> "Session":
+        """Resume the session from its latest checkpoint.
+
+        The solver restores the state saved at the checkpoint and continues
+        with the next frame, keeping the frames written so far. Checkpoints
+        are written when the ``checkpoint-interval`` parameter is set.
+
+        Args:
+            param (Optional[Param], optional): The simulation parameters. If not specified, the parameters of the last start are used.
+            force (bool, optional): Whether to force start.
+            blocking (bool, optional): Whether to block the execution.
+
+        Returns:
+            Session: The resumed session.
+        """
+        param = self._resume_param(param)
+        self._param = param
+        return self._launch(param, force, blocking, resume=True)
+
+    def _resume_param(self, param: Optional[Param]) -> Param:
+        """Get the parameters to resume with, checking that there is a checkpoint."""
+        if param is None:
+            param = getattr(self, "_param", None)
+            if param is None:
+                raise ValueError("Session must be started before it can be resumed")
+        if not self.get.checkpoints():
+            raise ValueError("No checkpoint to resume from")
+        return param
+
+    async def start_async(
+        self, param: Param, force: bool = True, program: Optional[str] = None
+    ) -> "Session":
+        """Start the session without blocking the event loop.
+
+        Returns once the solver has initialized, while it keeps running in
+        the background. Many sessions can be started and awaited from a
+        single event loop.
+
+        Args:
+            param (Param): The simulation parameters.
+            force (bool, optional): Whether to terminate the running solver of this session first.
+            program (Optional[str], optional): The solver executable, which skips the GPU check. Defaults to the release build of the project.
+
+        Returns:
+            Session: The started session.
+        """
+        self._param = param
+        return await self._launch_async(param, force, program, resume=False)
+
+    async def resume_async(
+        self,
+        param: Optional[Param] = None,
+        force: bool = True,
+        program: Optional[str] = None,
+    ) -> "Session":
+        """Resume the session from its latest checkpoint without blocking the event loop.
+
+        Returns once the solver has restored its state, while it keeps
+        running in the background.
+
+        Args:
+            param (Optional[Param], optional): The simulation parameters. If not specified, the parameters of the last start are used.
+            force (bool, optional): Whether to terminate the running solver of this session first.
+            program (Optional[str], optional): The solver executable, which skips the GPU check. Defaults to the release build of the project.
+
+        Returns:
+            Session: The resumed session.
+        """
+        param = self._resume_param(param)
+        self._param = param
+        return await self._launch_async(param, force, program, resume=True)
+
+    async def _launch_async(
+        self, param: Param, force: bool, program: Optional[str], resume: bool
+    ) -> "Session":
+        if program is None:
+            await asyncio.to_thread(self._check_solver)
+        self._check_ready()
+        if self.is_running():
+            if force:
+                self.terminate()
+                await asyncio.to_thread(self.process.wait, 10.0)
+            else:
+                raise ValueError("Solver is already running. Terminate first.")
+        process, progress = self._spawn(param, resume, program)
+        seen = 0
+        try:
+            for timeout in self._start_waits(process, progress):
+                seen += len(await progress.await_events(seen, timeout))
+        except ValueError as e:
+            error = "\n".join(self.get.log.stderr())
+            raise ValueError(f"{e}\n{error}") from None
+        strain_limit_eps = param.get("strain-limit-eps")
+        self._default_opts["max-area"] = 1.0 + strain_limit_eps
+        return self
+
+    def _start_waits(
+        self, process: subprocess.Popen, progress: ProgressChannel
+    ) -> Iterator[float]:
+        """Yield how long to wait for solver events until it has initialized.
+
+        The caller waits on the progress channel between the steps, blocking
+        or awaiting.
+
+        Args:
+            process (subprocess.Popen): The solver process.
+            progress (ProgressChannel): The progress channel of the solver.
+
+        Yields:
+            float: The maximum time to wait in seconds.
+
+        Raises:
+            ValueError: If the solver exits before it has initialized.
+        """
+        init_path = os.path.join(self.info.path, "output", "data", "initialize.out")
+        while progress.latest("start") is None and not os.path.exists(init_path):
+            if process.poll() is not None:
+                # Take in an event sent right before the solver exited
+                yield 0.1
+                if progress.latest("start") is None:
+                    raise ValueError("Solver failed to start")
+            else:
+                yield 1.0
+
+    async def wait(self, timeout: Optional[float] = None, poll: float = 1.0) -> bool:
+        """Wait for the solver to exit without blocking the event loop.
+
+        A session submitted to a scheduler is waited for until its job is
+        done, including the time it is queued and any retries.
+
+        Args:
+            timeout (Optional[float], optional): The maximum time to wait in seconds. Defaults to None.
+            poll (float, optional): The interval in seconds to check a solver that pushes no events. Defaults to 1.0.
+
+        Returns:
+            bool: True if the solver has exited and no scheduled run is pending, False on timeout.
+        """
+        deadline = None if timeout is None else time.time() + timeout
+        seen, progress = 0, self.progress
+        while self.is_running() or self._queued():
+            wait = poll
+            if deadline is not None:
+                wait = min(wait, deadline - time.time())
+                if wait <= 0.0:
+                    return False
+            if self.progress is not progress:
+                # A scheduled run was started on a new channel
+                seen, progress = 0, self.progress
+            seen = await self._await_progress(seen, wait)
+        return True
+
+    def _queued(self) -> bool:
+        """Check if the session waits on a scheduler to be started or started again."""
+        job = getattr(self, "_job", None)
+        return job is not None and not job.done()
+
+    def _check_solver(self):
+        """Check that a GPU and a recent enough driver are available."""
         gpu_count = Utils.get_gpu_count()
         if gpu_count == 0:
             raise ValueError("GPU is not detected.")
@@ -935,55 +1899,83 @@ class Session:
         else:
             raise ValueError("Driver version could not be detected.")
 
+    def _spawn(
+        self,
+        param: Param,
+        resume: bool,
+        program: Optional[str] = None,
+        env: Optional[dict[str, str]] = None,
+    ) -> tuple[subprocess.Popen, ProgressChannel]:
+        """Start the solver with a new progress channel.
+
+        Args:
+            param (Param): The simulation parameters.
+            resume (bool): Whether to continue from the latest checkpoint.
+            program (Optional[str], optional): The solver executable. Defaults to the release build of the project.
+            env (Optional[dict[str, str]], optional): The environment variables. Defaults to the current environment.
+
+        Returns:
+            tuple[subprocess.Popen, ProgressChannel]: The solver process and its progress channel.
+        """
+        if resume:
+            # The resumed solver writes it again once it has restored its state
+            init_path = os.path.join(self.output.path, "data", "initialize.out")
+            if os.path.exists(init_path):
+                os.remove(init_path)
+        progress = self._open_progress()
+        cmd_path = self.export.shell_command(param, resume, program, progress.path)
+        err_path = os.path.join(self.info.path, "error.log")
+        log_path = os.path.join(self.info.path, "stdout.log")
+        command = open(cmd_path, "r").read()
+        process = self.process.start(
+            command.split(),
+            stdout=open(log_path, "w"),
+            stderr=open(err_path, "w"),
+            cwd=self._proj_root,
+            env=env,
+        )
+        return process, progress
+
+    def _launch(
+        self, param: Param, force: bool, blocking: bool, resume: bool
+    ) -> "Session":
+        self._check_solver()
         self._check_ready()
-        if is_running():
+        if self.is_running():
             if force:
-                terminate()
+                self.terminate()
+                self.process.wait(timeout=10.0)
             else:
                 from IPython.display import display
 
                 self.print("Solver is already running. Teriminate first.")
                 display(self._terminate_button("Terminate Now"))
                 return self
-        cmd_path = self.export.shell_command(param)
+        process, progress = self._spawn(param, resume)
         err_path = os.path.join(self.info.path, "error.log")
         log_path = os.path.join(self.info.path, "stdout.log")
-        command = open(cmd_path, "r").read()
-        process = subprocess.Popen(
-            command.split(),
-            stdout=open(log_path, "w"),
-            stderr=open(err_path, "w"),
-            start_new_session=True,
-            cwd=self._proj_root,
-        )
-        while not os.path.exists(log_path) and not os.path.exists(err_path):
-            time.sleep(1)
-        if process.poll() is not None:
+        seen = 0
+        try:
+            for timeout in self._start_waits(process, progress):
+                seen += len(progress.wait(seen, timeout))
+        except ValueError:
             display_log(open(err_path, "r").readlines())
-            raise ValueError("Solver failed to start")
-        else:
-            init_path = os.path.join(self.info.path, "output", "data", "initialize.out")
-            time.sleep(1)
-            while is_running():
-                if os.path.exists(init_path):
-                    break
-                time.sleep(1)
-            if not os.path.exists(init_path):
-                display_log(open(err_path, "r").readlines())
-                raise ValueError("Solver failed to start")
+            raise
         if blocking or not self._in_jupyter_notebook:
             print(f">>> Log path: {log_path}")
             print(">>> Waiting for solver to finish...")
             total_frames = param.get("frames")
             assert isinstance(total_frames, int)
             with tqdm(total=total_frames, desc="Progress") as pbar:
-                last_frame = 0
+                last_frame = self.get.latest_frame() if resume else 0
+                pbar.update(last_frame)
                 while process.poll() is None:
-                    frame = self.get.latest_frame()
-                    if frame > last_frame:
-                        pbar.update(frame - last_frame)
-                        last_frame = frame
-                    time.sleep(1)
+                    for event in progress.wait(seen, 1.0):
+                        seen += 1
+                        frame = event.get("frame", 0)
+                        if event.get("event") == "frame" and frame > last_frame:
+                            pbar.update(frame - last_frame)
+                            last_frame = frame
             if os.path.exists(err_path):
                 err_lines = open(err_path, "r").readlines()
             else:
@@ -1022,8 +2014,8 @@ class Session:
             def _terminate(button):
                 button.disabled = True
                 button.description = "Terminating..."
-                terminate()
-                while is_running():
+                self.terminate()
+                while self.is_running():
                     time.sleep(0.25)
                 button.description = "Terminated"
 
@@ -1089,7 +2081,7 @@ class Session:
                 else:
                     return f"{time / 60_000:.2f}m"
 
-            if live_update and is_running():
+            if live_update and self.is_running():
 
                 def update_dataframe(table, curr_frame):
                     time_per_frame = convert_time(self.get.log.number("time-per-frame"))
@@ -1121,6 +2113,7 @@ class Session:
                     nonlocal options
                     nonlocal curr_frame
                     assert plot is not None
+                    seen = 0
                     while True:
                         last_frame = self.get.latest_frame()
                         if curr_frame != last_frame:
@@ -1131,9 +2124,13 @@ class Session:
                                 color = self._fixed.color(vert, options)
                                 update_dataframe(table, curr_frame)
                                 plot.update(vert, color)
-                        if not is_running():
+                        if not self.is_running():
                             break
-                        time.sleep(self._update_preview_interval)
+                        # Poll only while a pushed frame is still being written
+                        if self._frame_pending(last_frame):
+                            time.sleep(self._update_preview_interval)
+                        else:
+                            seen = self._wait_progress(seen, 1.0)
                     assert button is not None
                     button.disabled = True
                     button.description = "Terminated"
@@ -1146,11 +2143,15 @@ class Session:
 
                 def live_table(self):
                     nonlocal table
+                    seen = 0
                     while True:
                         update_dataframe(table, curr_frame)
-                        if not is_running():
+                        if not self.is_running():
                             break
-                        time.sleep(self._update_table_interval)
+                        if self.progress is None:
+                            time.sleep(self._update_table_interval)
+                        else:
+                            seen = self._wait_progress(seen, 1.0)
 
                 threading.Thread(target=live_preview, args=(self,)).start()
                 threading.Thread(target=live_table, args=(self,)).start()
@@ -1185,26 +2186,45 @@ class Session:
                 )
                 try:
                     if self._fixed is not None:
-                        frame_count = self.get.vertex_frame_count()
-                        vert_list = []
-                        for i in tqdm(
-                            range(frame_count), desc="Loading frames", ncols=70
-                        ):
-                            result = self.get.vertex(i)
-                            if result is not None:
-                                vert, _ = result
-                                vert_list.append(vert)
+                        # With an output stride only every Nth frame is
+                        # written, so the slider walks the written frames
+                        frames = self.get.vertex_frames()
+                        frame_count = len(frames)
+                        store = self.get.store()
+                        frame_bytes = self._fixed.vertex(False).size * 4
+                        capacity = store.capacity(frame_bytes)
+                        window = max(1, min(capacity // 4, 16))
+                        store.prefetch(
+                            [
+                                frames[i]
+                                for i in store.coarse_to_fine(
+                                    frame_count, capacity // 2
+                                )
+                            ],
+                            "coarse",
+                        )
 
                         def update(frame=1):
-                            nonlocal vert_list
                             nonlocal plot
                             assert plot is not None
                             if self._fixed is not None:
-                                vert = vert_list[frame - 1]
-                                color = self._fixed.color(vert, options)
-                                plot.update(vert, color)
+                                i = frame - 1
+                                result = self.get.vertex(frames[i])
+                                if result is not None:
+                                    vert, _ = result
+                                    color = self._fixed.color(vert, options)
+                                    plot.update(vert, color)
+                                neighbour = sorted(
+                                    range(
+                                        max(0, i - window),
+                                        min(frame_count, i + window + 1),
+                                    ),
+                                    key=lambda k: (abs(k - i), k < i),
+                                )
+                                store.prefetch([frames[k] for k in neighbour], "slider")
 
-                        widgets.interact(update, frame=(1, frame_count))
+                        if frame_count:
+                            widgets.interact(update, frame=(1, frame_count))
                 except Exception as _:
                     pass
         return self
@@ -1252,7 +2272,7 @@ class Session:
                             CONSOLE_STYLE
                             + f"<pre style='no-scroll'>{result.stdout.strip()}</pre>"
                         )
-                        if not is_running():
+                        if not self.is_running():
                             log_widget.value += "<p style='color: red;'>Terminated.</p>"
                             if os.path.exists(err_path):
                                 file = open(err_path, "r")
@@ -1292,32 +2312,6 @@ class Session:
         return self
 
 
-def is_running() -> bool:
-    """Check if the solver is running.
-
-    Returns:
-        bool: True if the solver is running, False otherwise.
-    """
-    for proc in psutil.process_iter(["pid", "name", "status"]):
-        if (
-            PROCESS_NAME in proc.info["name"]
-            and proc.info["status"] != psutil.STATUS_ZOMBIE
-        ):
-            return True
-    return False
-
-
-def terminate():
-    """Terminate the solver."""
-    for proc in psutil.process_iter(["pid", "name", "status"]):
-        if (
-            PROCESS_NAME in proc.info["name"]
-            and proc.info["status"] != psutil.STATUS_ZOMBIE
-        ):
-            pid = proc.info["pid"]
-            os.kill(pid, signal.SIGTERM)
-
-
 def display_log(lines: list[str]):
     """Display the log lines.
 
@@ -240,6 +240,59 @@ pub struct Args {
     #[clap(long, default_value_t = 300)]
     pub frames: i32,
 
+    // Name: Single Trajectory File Output
+    // Description:
+    // Append every video frame to a single preallocated trajectory.bin file
+    // in the output directory instead of writing one vert_N.bin file per frame.
+    // The file starts with a small header and a frame time index, and can be
+    // memory-mapped while the solver is still writing.
+    #[clap(long)]
+    pub trajectory: bool,
+
+    // Name: Compressed Output Quantization Step
+    // Description:
+    // When positive, video frames are written as compressed vert_N.qbin files
+    // instead of raw vert_N.bin files. Every frame is stored as fixed-point
+    // deltas from the previous frame with this quantization step, so each
+    // reconstructed coordinate is within half a step of the solver output.
+    // Zero disables compression. Ignored when the trajectory output is enabled.
+    #[clap(long, default_value_t = 0.0)]
+    pub codec_step: f32,
+
+    // Name: Compressed Output Keyframe Interval
+    // Description:
+    // Number of video frames between two uncompressed keyframes of the
+    // compressed output. Reading a frame decodes at most this many deltas,
+    // so smaller values speed up random access at the cost of file size.
+    #[clap(long, default_value_t = 30)]
+    pub codec_keyframe: u32,
+
+    // Name: Frame Writer Buffer Count
+    // Description:
+    // Video frames are written to disk on a separate thread so that the
+    // simulation does not wait for the storage. This is the number of frame
+    // buffers shared with that thread. The simulation only blocks when all
+    // of them are still waiting to be written.
+    #[clap(long, default_value_t = 2)]
+    pub write_buffers: u32,
+
+    // Name: Output Frame Stride
+    // Description:
+    // Only every Nth video frame is written to the output directory. The
+    // simulation itself still runs at the full frame rate. When a subset of
+    // vertices is selected for recording, these frames contain only that
+    // subset and are written as record_N.bin files.
+    #[clap(long, default_value_t = 1)]
+    pub output_stride: u32,
+
+    // Name: Full Snapshot Interval
+    // Description:
+    // Every Nth video frame is written with all the vertices, regardless of
+    // the output stride and the recorded vertex subset. Zero means that only
+    // the first frame is a full snapshot when a subset is recorded.
+    #[clap(long, default_value_t = 0)]
+    pub snapshot_interval: u32,
+
     // Name: Constitutive Model for Shells
     // Choices: baraffwitkin, shhk (Stable Neo-Hookean), arap (As-Rigid-As-Possible), stvk (St. Venant-Kirchhoff)
     // Description:
@@ -392,6 +445,30 @@ pub struct Args {
     #[clap(long, default_value_t = 0.0)]
     pub fix_xz: f32,
 
+    // Name: Checkpoint Interval
+    // Description:
+    // Every Nth video frame, the full solver state is saved to the checkpoint
+    // directory of the output so that a crashed or terminated run can be
+    // resumed from there. Zero disables checkpointing.
+    #[clap(long, default_value_t = 0)]
+    pub checkpoint_interval: u32,
+
+    // Name: Checkpoints to Keep
+    // Description:
+    // Number of most recent checkpoints kept on disk. Older ones are deleted
+    // as new ones are written, which bounds the disk space used to this many
+    // times the size of two frames of all the vertices.
+    #[clap(long, default_value_t = 2)]
+    pub checkpoint_keep: u32,
+
+    // Do not list
+    #[clap(long)]
+    pub resume: bool,
+
+    // Do not list
+    #[clap(long, default_value = "")]
+    pub progress_socket: String,
+
     // Name: Fake Crash Frame
     // Description:
     // Frame number at which to intentionally crash the simulation for testing purposes.
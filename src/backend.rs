@@ -2,8 +2,11 @@
 // Author: Ryoichi Ando (ryoichi.ando@zozo.com)
 // License: Apache v2.0
 
+use super::checkpoint::Checkpoint;
 use super::data::Constraint;
 use super::data::StepResult;
+use super::progress::Progress;
+use super::writer::{DeltaEncoder, FrameSink, FrameWriter, TrajectoryWriter};
 use super::{builder, mesh::Mesh, Args, BvhSet, DataSet, ParamSet, Scene};
 use chrono::Local;
 use serde::{Deserialize, Serialize};
@@ -77,6 +80,14 @@ impl Backend {
         }
     }
 
+    pub fn resume(&mut self, checkpoint: Checkpoint) {
+        self.state.curr_vertex = checkpoint.curr_vertex;
+        self.state.prev_vertex = checkpoint.prev_vertex;
+        self.state.time = checkpoint.time;
+        self.state.prev_dt = checkpoint.prev_dt;
+        self.state.curr_frame = checkpoint.frame;
+    }
+
     fn fetch_state(&mut self, dataset: &DataSet, param: &ParamSet) {
         unsafe {
             fetch();
@@ -121,7 +132,16 @@ impl Backend {
         unsafe {
             initialize(&dataset, &param);
         }
+        let progress = Progress::connect(&args.progress_socket);
+        progress.send(serde_json::json!({
+            "event": "start",
+            "frame": self.state.curr_frame.max(0),
+            "time": self.state.time,
+            "frames": args.frames,
+        }));
         let mut last_time = Instant::now();
+        let mut step_count = 0;
+        let mut step_time = 0.0;
         let mut constraint;
 
         let (task_sender, task_receiver) = mpsc::channel();
@@ -136,10 +156,75 @@ impl Backend {
             }
         });
 
+        // Name: Time Per Constraint Update
+        // Format: list[(vid_time,ms)]
+        // Description:
+        // Time consumed to assemble and upload the constraints of a single step.
+        // The static collision mesh is built once at startup and is not included.
+        /*== push "time_per_constraint" ==*/
+        let mut time_per_constraint = OpenOptions::new()
+            .create(true)
+            .append(true)
+            .open(format!("{}/data/time_per_constraint.out", args.output).as_str())
+            .unwrap();
+
+        // Name: Frame Writer Queue Depth
+        // Format: list[(vid_time,int)]
+        // Description:
+        // Number of video frames waiting for or being written to disk by the
+        // frame writer thread, counted right after a frame is handed over.
+        // A depth that stays at the buffer count means the storage is slower
+        // than the simulation.
+        /*== push "writer_queue" ==*/
+        let mut writer_queue = OpenOptions::new()
+            .create(true)
+            .append(true)
+            .open(format!("{}/data/writer_queue.out", args.output).as_str())
+            .unwrap();
+        // Name: Frame Writer Stall Time
+        // Format: list[(vid_time,ms)]
+        // Description:
+        // Time the solver waited for a free frame buffer because every buffer
+        // was still queued for writing.
+        /*== push "writer_stall" ==*/
+        let mut writer_stall = OpenOptions::new()
+            .create(true)
+            .append(true)
+            .open(format!("{}/data/writer_stall.out", args.output).as_str())
+            .unwrap();
+
+        let sink = if args.trajectory {
+            let path = format!("{}/trajectory.bin", args.output);
+            let capacity = (args.frames.max(0) + 1) as usize;
+            let vert_count = self.mesh.mesh.mesh.vertex_count;
+            FrameSink::Trajectory(if args.resume {
+                let count = (self.state.curr_frame + 1).max(0) as usize;
+                TrajectoryWriter::resume(&path, vert_count, capacity, count).unwrap()
+            } else {
+                TrajectoryWriter::new(&path, vert_count, capacity).unwrap()
+            })
+        } else if args.codec_step > 0.0 {
+            FrameSink::Delta(DeltaEncoder::new(
+                args.codec_step,
+                args.codec_keyframe as usize,
+            ))
+        } else {
+            FrameSink::Raw
+        };
+        let mut writer = FrameWriter::new(&args.output, sink, args.write_buffers as usize);
+
         let mut first_step = true;
         loop {
+            let constraint_time = Instant::now();
             constraint = scene.make_constraint(args, self.state.time, &self.mesh);
             unsafe { update_constraint(&constraint) };
+            writeln!(
+                time_per_constraint,
+                "{} {}",
+                self.state.time,
+                constraint_time.elapsed().as_secs_f64() * 1000.0
+            )
+            .unwrap();
             if !first_step {
                 match result_receiver.try_recv() {
                     Ok(bvh) => {
@@ -195,33 +280,73 @@ impl Backend {
                     self.state.curr_frame, self.state.time
                 )
                 .unwrap();
-                let path = format!("{}/vert_{}.bin.tmp", args.output, self.state.curr_frame);
-                let mut file = OpenOptions::new()
-                    .write(true)
-                    .create(true)
-                    .truncate(true)
-                    .open(path.clone())
-                    .unwrap();
-                let surface_vert_count = self.mesh.mesh.mesh.vertex_count;
-                let data: Vec<f32> = self
-                    .state
-                    .curr_vertex
-                    .columns(0, surface_vert_count)
-                    .iter()
-                    .copied()
-                    .collect();
-                let buff = unsafe {
-                    std::slice::from_raw_parts(
-                        data.as_ptr() as *const u8,
-                        data.len() * std::mem::size_of::<f32>(),
+                let frame = self.state.curr_frame as usize;
+                let record = scene.record();
+                let snapshot = frame == 0
+                    || (args.snapshot_interval > 0 && frame % args.snapshot_interval as usize == 0);
+                let stride = frame % args.output_stride.max(1) as usize == 0;
+                let full = snapshot || (stride && record.is_empty());
+                if full || stride {
+                    let (mut data, stall) = writer.acquire();
+                    data.clear();
+                    if full {
+                        let surface_vert_count = self.mesh.mesh.mesh.vertex_count;
+                        data.extend_from_slice(
+                            &self.state.curr_vertex.as_slice()[..3 * surface_vert_count],
+                        );
+                    } else {
+                        for &i in record {
+                            data.extend(self.state.curr_vertex.column(i).iter());
+                        }
+                    }
+                    let depth = writer.submit(frame, self.state.time, data, full);
+                    writeln!(writer_queue, "{} {}", self.state.curr_frame, depth).unwrap();
+                    writeln!(
+                        writer_stall,
+                        "{} {}",
+                        self.state.curr_frame,
+                        stall.as_secs_f64() * 1000.0
                     )
+                    .unwrap();
+                }
+                let step_ms = if step_count > 0 {
+                    step_time / step_count as f64
+                } else {
+                    0.0
                 };
-                file.write_all(buff).unwrap();
-                file.flush().unwrap();
-                std::fs::rename(path.clone(), path.replace(".tmp", "")).unwrap();
+                progress.send(serde_json::json!({
+                    "event": "frame",
+                    "frame": new_frame,
+                    "time": self.state.time,
+                    "frames": args.frames,
+                    "written": full || stride,
+                    "frame_ms": elapsed_time.as_secs_f64() * 1000.0,
+                    "steps": step_count,
+                    "step_ms": step_ms,
+                }));
+                step_count = 0;
+                step_time = 0.0;
+                if args.checkpoint_interval > 0
+                    && frame > 0
+                    && frame % args.checkpoint_interval as usize == 0
+                {
+                    // Frames up to this one must be on disk before the
+                    // checkpoint is, since resuming only rewrites later frames
+                    writer.flush();
+                    let checkpoint = Checkpoint {
+                        frame: self.state.curr_frame,
+                        time: self.state.time,
+                        prev_dt: self.state.prev_dt,
+                        curr_vertex: self.state.curr_vertex.clone(),
+                        prev_vertex: self.state.prev_vertex.clone(),
+                    };
+                    checkpoint
+                        .save(&args.output, args.checkpoint_keep as usize)
+                        .unwrap();
+                }
                 last_time = Instant::now();
 
-                if self.state.curr_frame == args.fake_crash_frame {
+                if !args.resume && self.state.curr_frame == args.fake_crash_frame {
                     panic!("fake crash!");
                 }
             }
@@ -230,10 +355,13 @@ impl Backend {
             }
             scene.update_param(args, self.state.time, &mut param);
             let mut result = StepResult::default();
+            let step_start = Instant::now();
             unsafe { advance(&mut result) };
             if !result.success() {
                 panic!("failed to advance");
             }
+            step_count += 1;
+            step_time += step_start.elapsed().as_secs_f64() * 1000.0;
             self.state.time = result.time;
             if first_step {
                 let data = (
@@ -247,7 +375,13 @@ impl Backend {
             }
         }
         let _ = result_receiver.try_recv();
+        writer.finish();
         write_current_time_to_file(finished_path.to_str().unwrap()).unwrap();
+        progress.send(serde_json::json!({
+            "event": "finished",
+            "frame": self.state.curr_frame,
+            "time": self.state.time,
+        }));
     }
 }
 
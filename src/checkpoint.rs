@@ -0,0 +1,254 @@
+// File: checkpoint.rs
+// Author: Ryoichi Ando (ryoichi.ando@zozo.com)
+// License: Apache v2.0
+
+use na::Matrix3xX;
+use std::fs;
+use std::io;
+use std::path::{Path, PathBuf};
+
+// Layout of checkpoint/state_N.bin, all values little-endian:
+//
+//   offset  size  field
+//   0       8     magic "PPFCKPT\0"
+//   8       4     version (u32)
+//   12      4     video frame number (i32)
+//   16      8     simulation time (f64)
+//   24      4     previous step size (f32)
+//   28      4     reserved
+//   32      8     vertex count (u64)
+//   40            current positions, then previous positions (3 f32 each)
+//
+// Together with the scene, this is everything the solver needs to carry on:
+// the velocity is recovered from the two position sets and the previous step
+// size, and pins, walls, spheres and dynamic parameters are evaluated from
+// the simulation time. A checkpoint is written to a temporary file and then
+// renamed, so a crash while saving leaves the previous checkpoints intact.
+
+const MAGIC: &[u8; 8] = b"PPFCKPT\0";
+const VERSION: u32 = 1;
+const HEADER_SIZE: usize = 40;
+
+pub struct Checkpoint {
+    pub frame: i32,
+    pub time: f64,
+    pub prev_dt: f32,
+    pub curr_vertex: Matrix3xX<f32>,
+    pub prev_vertex: Matrix3xX<f32>,
+}
+
+fn checkpoint_dir(output: &str) -> PathBuf {
+    Path::new(output).join("checkpoint")
+}
+
+fn list(output: &str) -> Vec<(i32, PathBuf)> {
+    let mut result = Vec::new();
+    if let Ok(entries) = fs::read_dir(checkpoint_dir(output)) {
+        for entry in entries.flatten() {
+            let name = entry.file_name().to_string_lossy().to_string();
+            if let Some(frame) = name
+                .strip_prefix("state_")
+                .and_then(|name| name.strip_suffix(".bin"))
+                .and_then(|frame| frame.parse::<i32>().ok())
+            {
+                result.push((frame, entry.path()));
+            }
+        }
+    }
+    result.sort_by_key(|(frame, _)| *frame);
+    result
+}
+
+impl Checkpoint {
+    pub fn save(&self, output: &str, keep: usize) -> io::Result<()> {
+        let dir = checkpoint_dir(output);
+        fs::create_dir_all(&dir)?;
+        let n = self.curr_vertex.ncols();
+        assert_eq!(self.prev_vertex.ncols(), n);
+        let mut buff = Vec::with_capacity(HEADER_SIZE + 24 * n);
+        buff.extend_from_slice(MAGIC);
+        buff.extend_from_slice(&VERSION.to_le_bytes());
+        buff.extend_from_slice(&self.frame.to_le_bytes());
+        buff.extend_from_slice(&self.time.to_le_bytes());
+        buff.extend_from_slice(&self.prev_dt.to_le_bytes());
+        buff.extend_from_slice(&0_u32.to_le_bytes());
+        buff.extend_from_slice(&(n as u64).to_le_bytes());
+        for x in self.curr_vertex.iter().chain(self.prev_vertex.iter()) {
+            buff.extend_from_slice(&x.to_le_bytes());
+        }
+        let path = dir.join(format!("state_{}.bin", self.frame));
+        let tmp = dir.join(format!("state_{}.bin.tmp", self.frame));
+        fs::write(&tmp, &buff)?;
+        fs::rename(&tmp, &path)?;
+        let saved = list(output);
+        if saved.len() > keep.max(1) {
+            for (_, path) in saved[..saved.len() - keep.max(1)].iter() {
+                fs::remove_file(path)?;
+            }
+        }
+        Ok(())
+    }
+
+    fn load(path: &Path) -> io::Result<Self> {
+        let invalid = |msg: &str| io::Error::new(io::ErrorKind::InvalidData, msg.to_string());
+        let buff = fs::read(path)?;
+        if buff.len() < HEADER_SIZE || &buff[0..8] != MAGIC {
+            return Err(invalid("not a checkpoint file"));
+        }
+        let u32_at = |i: usize| u32::from_le_bytes(buff[i..i + 4].try_into().unwrap());
+        if u32_at(8) != VERSION {
+            return Err(invalid("unsupported checkpoint version"));
+        }
+        let frame = i32::from_le_bytes(buff[12..16].try_into().unwrap());
+        let time = f64::from_le_bytes(buff[16..24].try_into().unwrap());
+        let prev_dt = f32::from_le_bytes(buff[24..28].try_into().unwrap());
+        let n = u64::from_le_bytes(buff[32..40].try_into().unwrap()) as usize;
+        if buff.len() != HEADER_SIZE + 24 * n {
+            return Err(invalid("truncated checkpoint file"));
+        }
+        let data: Vec<f32> = buff[HEADER_SIZE..]
+            .chunks_exact(4)
+            .map(|x| f32::from_le_bytes(x.try_into().unwrap()))
+            .collect();
+        Ok(Self {
+            frame,
+            time,
+            prev_dt,
+            curr_vertex: Matrix3xX::from_column_slice(&data[..3 * n]),
+            prev_vertex: Matrix3xX::from_column_slice(&data[3 * n..]),
+        })
+    }
+
+    // Remove the frames that an interrupted run wrote after this checkpoint,
+    // so that readers never mix them with the frames of the resumed run.
+    pub fn discard_later_frames(&self, output: &str) -> io::Result<()> {
+        for entry in fs::read_dir(output)?.flatten() {
+            let name = entry.file_name().to_string_lossy().to_string();
+            let frame = ["vert_", "record_"]
+                .iter()
+                .filter_map(|prefix| name.strip_prefix(prefix))
+                .filter_map(|rest| rest.split('.').next())
+                .find_map(|frame| frame.parse::<i32>().ok());
+            if frame.map(|frame| frame > self.frame).unwrap_or(false) {
+                fs::remove_file(entry.path())?;
+            }
+        }
+        Ok(())
+    }
+
+    pub fn load_latest(output: &str) -> Option<Self> {
+        for (_, path) in list(output).iter().rev() {
+            match Self::load(path) {
+                Ok(checkpoint) => return Some(checkpoint),
+                Err(err) => log::warn!("skipping checkpoint {}: {}", path.display(), err),
+            }
+        }
+        None
+    }
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+    use crate::writer::tests::{check_fixture, temp_path};
+
+    fn sample(frame: i32) -> Checkpoint {
+        let curr = (0..9).map(|i| frame as f32 + 0.5 * i as f32);
+        let prev = (0..9).map(|i| frame as f32 + 0.375 * i as f32);
+        Checkpoint {
+            frame,
+            time: 0.5 * frame as f64,
+            prev_dt: 0.25,
+            curr_vertex: Matrix3xX::from_column_slice(&curr.collect::<Vec<_>>()),
+            prev_vertex: Matrix3xX::from_column_slice(&prev.collect::<Vec<_>>()),
+        }
+    }
+
+    fn values(matrix: &Matrix3xX<f32>) -> Vec<f32> {
+        matrix.iter().copied().collect()
+    }
+
+    fn names(dir: &Path) -> Vec<String> {
+        let mut names = fs::read_dir(dir)
+            .unwrap()
+            .map(|entry| entry.unwrap().file_name().to_string_lossy().to_string())
+            .collect::<Vec<_>>();
+        names.sort();
+        names
+    }
+
+    #[test]
+    fn checkpoint_layout() {
+        let output = temp_path("checkpoint-layout");
+        sample(4).save(&output, 1).unwrap();
+        let data = fs::read(checkpoint_dir(&output).join("state_4.bin")).unwrap();
+        fs::remove_dir_all(&output).unwrap();
+
+        assert_eq!(data.len(), HEADER_SIZE + 2 * 9 * 4);
+        assert_eq!(&data[0..8], MAGIC);
+        assert_eq!(u32::from_le_bytes(data[8..12].try_into().unwrap()), VERSION);
+        assert_eq!(i32::from_le_bytes(data[12..16].try_into().unwrap()), 4);
+        assert_eq!(f64::from_le_bytes(data[16..24].try_into().unwrap()), 2.0);
+        assert_eq!(f32::from_le_bytes(data[24..28].try_into().unwrap()), 0.25);
+        assert_eq!(u64::from_le_bytes(data[32..40].try_into().unwrap()), 3);
+        check_fixture("checkpoint/state_4.bin", &data);
+    }
+
+    #[test]
+    fn checkpoint_skips_corrupt_files() {
+        let output = temp_path("checkpoint-corrupt");
+        for frame in [2, 4, 6, 8] {
+            sample(frame).save(&output, 2).unwrap();
+        }
+        let dir = checkpoint_dir(&output);
+        assert_eq!(names(&dir), ["state_6.bin", "state_8.bin"]);
+        let checkpoint = Checkpoint::load_latest(&output).unwrap();
+        assert_eq!(checkpoint.frame, 8);
+        assert_eq!(checkpoint.time, 4.0);
+        assert_eq!(checkpoint.prev_dt, 0.25);
+        assert_eq!(
+            values(&checkpoint.curr_vertex),
+            values(&sample(8).curr_vertex)
+        );
+        assert_eq!(
+            values(&checkpoint.prev_vertex),
+            values(&sample(8).prev_vertex)
+        );
+
+        // Garbage, a truncated file and an unknown version are all skipped
+        let mut data = fs::read(dir.join("state_8.bin")).unwrap();
+        fs::write(dir.join("state_8.bin"), b"garbage").unwrap();
+        fs::write(dir.join("state_9.bin"), &data[..data.len() - 4]).unwrap();
+        data[8] = VERSION as u8 + 1;
+        fs::write(dir.join("state_10.bin"), &data).unwrap();
+        assert_eq!(Checkpoint::load_latest(&output).unwrap().frame, 6);
+
+        fs::write(dir.join("state_6.bin"), b"").unwrap();
+        assert!(Checkpoint::load_latest(&output).is_none());
+        fs::remove_dir_all(&output).unwrap();
+        assert!(Checkpoint::load_latest(&output).is_none());
+    }
+
+    #[test]
+    fn checkpoint_discards_later_frames() {
+        let output = temp_path("checkpoint-discard");
+        fs::create_dir_all(&output).unwrap();
+        for name in [
+            "vert_5.bin",
+            "vert_6.bin",
+            "vert_7.bin",
+            "vert_12.qbin",
+            "record_6.bin",
+            "record_8.bin",
+            "trajectory.bin",
+        ] {
+            fs::write(Path::new(&output).join(name), b"").unwrap();
+        }
+        sample(6).discard_later_frames(&output).unwrap();
+        assert_eq!(
+            names(Path::new(&output)),
+            ["record_6.bin", "trajectory.bin", "vert_5.bin", "vert_6.bin"]
+        );
+        fs::remove_dir_all(&output).unwrap();
+    }
+}
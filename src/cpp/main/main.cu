@@ -844,7 +844,10 @@ extern "C" void update_dyn(unsigned *index, unsigned *offset) {
 }
 
 extern "C" void update_constraint(const Constraint *constraint) {
+    // The static collision mesh is uploaded once in initialize()
+    CollisionMesh mesh = main_helper::host_dataset.constraint.mesh;
     main_helper::host_dataset.constraint = *constraint;
+    main_helper::host_dataset.constraint.mesh = mesh;
     mem::copy_to_device(constraint->fix,
                         main_helper::dev_dataset.constraint.fix);
     mem::copy_to_device(constraint->pull,
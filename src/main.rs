@@ -6,15 +6,19 @@ mod args;
 mod backend;
 mod builder;
 mod bvh;
+mod checkpoint;
 mod cvec;
 mod cvecvec;
 mod data;
 mod mesh;
+mod progress;
 mod scene;
 mod triutils;
+mod writer;
 
 use args::Args;
 use backend::MeshSet;
+use checkpoint::Checkpoint;
 use clap::Parser;
 use data::{BvhSet, DataSet, FaceProp, ParamSet, TetProp};
 use log::*;
@@ -22,6 +26,7 @@ use log4rs::append::console::ConsoleAppender;
 use log4rs::config::{Appender, Config, Root};
 use log4rs::encode::pattern::PatternEncoder;
 use mesh::Mesh as SimMesh;
+use progress::Progress;
 use scene::Scene;
 use std::ffi::CString;
 use std::fs::OpenOptions;
@@ -46,6 +51,12 @@ extern "C" fn print_rust(message: *const libc::c_char) {
 fn main() {
     let mut args = Args::parse();
     setup(&args);
+    let progress = Progress::connect(&args.progress_socket);
+    let default_hook = std::panic::take_hook();
+    std::panic::set_hook(Box::new(move |info| {
+        progress.error(&info.to_string());
+        default_hook(info);
+    }));
     let info = git_info::get();
     info!(
         "git branch: {}",
@@ -130,17 +141,54 @@ fn main() {
     .unwrap();
     let velocity = scene.get_initial_velocity(&args, mesh.vertex.ncols());
     let time = backend.state.time;
-    let dataset = builder::build(
-        &args,
-        mesh,
-        &velocity,
-        &props,
-        scene.make_constraint(&args, time, mesh),
-    );
-    let param = builder::make_param(&args);
+    let mut constraint = scene.make_constraint(&args, time, mesh);
+    constraint.mesh = scene.make_collision_mesh();
+    let mut dataset = builder::build(&args, mesh, &velocity, &props, constraint);
+    let mut param = builder::make_param(&args);
+    let to_cvec = |x: &na::Matrix3xX<f32>| -> CVec<data::Vec3f> {
+        CVec::from(
+            x.column_iter()
+                .map(|x| x.into())
+                .collect::<Vec<_>>()
+                .as_slice(),
+        )
+    };
+    if let Some(position) = scene.get_initial_position() {
+        info!("warm starting from the initial state of the scene");
+        let dt = args.dt.min(0.9999 / args.fps as f32);
+        dataset.vertex.curr = to_cvec(position);
+        dataset.vertex.prev = to_cvec(&(position - dt * &velocity));
+        dataset.bvh = build_bvh_set(position, mesh);
+    }
+    if args.resume {
+        let checkpoint =
+            Checkpoint::load_latest(&args.output).expect("no checkpoint to resume from");
+        info!(
+            "resuming from frame {} at time {}",
+            checkpoint.frame, checkpoint.time
+        );
+        assert_eq!(checkpoint.curr_vertex.ncols(), mesh.vertex.ncols());
+        dataset.vertex.curr = to_cvec(&checkpoint.curr_vertex);
+        dataset.vertex.prev = to_cvec(&checkpoint.prev_vertex);
+        dataset.bvh = build_bvh_set(&checkpoint.curr_vertex, mesh);
+        checkpoint.discard_later_frames(&args.output).unwrap();
+        param.time = checkpoint.time;
+        param.prev_dt = checkpoint.prev_dt;
+        backend.resume(checkpoint);
+    }
     backend.run(&args, dataset, param, scene);
 }
 
+// Build the collision BVHs around the given vertex positions, for a
+// simulation that does not start from the rest shape.
+fn build_bvh_set(position: &na::Matrix3xX<f32>, mesh: &MeshSet) -> BvhSet {
+    BvhSet {
+        face: builder::build_bvh(position, &mesh.mesh.mesh.face),
+        edge: builder::build_bvh(position, &mesh.mesh.mesh.edge),
+        vertex: builder::build_bvh(position, &mesh.mesh.mesh.vertex),
+    }
+}
+
 fn remove_files_in_dir(path: &str) -> std::io::Result<()> {
     if let Ok(entries) = std::fs::read_dir(path) {
         for entry in entries.into_iter().flatten() {
@@ -156,7 +204,9 @@ fn remove_files_in_dir(path: &str) -> std::io::Result<()> {
 }
 
 fn setup(args: &Args) {
-    remove_files_in_dir(&args.output).unwrap();
+    if !args.resume {
+        remove_files_in_dir(&args.output).unwrap();
+    }
 
     if !std::path::Path::new(&args.output).exists() {
         std::fs::create_dir_all(&args.output).unwrap_or(());
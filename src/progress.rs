@@ -0,0 +1,47 @@
+// File: progress.rs
+// Author: Ryoichi Ando (ryoichi.ando@zozo.com)
+// License: Apache v2.0
+
+use serde_json::Value;
+use std::os::unix::net::UnixDatagram;
+use std::path::PathBuf;
+
+// Pushes solver events to the frontend as JSON datagrams on a Unix socket
+// bound by the frontend. Each datagram is one object with an "event" field:
+//
+//   {"event": "start", "frame": 0, "time": 0.0, "frames": 300}
+//   {"event": "frame", "frame": 12, "time": 0.2, "frames": 300,
+//    "frame_ms": 812.0, "steps": 4, "step_ms": 203.0}
+//   {"event": "finished", "frame": 300, "time": 5.0}
+//   {"event": "error", "message": "..."}
+//
+// The socket is non-blocking and send errors are ignored, so a slow or
+// missing listener never stalls the simulation; it only misses events.
+
+pub struct Progress {
+    socket: Option<(UnixDatagram, PathBuf)>,
+}
+
+impl Progress {
+    pub fn connect(path: &str) -> Self {
+        let socket = if path.is_empty() {
+            None
+        } else {
+            UnixDatagram::unbound()
+                .and_then(|socket| socket.set_nonblocking(true).map(|_| socket))
+                .map(|socket| (socket, PathBuf::from(path)))
+                .ok()
+        };
+        Self { socket }
+    }
+
+    pub fn send(&self, event: Value) {
+        if let Some((socket, path)) = &self.socket {
+            let _ = socket.send_to(event.to_string().as_bytes(), path);
+        }
+    }
+
+    pub fn error(&self, message: &str) {
+        self.send(serde_json::json!({ "event": "error", "message": message }));
+    }
+}
@@ -5,7 +5,8 @@
 use super::data::*;
 use super::{builder, Args, CVec, MeshSet, ParamSet, SimMesh};
 use bytemuck::{cast_slice, Pod};
-use na::{Const, Matrix, Matrix2xX, Matrix3xX, Matrix4xX, VecStorage, Vector3};
+use na::{Const, Matrix, Matrix2xX, Matrix3x4, Matrix3xX, Matrix4xX, VecStorage, Vector3};
+use rayon::prelude::*;
 use serde::Deserialize;
 use std::fs::{self, File};
 use std::io::{self, BufRead, Read};
@@ -18,6 +19,7 @@ pub struct Scene {
     vert_dmap: Vec<u32>,
     vert: Matrix3xX<f32>,
     vel: Matrix3xX<f32>,
+    init_vert: Option<Matrix3xX<f32>>,
     uv: Option<Matrix2xX<f32>>,
     rod: Matrix2xX<usize>,
     rod_scale_factor: Vec<f32>,
@@ -26,11 +28,11 @@ pub struct Scene {
     static_vert_dmap: Vec<u32>,
     static_vert: Matrix3xX<f32>,
     static_tri: Matrix3xX<usize>,
-    stitch_ind: Matrix3xX<usize>,
-    stitch_w: Matrix2xX<f32>,
+    stitch: Vec<Stitch>,
     pin: Vec<Pin>,
     wall: Vec<InvisibleWall>,
     sphere: Vec<InvisibleSphere>,
+    record: Vec<usize>,
     shell_count: usize,
 }
 
@@ -42,16 +44,66 @@ struct Spin {
     t_end: f64,
 }
 
+enum Keyframe {
+    Dense(Matrix3xX<f32>),
+    Affine(Matrix3x4<f32>),
+}
+
+impl Keyframe {
+    fn position(&self, i: usize, rest: &Vector3<f32>) -> Vector3<f32> {
+        match self {
+            Keyframe::Dense(target) => target.column(i).into(),
+            Keyframe::Affine(transform) => {
+                transform.fixed_view::<3, 3>(0, 0) * rest + transform.column(3)
+            }
+        }
+    }
+}
+
 struct Pin {
     index: Vec<usize>,
     timing: Vec<f64>,
-    target: Vec<Matrix3xX<f32>>,
+    target: Vec<Keyframe>,
     spin: Vec<Spin>,
     unpin: bool,
     transition: String,
     pull_w: f32,
 }
 
+struct Instance {
+    vert: Matrix3xX<f64>,
+    block: Vec<u8>,
+    rank: Vec<usize>,
+    rod: Matrix2xX<usize>,
+    tri: Matrix3xX<usize>,
+    tet: Matrix4xX<usize>,
+    transform: Vec<f64>,
+    offset: Vec<usize>,
+    dmap: Vec<u32>,
+    vel: Matrix3xX<f32>,
+}
+
+impl Instance {
+    const OFFSET_STRIDE: usize = 7;
+
+    fn count(&self) -> usize {
+        self.dmap.len()
+    }
+
+    fn offset(&self, i: usize) -> &[usize] {
+        &self.offset[Self::OFFSET_STRIDE * i..Self::OFFSET_STRIDE * (i + 1)]
+    }
+
+    fn map(&self, i: usize) -> Vec<usize> {
+        let offset = self.offset(i);
+        self.block
+            .iter()
+            .zip(self.rank.iter())
+            .map(|(&block, &rank)| offset[block as usize] + rank)
+            .collect()
+    }
+}
+
 struct InvisibleSphere {
     center: Matrix3xX<f32>,
     radius: Vec<f32>,
@@ -106,6 +158,53 @@ where
     })
 }
 
+fn read_index_from_file<const C: usize>(path: &str, wide: bool) -> MatReadResult<usize, C> {
+    if wide {
+        read_mat_from_file::<usize, C>(path)
+    } else {
+        read_mat_from_file::<u32, C>(path).map(|mat| mat.map(|x| x as usize))
+    }
+}
+
+fn read_position_from_file(path: &str, wide: bool) -> io::Result<Matrix3xX<f32>> {
+    if wide {
+        read_mat_from_file::<f64, 3>(path).map(|mat| mat.map(|x| x as f32))
+    } else {
+        read_mat_from_file::<f32, 3>(path)
+    }
+}
+
+fn read_index_vec(path: &str, wide: bool) -> Vec<usize> {
+    if wide {
+        read_vec::<usize>(path)
+    } else {
+        read_vec::<u32>(path)
+            .into_iter()
+            .map(|x| x as usize)
+            .collect()
+    }
+}
+
+fn calc_coefficient(time: f64, timings: &[f64], transition: &str) -> ([usize; 2], f32) {
+    if timings.is_empty() {
+        return ([0, 0], 1.0);
+    }
+    let last = timings.len() - 1;
+    let i = timings.partition_point(|&t| t <= time);
+    if i == 0 {
+        ([0, 0], 1.0)
+    } else if i > last {
+        ([last, last], 1.0)
+    } else {
+        let (t0, t1) = (timings[i - 1], timings[i]);
+        let mut w = (time - t0) / (t1 - t0);
+        if transition == "smooth" {
+            w = w * w * (3.0 - 2.0 * w);
+        }
+        ([i - 1, i], w as f32)
+    }
+}
+
 fn read_vec<T>(path: &str) -> Vec<T>
 where
     T: bytemuck::AnyBitPattern,
@@ -121,6 +220,73 @@ where
     }
 }
 
+fn expand_vertex(
+    vert: &Matrix3xX<f32>,
+    vel: &Matrix3xX<f32>,
+    dmap: &[u32],
+    instance: &[Instance],
+    n_vert: usize,
+) -> (Matrix3xX<f32>, Matrix3xX<f32>, Vec<u32>) {
+    let mut full_vert = Matrix3xX::<f32>::zeros(n_vert);
+    let mut full_vel = Matrix3xX::<f32>::zeros(n_vert);
+    let mut full_dmap = vec![0; n_vert];
+    let mut filled = vec![false; n_vert];
+    for inst in instance.iter() {
+        for i in 0..inst.count() {
+            let a = &inst.transform[12 * i..12 * (i + 1)];
+            for (x, j) in inst.vert.column_iter().zip(inst.map(i)) {
+                for r in 0..3 {
+                    let y = a[4 * r] * x[0] + a[4 * r + 1] * x[1] + a[4 * r + 2] * x[2];
+                    full_vert[(r, j)] = (y + a[4 * r + 3]) as f32;
+                }
+                full_vel.column_mut(j).copy_from(&inst.vel.column(i));
+                full_dmap[j] = inst.dmap[i];
+                filled[j] = true;
+            }
+        }
+    }
+    let mut k = 0;
+    for j in (0..n_vert).filter(|&j| !filled[j]) {
+        full_vert.column_mut(j).copy_from(&vert.column(k));
+        full_vel.column_mut(j).copy_from(&vel.column(k));
+        full_dmap[j] = dmap[k];
+        k += 1;
+    }
+    assert_eq!(k, vert.ncols());
+    (full_vert, full_vel, full_dmap)
+}
+
+fn expand_element<const C: usize>(
+    elm: &builder::ArbitrayElement<C>,
+    instance: &[Instance],
+    local: impl Fn(&Instance) -> &builder::ArbitrayElement<C>,
+    slot: usize,
+    n_elm: usize,
+) -> builder::ArbitrayElement<C> {
+    let mut full = builder::ArbitrayElement::<C>::zeros(n_elm);
+    let mut filled = vec![false; n_elm];
+    for inst in instance.iter() {
+        let template = local(inst);
+        for i in 0..inst.count() {
+            let map = inst.map(i);
+            let start = inst.offset(i)[4 + slot];
+            for (k, e) in template.column_iter().enumerate() {
+                for (dst, &src) in full.column_mut(start + k).iter_mut().zip(e.iter()) {
+                    *dst = map[src];
+                }
+                filled[start + k] = true;
+            }
+        }
+    }
+    let mut k = 0;
+    for j in (0..n_elm).filter(|&j| !filled[j]) {
+        full.column_mut(j).copy_from(&elm.column(k));
+        k += 1;
+    }
+    assert_eq!(k, elm.ncols());
+    full
+}
+
 fn read_dyn_param(path: &str) -> io::Result<DynParamTable> {
     let mut result = Vec::new();
     let mut curr_entry_name = String::new();
@@ -208,6 +374,98 @@ impl Scene {
         let _shell_vert_end = read_usize(count, "shell_vert_end");
         let _rod_count = read_usize(count, "rod_count");
         let shell_count = read_usize(count, "shell_count");
+        let (wide_index, wide_position) = match parsed.get("precision") {
+            Some(precision) => (
+                read_string(precision, "index") == "uint64",
+                read_string(precision, "position") == "float64",
+            ),
+            None => (true, true),
+        };
+        let n_instance = count
+            .get("instance")
+            .and_then(|v| v.as_integer())
+            .unwrap_or(0) as usize;
+        let n_record = count
+            .get("record")
+            .and_then(|v| v.as_integer())
+            .unwrap_or(0) as usize;
+        let record = if n_record > 0 {
+            let record = read_index_vec(&format!("{}/bin/record-ind.bin", args.path), wide_index);
+            assert_eq!(record.len(), n_record);
+            record
+        } else {
+            Vec::new()
+        };
+
+        let mut instance = Vec::new();
+        for i in 0..n_instance {
+            let title = format!("instance-{}", i);
+            let entry = parsed
+                .get(&title)
+                .unwrap_or_else(|| panic!("Failed to read instance {}", i));
+            let n_count = read_usize(entry, "count");
+            let n_inst_vert = read_usize(entry, "vert");
+            let n_inst_rod = read_usize(entry, "rod");
+            let n_inst_tri = read_usize(entry, "tri");
+            let n_inst_tet = read_usize(entry, "tet");
+            let dir = format!("{}/bin/instance-{}", args.path, i);
+            let vert = read_mat_from_file::<f64, 3>(&format!("{}/vert.bin", dir))
+                .expect("Failed to read instance vert");
+            let block = read_vec::<u8>(&format!("{}/block.bin", dir));
+            let rank = read_vec::<usize>(&format!("{}/rank.bin", dir));
+            let rod = if n_inst_rod > 0 {
+                read_index_from_file::<2>(&format!("{}/rod.bin", dir), wide_index)
+                    .expect("Failed to read instance rod")
+            } else {
+                Matrix2xX::<usize>::zeros(0)
+            };
+            let tri = if n_inst_tri > 0 {
+                read_index_from_file::<3>(&format!("{}/tri.bin", dir), wide_index)
+                    .expect("Failed to read instance tri")
+            } else {
+                Matrix3xX::<usize>::zeros(0)
+            };
+            let tet = if n_inst_tet > 0 {
+                read_index_from_file::<4>(&format!("{}/tet.bin", dir), wide_index)
+                    .expect("Failed to read instance tet")
+            } else {
+                Matrix4xX::<usize>::zeros(0)
+            };
+            let transform = read_vec::<f64>(&format!("{}/transform.bin", dir));
+            let offset = read_vec::<usize>(&format!("{}/offset.bin", dir));
+            let dmap = read_vec::<u32>(&format!("{}/dmap.bin", dir));
+            let vel = read_mat_from_file::<f32, 3>(&format!("{}/vel.bin", dir))
+                .expect("Failed to read instance vel");
+            assert_eq!(vert.ncols(), n_inst_vert);
+            assert_eq!(block.len(), n_inst_vert);
+            assert_eq!(rank.len(), n_inst_vert);
+            assert_eq!(rod.ncols(), n_inst_rod);
+            assert_eq!(tri.ncols(), n_inst_tri);
+            assert_eq!(tet.ncols(), n_inst_tet);
+            assert_eq!(transform.len(), 12 * n_count);
+            assert_eq!(offset.len(), Instance::OFFSET_STRIDE * n_count);
+            assert_eq!(dmap.len(), n_count);
+            assert_eq!(vel.ncols(), n_count);
+            instance.push(Instance {
+                vert,
+                block,
+                rank,
+                rod,
+                tri,
+                tet,
+                transform,
+                offset,
+                dmap,
+                vel,
+            });
+        }
+        let n_instanced = |size: fn(&Instance) -> usize| -> usize {
+            instance.iter().map(|x| x.count() * size(x)).sum()
+        };
+        let n_rest_vert = n_vert - n_instanced(|x| x.vert.ncols());
+        let n_rest_rod = n_rod - n_instanced(|x| x.rod.ncols());
+        let n_rest_tri = n_tri - n_instanced(|x| x.tri.ncols());
+        let n_rest_tet = n_tet - n_instanced(|x| x.tet.ncols());
 
         let displacement_path = format!("{}/bin/displacement.bin", args.path);
         let vert_dmap_path = format!("{}/bin/vert_dmap.bin", args.path);
@@ -228,9 +486,8 @@ impl Scene {
             .expect("Failed to read displacement")
             .map(|x| x as f32);
         let vert_dmap_mat = read_vec::<u32>(&vert_dmap_path);
-        let vert_mat = read_mat_from_file::<f64, 3>(&vert_path)
-            .expect("Failed to read vert")
-            .map(|x| x as f32);
+        let vert_mat =
+            read_position_from_file(&vert_path, wide_position).expect("Failed to read vert");
         let vel_mat = read_mat_from_file::<f32, 3>(&vel_path).expect("Failed to read velocity");
         let uv_mat = if std::path::Path::new(&uv_path).exists() {
             let mat = read_mat_from_file::<f32, 2>(&uv_path).expect("Failed to read uv");
@@ -239,40 +496,40 @@ impl Scene {
         } else {
             None
         };
-        let rod_mat = if n_rod > 0 {
-            read_mat_from_file::<usize, 2>(&rod_path).expect("Failed to read rod")
+        let rod_mat = if n_rest_rod > 0 {
+            read_index_from_file::<2>(&rod_path, wide_index).expect("Failed to read rod")
         } else {
             Matrix2xX::<usize>::zeros(0)
         };
         let rod_scale_factor = read_vec::<f32>(&rod_length_factor_path);
-        let tri_mat = if n_tri > 0 {
-            read_mat_from_file::<usize, 3>(&tri_path).expect("Failed to read tri")
+        let tri_mat = if n_rest_tri > 0 {
+            read_index_from_file::<3>(&tri_path, wide_index).expect("Failed to read tri")
         } else {
             Matrix3xX::<usize>::zeros(0)
         };
-        let tet_mat = if n_tet > 0 {
-            read_mat_from_file::<usize, 4>(&tet_path).expect("Failed to read tet")
+        let tet_mat = if n_rest_tet > 0 {
+            read_index_from_file::<4>(&tet_path, wide_index).expect("Failed to read tet")
         } else {
             Matrix4xX::<usize>::zeros(0)
         };
         let (static_vert_dmap_mat, static_vert_mat) = if n_static_vert > 0 {
             (
                 read_vec::<u32>(&static_vert_dmap_path),
-                read_mat_from_file::<f64, 3>(&static_vert_path)
-                    .expect("Failed to read static_vert")
-                    .map(|x| x as f32),
+                read_position_from_file(&static_vert_path, wide_position)
+                    .expect("Failed to read static_vert"),
             )
         } else {
             (Vec::new(), Matrix3xX::<f32>::zeros(0))
         };
         let static_tri_mat = if n_static_tri > 0 {
-            read_mat_from_file::<usize, 3>(&static_tri_path).expect("Failed to read static_tri")
+            read_index_from_file::<3>(&static_tri_path, wide_index)
+                .expect("Failed to read static_tri")
         } else {
             Matrix3xX::<usize>::zeros(0)
         };
         let (stitch_ind_mat, stitch_w_mat) = if n_stitch > 0 {
             (
-                read_mat_from_file::<usize, 3>(&stitch_ind_path)
+                read_index_from_file::<3>(&stitch_ind_path, wide_index)
                     .expect("Failed to read stitch_ind"),
                 read_mat_from_file::<f32, 2>(&stitch_w_path).expect("Failed to read stitch_w"),
             )
@@ -297,16 +554,26 @@ impl Scene {
             let mut target = Vec::new();
             if n_keyframe > 0 {
                 assert!(std::path::Path::new(&pin_dir).exists());
+                let kind = read_vec::<u8>(&format!("{}/bin/pin-kind-{}.bin", args.path, i));
+                let transform =
+                    read_vec::<f64>(&format!("{}/bin/pin-transform-{}.bin", args.path, i));
+                let mut transform = transform.chunks_exact(12);
                 for j in 0..n_keyframe {
-                    let target_path = format!("{}/{}.bin", pin_dir, j);
-                    target.push(
-                        read_mat_from_file::<f64, 3>(&target_path)
-                            .expect("Failed to read target")
-                            .map(|x| x as f32),
-                    );
+                    if kind.get(j).copied().unwrap_or(0) > 0 {
+                        let entry = transform.next().expect("Failed to read transform");
+                        target.push(Keyframe::Affine(
+                            Matrix3x4::from_row_slice(entry).map(|x| x as f32),
+                        ));
+                    } else {
+                        let target_path = format!("{}/{}.bin", pin_dir, j);
+                        target.push(Keyframe::Dense(
+                            read_position_from_file(&target_path, wide_position)
+                                .expect("Failed to read target"),
+                        ));
+                    }
                 }
             }
-            let pin_ind = read_vec::<usize>(&pin_ind_path);
+            let pin_ind = read_index_vec(&pin_ind_path, wide_index);
             let pin_timing =
                 read_vec::<f64>(format!("{}/bin/pin-timing-{}.bin", args.path, i).as_str());
             assert_eq!(pin_ind.len(), n_pin as usize);
@@ -412,15 +679,51 @@ impl Scene {
             });
         }
 
-        assert_eq!(vert_mat.ncols(), n_vert as usize);
-        assert_eq!(vel_mat.ncols(), n_vert as usize);
-        assert_eq!(rod_mat.ncols(), n_rod as usize);
-        assert_eq!(tri_mat.ncols(), n_tri as usize);
-        assert_eq!(tet_mat.ncols(), n_tet as usize);
+        assert_eq!(vert_mat.ncols(), n_rest_vert);
+        assert_eq!(vel_mat.ncols(), n_rest_vert);
+        assert_eq!(vert_dmap_mat.len(), n_rest_vert);
+        assert_eq!(rod_mat.ncols(), n_rest_rod);
+        assert_eq!(tri_mat.ncols(), n_rest_tri);
+        assert_eq!(tet_mat.ncols(), n_rest_tet);
+
+        let (vert_mat, vel_mat, vert_dmap_mat) =
+            expand_vertex(&vert_mat, &vel_mat, &vert_dmap_mat, &instance, n_vert);
+        // A warm-started session carries the world-space state it starts
+        // from, indexed like the expanded vertices
+        let init_vert_path = format!("{}/bin/init_vert.bin", args.path);
+        let init_vel_path = format!("{}/bin/init_vel.bin", args.path);
+        let init_vert_mat = if std::path::Path::new(&init_vert_path).exists() {
+            let mat = read_mat_from_file::<f32, 3>(&init_vert_path)
+                .expect("Failed to read initial position");
+            assert_eq!(mat.ncols(), n_vert);
+            Some(mat)
+        } else {
+            None
+        };
+        let vel_mat = if std::path::Path::new(&init_vel_path).exists() {
+            let mat = read_mat_from_file::<f32, 3>(&init_vel_path)
+                .expect("Failed to read initial velocity");
+            assert_eq!(mat.ncols(), n_vert);
+            mat
+        } else {
+            vel_mat
+        };
+        let rod_mat = expand_element(&rod_mat, &instance, |x| &x.rod, 0, n_rod);
+        let tri_mat = expand_element(&tri_mat, &instance, |x| &x.tri, 1, n_tri);
+        let tet_mat = expand_element(&tet_mat, &instance, |x| &x.tet, 2, n_tet);
         assert_eq!(static_vert_mat.ncols(), n_static_vert as usize);
         assert_eq!(static_tri_mat.ncols(), n_static_tri as usize);
         assert_eq!(stitch_ind_mat.ncols(), n_stitch as usize);
         assert_eq!(stitch_w_mat.ncols(), n_stitch as usize);
+        let stitch = stitch_ind_mat
+            .column_iter()
+            .zip(stitch_w_mat.column_iter())
+            .map(|(ind, w)| Stitch {
+                index: Vec3u::from_iterator(ind.iter().map(|&x| x as u32)),
+                weight: w[1],
+                active: true,
+            })
+            .collect();
 
         let args_path = format!("{}/param.toml", args.path);
         let file_content = fs::read_to_string(args_path).unwrap();
@@ -428,6 +731,8 @@ impl Scene {
 
         config.param.path = args.path.clone();
         config.param.output = args.output.clone();
+        config.param.resume = args.resume;
+        config.param.progress_socket = args.progress_socket.clone();
 
         let dyn_args_path = format!("{}/dyn_param.txt", args.path);
         let dyn_args = if std::path::Path::new(&dyn_args_path).exists() {
@@ -443,6 +748,7 @@ impl Scene {
             vert_dmap: vert_dmap_mat,
             vert: vert_mat,
             vel: vel_mat,
+            init_vert: init_vert_mat,
             uv: uv_mat,
             rod: rod_mat,
             rod_scale_factor,
@@ -451,25 +757,33 @@ impl Scene {
             static_vert_dmap: static_vert_dmap_mat,
             static_vert: static_vert_mat,
             static_tri: static_tri_mat,
-            stitch_ind: stitch_ind_mat,
-            stitch_w: stitch_w_mat,
+            stitch,
             pin,
             wall,
             sphere,
+            record,
             shell_count,
         }
     }
 
+    pub fn record(&self) -> &[usize] {
+        &self.record
+    }
+
     pub fn override_args(&self, args: &mut Args) {
         *args = self.args.clone();
     }
 
+    pub fn get_initial_position(&self) -> Option<&Matrix3xX<f32>> {
+        self.init_vert.as_ref()
+    }
+
     pub fn get_initial_velocity(&self, _: &Args, _: usize) -> Matrix3xX<f32> {
         self.vel.clone()
     }
 
-    pub fn make_constraint(&self, _: &Args, time: f64, _: &MeshSet) -> Constraint {
-        let collision_mesh = if self.static_vert.ncols() > 0 {
+    pub fn make_collision_mesh(&self) -> CollisionMesh {
+        if self.static_vert.ncols() > 0 {
             let mut vert = self.static_vert.clone();
             for (i, mut x) in vert.column_iter_mut().enumerate() {
                 x += self.displacement.column(self.static_vert_dmap[i] as usize);
@@ -477,103 +791,76 @@ impl Scene {
             builder::make_collision_mesh(&vert, &self.static_tri)
         } else {
             CollisionMesh::new()
-        };
-        let calc_coefficient =
-            |time: f64, timings: &[f64], transition: &str| -> ([usize; 2], f32) {
-                if timings.is_empty() {
-                    ([0, 0], 1.0)
-                } else {
-                    let last_time = timings[timings.len() - 1];
-                    if time > last_time {
-                        ([timings.len() - 1, timings.len() - 1], 1.0)
-                    } else {
-                        for i in 0..timings.len() - 1 {
-                            let t0 = timings[i];
-                            let t1 = timings[i + 1];
-                            if time >= t0 && time < t1 {
-                                let mut w = (time - t0) / (t1 - t0);
-                                if transition == "smooth" {
-                                    w = w * w * (3.0 - 2.0 * w);
-                                }
-                                return ([i, i + 1], w as f32);
-                            }
-                        }
-                        panic!("Failed to calculate coefficient")
-                    }
-                }
-            };
+        }
+    }
+
+    fn make_pin_constraint(&self, time: f64) -> (Vec<FixPair>, Vec<PullPair>) {
         let mut fix = Vec::new();
         let mut pull = Vec::new();
         for pin in self.pin.iter() {
-            for (i, &ind) in pin.index.iter().enumerate() {
-                let dx = self.displacement.column(self.vert_dmap[ind] as usize);
-                let (mut kinematic, mut position) = {
-                    if pin.timing.len() <= 1 {
-                        let position = Some(self.vert.column(ind).into());
-                        (false, position)
-                    } else {
-                        assert_eq!(pin.timing.len(), pin.target.len());
-                        let last_time = pin.timing[pin.timing.len() - 1];
-                        if time > last_time && pin.unpin {
-                            (true, None)
-                        } else {
-                            let coeff = calc_coefficient(time, &pin.timing, &pin.transition);
-                            let (j, k) = (coeff.0[0], coeff.0[1]);
-                            let w = coeff.1;
-                            let p0: Vector3<f32> = pin.target[j].column(i).into();
-                            let p1: Vector3<f32> = pin.target[k].column(i).into();
-                            (true, Some(p0 * (1.0 - w) + p1 * w))
-                        }
-                    }
-                };
-                for spin in pin.spin.iter() {
+            let animated = pin.timing.len() > 1;
+            let released = animated && pin.unpin && time > pin.timing[pin.timing.len() - 1];
+            let segment = if animated && !released {
+                assert_eq!(pin.timing.len(), pin.target.len());
+                Some(calc_coefficient(time, &pin.timing, &pin.transition))
+            } else {
+                None
+            };
+            let rotation = pin
+                .spin
+                .iter()
+                .filter_map(|spin| {
                     let time = time.min(spin.t_end);
-                    if time > spin.t_start {
+                    (time > spin.t_start).then(|| {
                         let angle = spin.angular_velocity as f64 / 180.0
                             * std::f64::consts::PI
                             * (time - spin.t_start);
                         let axis = (spin.axis / spin.axis.norm()).map(f32::from);
-                        let cos_theta = angle.cos();
-                        let sin_theta = angle.sin();
-                        let p = position.unwrap_or_else(|| self.vert.column(ind).into());
-                        let p = p - spin.center;
-                        let rotated = p * (cos_theta as f32)
-                            + axis.cross(&p) * (sin_theta as f32)
-                            + axis * axis.dot(&p) * (1.0 - cos_theta) as f32;
-                        position = Some(rotated + spin.center);
-                        kinematic = true;
-                    }
-                }
-                if let Some(position) = position {
-                    if pin.pull_w > 0.0 {
-                        pull.push(PullPair {
-                            position: position + dx,
-                            index: ind as u32,
-                            weight: pin.pull_w,
-                        });
-                    } else {
-                        fix.push(FixPair {
-                            position: position + dx,
-                            index: ind as u32,
-                            kinematic,
-                        });
-                    }
+                        (spin.center, axis, angle.cos() as f32, angle.sin() as f32)
+                    })
+                })
+                .collect::<Vec<_>>();
+            let kinematic = animated || !rotation.is_empty();
+            let target = pin.index.par_iter().enumerate().filter_map(|(i, &ind)| {
+                let rest: Vector3<f32> = self.vert.column(ind).into();
+                let mut position = if released {
+                    None
+                } else if let Some(([j, k], w)) = segment {
+                    let p0 = pin.target[j].position(i, &rest);
+                    let p1 = pin.target[k].position(i, &rest);
+                    Some(p0 * (1.0 - w) + p1 * w)
+                } else {
+                    Some(rest)
+                };
+                for &(center, axis, cos_theta, sin_theta) in rotation.iter() {
+                    let p = position.unwrap_or(rest) - center;
+                    let rotated = p * cos_theta
+                        + axis.cross(&p) * sin_theta
+                        + axis * axis.dot(&p) * (1.0 - cos_theta);
+                    position = Some(rotated + center);
                 }
+                let dx = self.displacement.column(self.vert_dmap[ind] as usize);
+                position.map(|position| (ind as u32, position + dx))
+            });
+            if pin.pull_w > 0.0 {
+                pull.par_extend(target.map(|(index, position)| PullPair {
+                    position,
+                    index,
+                    weight: pin.pull_w,
+                }));
+            } else {
+                fix.par_extend(target.map(|(index, position)| FixPair {
+                    position,
+                    index,
+                    kinematic,
+                }));
             }
         }
-        let stitch = {
-            let mut stitch = Vec::new();
-            for i in 0..self.stitch_ind.ncols() {
-                stitch.push(Stitch {
-                    index: Vec3u::from_iterator(
-                        self.stitch_ind.column(i).iter().map(|&x| x as u32),
-                    ),
-                    weight: self.stitch_w.column(i)[1],
-                    active: true,
-                });
-            }
-            stitch
-        };
+        (fix, pull)
+    }
+
+    pub fn make_constraint(&self, _: &Args, time: f64, _: &MeshSet) -> Constraint {
+        let (fix, pull) = self.make_pin_constraint(time);
         let mut floor = Vec::new();
         let mut sphere = Vec::new();
         for wall in self.wall.iter() {
@@ -632,8 +919,8 @@ impl Scene {
             pull: CVec::from(&pull[..]),
             sphere: CVec::from(&sphere[..]),
             floor: CVec::from(&floor[..]),
-            stitch: CVec::from(&stitch[..]),
-            mesh: collision_mesh,
+            stitch: CVec::from(&self.stitch[..]),
+            mesh: CollisionMesh::new(),
         }
     }
 
@@ -686,3 +973,226 @@ impl Scene {
         }
     }
 }
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+    use clap::Parser;
+    use std::time::Instant;
+
+    fn make_scene(n_vert: usize, pin: Vec<Pin>) -> Scene {
+        let vert = Matrix3xX::from_fn(n_vert, |r, c| ((c * 3 + r) % 97) as f32 * 0.01);
+        Scene {
+            args: Args::parse_from(["ppf-contact-solver"]),
+            dyn_args: Vec::new(),
+            displacement: Matrix3xX::from_column_slice(&[0.0, 1.0, 0.0, 2.0, 0.0, 0.0]),
+            vert_dmap: (0..n_vert).map(|i| (i % 2) as u32).collect(),
+            vert,
+            vel: Matrix3xX::zeros(n_vert),
+            init_vert: None,
+            uv: None,
+            rod: Matrix2xX::zeros(0),
+            rod_scale_factor: Vec::new(),
+            tri: Matrix3xX::zeros(0),
+            tet: Matrix4xX::zeros(0),
+            static_vert_dmap: Vec::new(),
+            static_vert: Matrix3xX::zeros(0),
+            static_tri: Matrix3xX::zeros(0),
+            stitch: Vec::new(),
+            pin,
+            wall: Vec::new(),
+            sphere: Vec::new(),
+            record: Vec::new(),
+            shell_count: 0,
+        }
+    }
+
+    // Pins of `size` consecutive vertices, cycling through dense, affine,
+    // spinning, pulled and released pins
+    fn make_pins(n_vert: usize, size: usize) -> Vec<Pin> {
+        let mut pins = Vec::new();
+        for (k, start) in (0..n_vert).step_by(size).enumerate() {
+            let index: Vec<usize> = (start..(start + size).min(n_vert)).collect();
+            let n = index.len();
+            let timing = vec![0.0, 0.5, 1.0, 2.0];
+            let target = if k % 2 == 0 {
+                timing
+                    .iter()
+                    .map(|&t| Keyframe::Dense(Matrix3xX::from_element(n, t as f32)))
+                    .collect()
+            } else {
+                timing
+                    .iter()
+                    .map(|&t| {
+                        let mut transform = Matrix3x4::identity();
+                        transform[(1, 3)] = t as f32;
+                        transform[(0, 0)] = 1.0 + t as f32;
+                        Keyframe::Affine(transform)
+                    })
+                    .collect()
+            };
+            let spin = if k % 3 == 0 {
+                vec![Spin {
+                    center: Vector3::new(0.5, 0.0, 0.0),
+                    axis: Vector3::new(0.0, 2.0, 0.0),
+                    angular_velocity: 90.0,
+                    t_start: 0.25,
+                    t_end: 1.5,
+                }]
+            } else {
+                Vec::new()
+            };
+            let (timing, target) = if k % 5 == 4 {
+                (vec![0.0], vec![Keyframe::Dense(Matrix3xX::zeros(n))])
+            } else {
+                (timing, target)
+            };
+            pins.push(Pin {
+                index,
+                timing,
+                target,
+                spin,
+                unpin: k % 7 == 6,
+                transition: if k % 2 == 0 { "smooth" } else { "linear" }.to_string(),
+                pull_w: if k % 4 == 3 { 0.5 } else { 0.0 },
+            });
+        }
+        pins
+    }
+
+    // The per-vertex assembly that make_pin_constraint replaced: keyframes
+    // are found by a linear scan and spins are evaluated for every vertex
+    fn reference_pin_constraint(scene: &Scene, time: f64) -> (Vec<FixPair>, Vec<PullPair>) {
+        let scan = |time: f64, timings: &[f64], transition: &str| -> ([usize; 2], f32) {
+            let last = timings.len() - 1;
+            if time >= timings[last] {
+                return ([last, last], 1.0);
+            }
+            for i in 0..last {
+                let (t0, t1) = (timings[i], timings[i + 1]);
+                if time >= t0 && time < t1 {
+                    let mut w = (time - t0) / (t1 - t0);
+                    if transition == "smooth" {
+                        w = w * w * (3.0 - 2.0 * w);
+                    }
+                    return ([i, i + 1], w as f32);
+                }
+            }
+            ([0, 0], 1.0)
+        };
+        let mut fix = Vec::new();
+        let mut pull = Vec::new();
+        for pin in scene.pin.iter() {
+            for (i, &ind) in pin.index.iter().enumerate() {
+                let rest: Vector3<f32> = scene.vert.column(ind).into();
+                let dx = scene.displacement.column(scene.vert_dmap[ind] as usize);
+                let (mut kinematic, mut position) = if pin.timing.len() <= 1 {
+                    (false, Some(rest))
+                } else if time > pin.timing[pin.timing.len() - 1] && pin.unpin {
+                    (true, None)
+                } else {
+                    let ([j, k], w) = scan(time, &pin.timing, &pin.transition);
+                    let p0 = pin.target[j].position(i, &rest);
+                    let p1 = pin.target[k].position(i, &rest);
+                    (true, Some(p0 * (1.0 - w) + p1 * w))
+                };
+                for spin in pin.spin.iter() {
+                    let time = time.min(spin.t_end);
+                    if time > spin.t_start {
+                        let angle = spin.angular_velocity as f64 / 180.0
+                            * std::f64::consts::PI
+                            * (time - spin.t_start);
+                        let axis = (spin.axis / spin.axis.norm()).map(f32::from);
+                        let (cos_theta, sin_theta) = (angle.cos() as f32, angle.sin() as f32);
+                        let p = position.unwrap_or(rest) - spin.center;
+                        let rotated = p * cos_theta
+                            + axis.cross(&p) * sin_theta
+                            + axis * axis.dot(&p) * (1.0 - cos_theta);
+                        position = Some(rotated + spin.center);
+                        kinematic = true;
+                    }
+                }
+                if let Some(position) = position {
+                    if pin.pull_w > 0.0 {
+                        pull.push(PullPair {
+                            position: position + dx,
+                            index: ind as u32,
+                            weight: pin.pull_w,
+                        });
+                    } else {
+                        fix.push(FixPair {
+                            position: position + dx,
+                            index: ind as u32,
+                            kinematic,
+                        });
+                    }
+                }
+            }
+        }
+        (fix, pull)
+    }
+
+    #[test]
+    fn calc_coefficient_finds_segments() {
+        let timing = [0.0, 1.0, 3.0];
+        assert_eq!(calc_coefficient(-1.0, &timing, "linear"), ([0, 0], 1.0));
+        assert_eq!(calc_coefficient(0.0, &timing, "linear"), ([0, 1], 0.0));
+        assert_eq!(calc_coefficient(2.0, &timing, "linear"), ([1, 2], 0.5));
+        assert_eq!(calc_coefficient(1.5, &timing, "smooth").0, [1, 2]);
+        assert_eq!(calc_coefficient(3.0, &timing, "linear"), ([2, 2], 1.0));
+        assert_eq!(calc_coefficient(9.0, &timing, "linear"), ([2, 2], 1.0));
+        assert_eq!(calc_coefficient(0.0, &[], "linear"), ([0, 0], 1.0));
+    }
+
+    #[test]
+    fn pin_constraint_matches_reference() {
+        let n_vert = 5000;
+        let scene = make_scene(n_vert, make_pins(n_vert, 37));
+        for time in [0.0, 0.2, 0.5, 0.75, 1.0, 1.7, 2.0, 2.5] {
+            let (fix, pull) = scene.make_pin_constraint(time);
+            let (ref_fix, ref_pull) = reference_pin_constraint(&scene, time);
+            assert_eq!(fix.len(), ref_fix.len());
+            assert_eq!(pull.len(), ref_pull.len());
+            for (a, b) in fix.iter().zip(ref_fix.iter()) {
+                assert_eq!((a.index, a.kinematic), (b.index, b.kinematic));
+                assert!((a.position - b.position).norm() < 1e-5);
+            }
+            for (a, b) in pull.iter().zip(ref_pull.iter()) {
+                assert_eq!((a.index, a.weight), (b.index, b.weight));
+                assert!((a.position - b.position).norm() < 1e-5);
+            }
+        }
+    }
+
+    // cargo test --release -- --ignored --nocapture bench_pin_constraint
+    #[test]
+    #[ignore]
+    fn bench_pin_constraint() {
+        let n_vert = 1_000_000;
+        for size in [1_000_000, 1000, 10] {
+            let scene = make_scene(n_vert, make_pins(n_vert, size));
+            let times: Vec<f64> = (0..20).map(|i| 0.1 * i as f64).collect();
+            let mut elapsed = [0.0; 2];
+            for &time in times.iter() {
+                let start = Instant::now();
+                let before = reference_pin_constraint(&scene, time);
+                elapsed[0] += start.elapsed().as_secs_f64();
+                let start = Instant::now();
+                let after = scene.make_pin_constraint(time);
+                elapsed[1] += start.elapsed().as_secs_f64();
+                assert_eq!(
+                    before.0.len() + before.1.len(),
+                    after.0.len() + after.1.len()
+                );
+            }
+            println!(
+                "{} pins of {} vertices: per-vertex {:.1} ms, make_pin_constraint {:.1} ms ({} threads)",
+                scene.pin.len(),
+                size,
+                1000.0 * elapsed[0] / times.len() as f64,
+                1000.0 * elapsed[1] / times.len() as f64,
+                rayon::current_num_threads(),
+            );
+        }
+    }
+}
@@ -0,0 +1,700 @@
+// File: writer.rs
+// Author: Ryoichi Ando (ryoichi.ando@zozo.com)
+// License: Apache v2.0
+
+use std::fs::{File, OpenOptions};
+use std::io;
+use std::io::Write;
+use std::os::unix::fs::FileExt;
+use std::sync::mpsc::{self, Receiver, Sender, SyncSender};
+use std::sync::{Arc, Condvar, Mutex};
+use std::thread::JoinHandle;
+use std::time::{Duration, Instant};
+
+// Layout of trajectory.bin, all values little-endian:
+//
+//   offset  size  field
+//   0       8     magic "PPFTRAJ\0"
+//   8       4     version (u32)
+//   12      4     header size (u32)
+//   16      8     vertex count per frame (u64)
+//   24      8     frame capacity (u64)
+//   32      8     committed frame count (u64)
+//   40      8     offset of the frame data (u64)
+//   48      8     offset of the frame index (u64)
+//   56      8     reserved
+//
+// The frame index stores the simulation time of each frame as f64, NaN for
+// frames that were never written, and the frame data stores capacity x vertex
+// count x 3 f32 values. The file is preallocated at its full size, and the
+// data of skipped frames stays a hole that takes no disk space. A frame is committed by bumping the frame
+// count only after its index entry and vertices have been written, so a
+// reader that maps the file never looks past the count it just read.
+
+const MAGIC: &[u8; 8] = b"PPFTRAJ\0";
+const VERSION: u32 = 1;
+const HEADER_SIZE: u64 = 64;
+const COUNT_OFFSET: u64 = 32;
+
+pub struct TrajectoryWriter {
+    file: File,
+    vert_count: usize,
+    capacity: usize,
+    count: usize,
+    data_offset: u64,
+}
+
+impl TrajectoryWriter {
+    pub fn new(path: &str, vert_count: usize, capacity: usize) -> io::Result<Self> {
+        let file = OpenOptions::new()
+            .read(true)
+            .write(true)
+            .create(true)
+            .truncate(true)
+            .open(path)?;
+        let index_offset = HEADER_SIZE;
+        let data_offset = index_offset + 8 * capacity as u64;
+        let frame_size = 12 * vert_count as u64;
+        file.set_len(data_offset + frame_size * capacity as u64)?;
+        let mut header = Vec::with_capacity(HEADER_SIZE as usize);
+        header.extend_from_slice(MAGIC);
+        header.extend_from_slice(&VERSION.to_le_bytes());
+        header.extend_from_slice(&(HEADER_SIZE as u32).to_le_bytes());
+        header.extend_from_slice(&(vert_count as u64).to_le_bytes());
+        header.extend_from_slice(&(capacity as u64).to_le_bytes());
+        header.extend_from_slice(&0_u64.to_le_bytes());
+        header.extend_from_slice(&data_offset.to_le_bytes());
+        header.extend_from_slice(&index_offset.to_le_bytes());
+        header.resize(HEADER_SIZE as usize, 0);
+        for _ in 0..capacity {
+            header.extend_from_slice(&f64::NAN.to_le_bytes());
+        }
+        file.write_all_at(&header, 0)?;
+        Ok(Self {
+            file,
+            vert_count,
+            capacity,
+            count: 0,
+            data_offset,
+        })
+    }
+
+    // Reopen a trajectory written by an interrupted run, keeping its first
+    // count frames. Starts a new file if there is none to continue.
+    pub fn resume(
+        path: &str,
+        vert_count: usize,
+        capacity: usize,
+        count: usize,
+    ) -> io::Result<Self> {
+        let file = match OpenOptions::new().read(true).write(true).open(path) {
+            Ok(file) => file,
+            Err(err) if err.kind() == io::ErrorKind::NotFound => {
+                return Self::new(path, vert_count, capacity);
+            }
+            Err(err) => return Err(err),
+        };
+        let mut header = [0_u8; HEADER_SIZE as usize];
+        file.read_exact_at(&mut header, 0)?;
+        let u64_at = |i: usize| u64::from_le_bytes(header[i..i + 8].try_into().unwrap());
+        if &header[0..8] != MAGIC
+            || u64_at(16) != vert_count as u64
+            || u64_at(24) != capacity as u64
+        {
+            return Err(io::Error::new(
+                io::ErrorKind::InvalidData,
+                "trajectory does not match the scene",
+            ));
+        }
+        let written = u64_at(COUNT_OFFSET as usize) as usize;
+        let count = count.min(written);
+        file.write_all_at(&(count as u64).to_le_bytes(), COUNT_OFFSET)?;
+        // Forget the dropped frames so that a later write past them does not
+        // expose them again as committed frames
+        let mut index = Vec::with_capacity(8 * (written - count));
+        for _ in count..written {
+            index.extend_from_slice(&f64::NAN.to_le_bytes());
+        }
+        file.write_all_at(&index, HEADER_SIZE + 8 * count as u64)?;
+        Ok(Self {
+            file,
+            vert_count,
+            capacity,
+            count,
+            data_offset: u64_at(40),
+        })
+    }
+
+    pub fn write(&mut self, frame: usize, time: f64, vertex: &[f32]) -> io::Result<()> {
+        assert!(frame < self.capacity, "trajectory capacity exceeded");
+        assert_eq!(vertex.len(), 3 * self.vert_count);
+        let frame_size = 12 * self.vert_count as u64;
+        let buff = unsafe {
+            std::slice::from_raw_parts(
+                vertex.as_ptr() as *const u8,
+                vertex.len() * std::mem::size_of::<f32>(),
+            )
+        };
+        self.file
+            .write_all_at(buff, self.data_offset + frame_size * frame as u64)?;
+        self.file
+            .write_all_at(&time.to_le_bytes(), HEADER_SIZE + 8 * frame as u64)?;
+        self.count = self.count.max(frame + 1);
+        self.file
+            .write_all_at(&(self.count as u64).to_le_bytes(), COUNT_OFFSET)
+    }
+}
+
+// Layout of a vert_N.qbin file, all values little-endian:
+//
+//   offset  size  field
+//   0       4     magic "PPFQ"
+//   4       1     version (u8)
+//   5       1     kind (u8), 0 for a keyframe and 1 for a delta frame
+//   6       2     distance from the previous frame, 0 for a keyframe (u16)
+//   8       4     value count, three per vertex (u32)
+//   12      4     block length (u32)
+//   16      4     quantization step (f32)
+//   20      4     frame number of the keyframe this frame depends on (u32)
+//
+// A keyframe stores the raw f32 positions. A delta frame stores one width
+// byte per block (0, 1, 2 or 4) followed by the block values as signed
+// integers of that width. Frames may be skipped, and a frame is reconstructed
+// from its keyframe by adding value * step for every delta frame written in
+// between. Deltas are taken
+// against the reconstruction rather than the exact previous frame, so the
+// error stays within step / 2 however long the chain is.
+
+const DELTA_MAGIC: &[u8; 4] = b"PPFQ";
+const DELTA_VERSION: u8 = 1;
+const DELTA_BLOCK: usize = 256;
+
+pub struct DeltaEncoder {
+    step: f32,
+    interval: usize,
+    recon: Vec<f32>,
+    keyframe: usize,
+    last: Option<usize>,
+    quant: Vec<i32>,
+}
+
+impl DeltaEncoder {
+    pub fn new(step: f32, interval: usize) -> Self {
+        assert!(step > 0.0);
+        Self {
+            step,
+            interval: interval.max(1),
+            recon: Vec::new(),
+            keyframe: 0,
+            last: None,
+            quant: Vec::new(),
+        }
+    }
+
+    fn header(&self, kind: u8, gap: u16, count: usize) -> Vec<u8> {
+        let mut buff = Vec::with_capacity(24 + 4 * count);
+        buff.extend_from_slice(DELTA_MAGIC);
+        buff.push(DELTA_VERSION);
+        buff.push(kind);
+        buff.extend_from_slice(&gap.to_le_bytes());
+        buff.extend_from_slice(&(count as u32).to_le_bytes());
+        buff.extend_from_slice(&(DELTA_BLOCK as u32).to_le_bytes());
+        buff.extend_from_slice(&self.step.to_le_bytes());
+        buff.extend_from_slice(&(self.keyframe as u32).to_le_bytes());
+        buff
+    }
+
+    fn quantize(&mut self, vertex: &[f32]) -> bool {
+        let limit = (i32::MAX / 2) as f32;
+        self.quant.resize(vertex.len(), 0);
+        for (q, (&x, &r)) in self
+            .quant
+            .iter_mut()
+            .zip(vertex.iter().zip(self.recon.iter()))
+        {
+            let d = ((x - r) / self.step).round();
+            if !(d.abs() < limit) {
+                return false;
+            }
+            *q = d as i32;
+        }
+        true
+    }
+
+    pub fn encode(&mut self, frame: usize, vertex: &[f32]) -> Vec<u8> {
+        let gap = match self.last {
+            Some(last) if last < frame => frame - last,
+            _ => 0,
+        };
+        let delta = gap > 0
+            && gap <= u16::MAX as usize
+            && frame - self.keyframe < self.interval
+            && self.recon.len() == vertex.len()
+            && self.quantize(vertex);
+        self.last = Some(frame);
+        if !delta {
+            self.keyframe = frame;
+            self.recon = vertex.to_vec();
+            let mut buff = self.header(0, 0, vertex.len());
+            for x in vertex.iter() {
+                buff.extend_from_slice(&x.to_le_bytes());
+            }
+            return buff;
+        }
+        let mut buff = self.header(1, gap as u16, vertex.len());
+        let widths = self
+            .quant
+            .chunks(DELTA_BLOCK)
+            .map(|block| {
+                let max = block.iter().map(|q| q.unsigned_abs()).max().unwrap_or(0);
+                if max == 0 {
+                    0
+                } else if max <= i8::MAX as u32 {
+                    1
+                } else if max <= i16::MAX as u32 {
+                    2
+                } else {
+                    4
+                }
+            })
+            .collect::<Vec<u8>>();
+        buff.extend_from_slice(&widths);
+        for (block, &width) in self.quant.chunks(DELTA_BLOCK).zip(widths.iter()) {
+            for &q in block.iter() {
+                match width {
+                    0 => {}
+                    1 => buff.push(q as i8 as u8),
+                    2 => buff.extend_from_slice(&(q as i16).to_le_bytes()),
+                    _ => buff.extend_from_slice(&q.to_le_bytes()),
+                }
+            }
+        }
+        for (r, &q) in self.recon.iter_mut().zip(self.quant.iter()) {
+            *r += q as f32 * self.step;
+        }
+        buff
+    }
+}
+
+pub enum FrameSink {
+    Raw,
+    Trajectory(TrajectoryWriter),
+    Delta(DeltaEncoder),
+}
+
+fn write_raw(path: &str, vertex: &[f32]) -> io::Result<()> {
+    let tmp = format!("{}.tmp", path);
+    let mut file = OpenOptions::new()
+        .write(true)
+        .create(true)
+        .truncate(true)
+        .open(tmp.clone())?;
+    let buff = unsafe {
+        std::slice::from_raw_parts(
+            vertex.as_ptr() as *const u8,
+            vertex.len() * std::mem::size_of::<f32>(),
+        )
+    };
+    file.write_all(buff)?;
+    file.flush()?;
+    std::fs::rename(tmp, path)
+}
+
+impl FrameSink {
+    fn write(&mut self, output: &str, frame: usize, time: f64, vertex: &[f32]) -> io::Result<()> {
+        match self {
+            FrameSink::Raw => write_raw(&format!("{}/vert_{}.bin", output, frame), vertex),
+            FrameSink::Trajectory(trajectory) => trajectory.write(frame, time, vertex),
+            FrameSink::Delta(encoder) => {
+                let buff = encoder.encode(frame, vertex);
+                // Name: Compression Ratio of Video Frames
+                // Format: list[(vid_time,float)]
+                // Description:
+                // Size of each compressed vert_N.qbin file divided by the size of
+                // the raw vertex data it replaces. Keyframes are close to one.
+                /*== push "compression_ratio" ==*/
+                let mut compression_ratio = OpenOptions::new()
+                    .create(true)
+                    .append(true)
+                    .open(format!("{}/data/compression_ratio.out", output).as_str())?;
+                writeln!(
+                    compression_ratio,
+                    "{} {}",
+                    frame,
+                    buff.len() as f64 / (vertex.len() * std::mem::size_of::<f32>()) as f64
+                )?;
+                let path = format!("{}/vert_{}.qbin.tmp", output, frame);
+                std::fs::write(path.clone(), &buff)?;
+                std::fs::rename(path.clone(), path.replace(".tmp", ""))
+            }
+        }
+    }
+}
+
+struct FrameJob {
+    frame: usize,
+    time: f64,
+    vertex: Vec<f32>,
+    full: bool,
+}
+
+// Frames are written on a dedicated thread so that slow storage does not
+// stall the solver. A fixed pool of vertex buffers circulates between the
+// solver and the writer thread: the solver fills a free buffer and hands it
+// over, and the writer returns it once the frame is on disk. When every
+// buffer is in flight, the solver blocks until one is returned, which bounds
+// both memory use and how far the output may lag behind the simulation.
+
+pub struct FrameWriter {
+    sender: Option<SyncSender<FrameJob>>,
+    free: Receiver<Vec<f32>>,
+    depth: Arc<(Mutex<usize>, Condvar)>,
+    handle: Option<JoinHandle<()>>,
+}
+
+impl FrameWriter {
+    pub fn new(output: &str, mut sink: FrameSink, buffers: usize) -> Self {
+        let buffers = buffers.max(1);
+        let (sender, receiver) = mpsc::sync_channel::<FrameJob>(buffers);
+        let (free_sender, free): (Sender<Vec<f32>>, Receiver<Vec<f32>>) = mpsc::channel();
+        for _ in 0..buffers {
+            free_sender.send(Vec::new()).unwrap();
+        }
+        let depth = Arc::new((Mutex::new(0), Condvar::new()));
+        let output = output.to_string();
+        let thread_depth = depth.clone();
+        let handle = std::thread::Builder::new()
+            .name("frame-writer".to_string())
+            .spawn(move || {
+                while let Ok(job) = receiver.recv() {
+                    if job.full {
+                        sink.write(&output, job.frame, job.time, &job.vertex)
+                    } else {
+                        write_raw(&format!("{}/record_{}.bin", output, job.frame), &job.vertex)
+                    }
+                    .unwrap();
+                    let (count, written) = &*thread_depth;
+                    *count.lock().unwrap() -= 1;
+                    written.notify_all();
+                    let _ = free_sender.send(job.vertex);
+                }
+            })
+            .unwrap();
+        Self {
+            sender: Some(sender),
+            free,
+            depth,
+            handle: Some(handle),
+        }
+    }
+
+    // Take a free buffer, waiting for the writer thread if all buffers are
+    // in flight. Returns the buffer and the time spent waiting.
+    pub fn acquire(&mut self) -> (Vec<f32>, Duration) {
+        let start = Instant::now();
+        let buff = self.free.recv().expect("frame writer thread terminated");
+        (buff, start.elapsed())
+    }
+
+    // Hand a filled buffer over to the writer thread. A full frame goes to
+    // the sink, otherwise the buffer holds the recorded vertex subset and is
+    // written as record_N.bin. Returns the number of frames queued or being
+    // written, including this one.
+    pub fn submit(&mut self, frame: usize, time: f64, vertex: Vec<f32>, full: bool) -> usize {
+        let depth = {
+            let mut count = self.depth.0.lock().unwrap();
+            *count += 1;
+            *count
+        };
+        self.sender
+            .as_ref()
+            .unwrap()
+            .send(FrameJob {
+                frame,
+                time,
+                vertex,
+                full,
+            })
+            .expect("frame writer thread terminated");
+        depth
+    }
+
+    // Wait until every frame submitted so far is written, e.g. before saving
+    // a checkpoint, so that a run killed afterwards leaves no gap in the
+    // output before the frame it resumes from.
+    pub fn flush(&self) {
+        let (count, written) = &*self.depth;
+        let mut count = count.lock().unwrap();
+        while *count > 0 {
+            count = written
+                .wait_timeout(count, Duration::from_millis(100))
+                .unwrap()
+                .0;
+            if *count > 0 && self.handle.as_ref().map_or(true, |h| h.is_finished()) {
+                panic!("frame writer thread terminated");
+            }
+        }
+    }
+
+    // Wait until every submitted frame is written.
+    pub fn finish(mut self) {
+        self.sender = None;
+        if let Some(handle) = self.handle.take() {
+            handle.join().expect("frame writer thread panicked");
+        }
+    }
+}
+
+impl Drop for FrameWriter {
+    fn drop(&mut self) {
+        self.sender = None;
+        if let Some(handle) = self.handle.take() {
+            let _ = handle.join();
+        }
+    }
+}
+
+#[cfg(test)]
+pub(crate) mod tests {
+    use super::*;
+    use std::path::PathBuf;
+
+    // Scratch file path unique to this process and test
+    pub(crate) fn temp_path(name: &str) -> String {
+        let mut path = std::env::temp_dir();
+        path.push(format!("ppf-writer-{}-{}", std::process::id(), name));
+        path.to_str().unwrap().to_string()
+    }
+
+    // Reference files shared with the Python readers in tests/. Set
+    // PPF_BLESS=1 to rewrite them after an intended format change.
+    pub(crate) fn check_fixture(name: &str, data: &[u8]) {
+        let mut path = PathBuf::from(option_env!("CARGO_MANIFEST_DIR").unwrap_or("."));
+        path.push("tests/data");
+        path.push(name);
+        if std::env::var_os("PPF_BLESS").is_some() {
+            std::fs::create_dir_all(path.parent().unwrap()).unwrap();
+            std::fs::write(&path, data).unwrap();
+        }
+        let expected = std::fs::read(&path).unwrap();
+        assert!(expected == data, "{} does not match the writer", name);
+    }
+
+    fn sample_vertex(frame: usize, n_vert: usize) -> Vec<f32> {
+        (0..3 * n_vert)
+            .map(|i| frame as f32 + 0.25 * i as f32)
+            .collect()
+    }
+
+    fn u64_at(data: &[u8], offset: usize) -> u64 {
+        u64::from_le_bytes(data[offset..offset + 8].try_into().unwrap())
+    }
+
+    fn frame_time(data: &[u8], frame: usize) -> f64 {
+        f64::from_bits(u64_at(data, HEADER_SIZE as usize + 8 * frame))
+    }
+
+    fn frame_vertex(data: &[u8], frame: usize, n_vert: usize) -> Vec<f32> {
+        let start = u64_at(data, 40) as usize + 12 * n_vert * frame;
+        data[start..start + 12 * n_vert]
+            .chunks(4)
+            .map(|x| f32::from_le_bytes(x.try_into().unwrap()))
+            .collect()
+    }
+
+    #[test]
+    fn trajectory_layout() {
+        let path = temp_path("layout.bin");
+        let mut writer = TrajectoryWriter::new(&path, 4, 6).unwrap();
+        for frame in [0, 1, 3] {
+            writer
+                .write(frame, 0.5 * frame as f64, &sample_vertex(frame, 4))
+                .unwrap();
+        }
+        let data = std::fs::read(&path).unwrap();
+        std::fs::remove_file(&path).unwrap();
+
+        assert_eq!(data.len(), 64 + 8 * 6 + 12 * 4 * 6);
+        assert_eq!(&data[0..8], MAGIC);
+        assert_eq!(u32::from_le_bytes(data[8..12].try_into().unwrap()), VERSION);
+        assert_eq!(u32::from_le_bytes(data[12..16].try_into().unwrap()), 64);
+        assert_eq!(u64_at(&data, 16), 4);
+        assert_eq!(u64_at(&data, 24), 6);
+        assert_eq!(u64_at(&data, COUNT_OFFSET as usize), 4);
+        assert_eq!(u64_at(&data, 40), 64 + 8 * 6);
+        assert_eq!(u64_at(&data, 48), 64);
+        for frame in 0..6 {
+            if [0, 1, 3].contains(&frame) {
+                assert_eq!(frame_time(&data, frame), 0.5 * frame as f64);
+                assert_eq!(frame_vertex(&data, frame, 4), sample_vertex(frame, 4));
+            } else {
+                assert!(frame_time(&data, frame).is_nan());
+            }
+        }
+        check_fixture("trajectory.bin", &data);
+    }
+
+    #[test]
+    fn trajectory_resume_truncates_to_count() {
+        let path = temp_path("resume.bin");
+        let mut writer = TrajectoryWriter::new(&path, 2, 8).unwrap();
+        for frame in 0..5 {
+            writer
+                .write(frame, frame as f64, &sample_vertex(frame, 2))
+                .unwrap();
+        }
+        drop(writer);
+
+        let mut writer = TrajectoryWriter::resume(&path, 2, 8, 3).unwrap();
+        let data = std::fs::read(&path).unwrap();
+        assert_eq!(u64_at(&data, COUNT_OFFSET as usize), 3);
+        for frame in 0..8 {
+            assert_eq!(frame_time(&data, frame).is_nan(), frame >= 3);
+        }
+        for frame in 0..3 {
+            assert_eq!(frame_vertex(&data, frame, 2), sample_vertex(frame, 2));
+        }
+
+        // Skipping a frame after resuming leaves the dropped one unreadable
+        writer.write(4, 40.0, &sample_vertex(40, 2)).unwrap();
+        drop(writer);
+        let data = std::fs::read(&path).unwrap();
+        assert_eq!(u64_at(&data, COUNT_OFFSET as usize), 5);
+        assert!(frame_time(&data, 3).is_nan());
+        assert_eq!(frame_time(&data, 4), 40.0);
+        assert_eq!(frame_vertex(&data, 4, 2), sample_vertex(40, 2));
+
+        // The count never grows past what was committed
+        let writer = TrajectoryWriter::resume(&path, 2, 8, 100).unwrap();
+        assert_eq!(writer.count, 5);
+        drop(writer);
+
+        let err = TrajectoryWriter::resume(&path, 3, 8, 5).err().unwrap();
+        assert_eq!(err.kind(), io::ErrorKind::InvalidData);
+        std::fs::remove_file(&path).unwrap();
+
+        let writer = TrajectoryWriter::resume(&path, 2, 8, 5).unwrap();
+        assert_eq!(writer.count, 0);
+        std::fs::remove_file(&path).unwrap();
+    }
+
+    fn codec_vertex(frame: usize) -> Vec<f32> {
+        (0..900)
+            .map(|i| {
+                let base = 0.001 * i as f32;
+                match i / DELTA_BLOCK {
+                    0 => base,
+                    1 => base + 0.01 * frame as f32,
+                    2 => base + frame as f32,
+                    _ => base + 40.0 * (frame % 2) as f32,
+                }
+            })
+            .collect()
+    }
+
+    // Decode a frame on top of the previous reconstruction, returning the
+    // header fields (kind, gap, keyframe) and the block widths
+    fn decode(buff: &[u8], recon: &mut Vec<f32>) -> (u8, u16, u32, Vec<u8>) {
+        let u32_at = |i: usize| u32::from_le_bytes(buff[i..i + 4].try_into().unwrap());
+        assert_eq!(&buff[0..4], DELTA_MAGIC);
+        assert_eq!(buff[4], DELTA_VERSION);
+        let (kind, gap) = (buff[5], u16::from_le_bytes([buff[6], buff[7]]));
+        let (count, block) = (u32_at(8) as usize, u32_at(12) as usize);
+        let step = f32::from_le_bytes(buff[16..20].try_into().unwrap());
+        let body = &buff[24..];
+        if kind == 0 {
+            assert_eq!(body.len(), 4 * count);
+            *recon = body
+                .chunks(4)
+                .map(|x| f32::from_le_bytes(x.try_into().unwrap()))
+                .collect();
+            return (kind, gap, u32_at(20), Vec::new());
+        }
+        let widths = body[..(count + block - 1) / block].to_vec();
+        let mut offset = widths.len();
+        for (i, r) in recon.iter_mut().enumerate() {
+            let width = widths[i / block] as usize;
+            let mut bytes = [0_u8; 4];
+            bytes[..width].copy_from_slice(&body[offset..offset + width]);
+            let q = match width {
+                0 => 0,
+                1 => bytes[0] as i8 as i32,
+                2 => i16::from_le_bytes([bytes[0], bytes[1]]) as i32,
+                _ => i32::from_le_bytes(bytes),
+            };
+            *r += q as f32 * step;
+            offset += width;
+        }
+        assert_eq!(offset, body.len());
+        (kind, gap, u32_at(20), widths)
+    }
+
+    #[test]
+    fn codec_round_trip() {
+        let step = 1e-3;
+        let mut encoder = DeltaEncoder::new(step, 4);
+        let mut recon = Vec::new();
+        let expected = [
+            (0, 0, 0, vec![]),
+            (1, 1, 0, vec![0, 1, 2, 4]),
+            (3, 2, 0, vec![0, 1, 2, 0]),
+            (4, 0, 4, vec![]),
+            (5, 1, 4, vec![0, 1, 2, 4]),
+            (7, 2, 4, vec![0, 1, 2, 0]),
+        ];
+        for (frame, gap, keyframe, widths) in expected {
+            let vertex = codec_vertex(frame);
+            let buff = encoder.encode(frame, &vertex);
+            let kind = if widths.is_empty() { 0 } else { 1 };
+            assert_eq!(decode(&buff, &mut recon), (kind, gap, keyframe, widths));
+            for (x, r) in vertex.iter().zip(recon.iter()) {
+                assert!((x - r).abs() <= 0.5 * step + 1e-5, "{} {}", x, r);
+            }
+            check_fixture(&format!("codec/vert_{}.qbin", frame), &buff);
+        }
+    }
+
+    #[test]
+    fn writer_flush_waits_for_frames() {
+        let output = temp_path("flush");
+        std::fs::create_dir_all(&output).unwrap();
+        let mut writer = FrameWriter::new(&output, FrameSink::Raw, 2);
+        for frame in 0..6 {
+            let (mut data, _) = writer.acquire();
+            data.clear();
+            data.extend(sample_vertex(frame, 100));
+            writer.submit(frame, frame as f64, data, frame % 2 == 0);
+        }
+        writer.flush();
+        assert_eq!(*writer.depth.0.lock().unwrap(), 0);
+        for frame in 0..6 {
+            let name = if frame % 2 == 0 { "vert" } else { "record" };
+            let path = format!("{}/{}_{}.bin", output, name, frame);
+            let data = std::fs::read(&path).unwrap();
+            assert_eq!(data.len(), 1200);
+        }
+        // Flushing with nothing in flight returns at once
+        writer.flush();
+        writer.finish();
+        std::fs::remove_dir_all(&output).unwrap();
+    }
+
+    #[test]
+    fn codec_falls_back_to_keyframes() {
+        let mut encoder = DeltaEncoder::new(1e-3, 100);
+        let kind = |buff: Vec<u8>| buff[5];
+        assert_eq!(kind(encoder.encode(0, &codec_vertex(0))), 0);
+        assert_eq!(kind(encoder.encode(1, &codec_vertex(1))), 1);
+        // Going back in time
+        assert_eq!(kind(encoder.encode(1, &codec_vertex(1))), 0);
+        // A gap that does not fit in the header
+        let frame = 2 + u16::MAX as usize;
+        assert_eq!(kind(encoder.encode(frame, &codec_vertex(0))), 0);
+        // A jump too large to quantize
+        let far = codec_vertex(0).iter().map(|x| x + 1e7).collect::<Vec<_>>();
+        assert_eq!(kind(encoder.encode(frame + 1, &far)), 0);
+        // A change in the vertex count
+        assert_eq!(kind(encoder.encode(frame + 2, &far[..30])), 0);
+        assert_eq!(kind(encoder.encode(frame + 3, &far[..30])), 1);
+    }
+}
@@ -0,0 +1,101 @@
+# File: conftest.py
+# Author: Ryoichi Ando (ryoichi.ando@zozo.com)
+# License: Apache v2.0
+
+import json
+import os
+import sys
+from typing import Callable, Optional
+
+import numpy as np
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from frontend._asset_ import AssetManager  # noqa: E402
+from frontend._plot_ import PlotManager  # noqa: E402
+from frontend._scene_ import FixedScene, Scene  # noqa: E402
+from frontend._session_ import Param, Session, SessionManager  # noqa: E402
+
+# GPU-free stand-in for the solver, see its header for what it writes
+STUB = os.path.join(ROOT, "tests", "stub_solver.py")
+
+
+def _save():
+    pass
+
+
+@pytest.fixture
+def stub() -> str:
+    """Path to the stub solver executable."""
+    return STUB
+
+
+@pytest.fixture
+def fixed_scene() -> FixedScene:
+    """A built scene with a single triangle."""
+    vert = np.array([[0.0, 0.0, 0.0], [1.0, 0.0, 0.0], [0.0, 1.0, 0.0]])
+    asset = AssetManager()
+    asset.add.tri("tri", vert, np.array([[0, 1, 2]]))
+    scene = Scene("test", PlotManager(), asset, _save)
+    scene.add("tri")
+    return scene.build()
+
+
+@pytest.fixture
+def session_factory(tmp_path, fixed_scene) -> Callable[..., Session]:
+    """Make sessions under a temporary application root.
+
+    The factory takes the session name, the scene to initialize with, whether
+    to initialize at all, and stub solver controls written to stub.json.
+    """
+
+    def make(
+        name: str = "session",
+        fixed: Optional[FixedScene] = None,
+        init: bool = True,
+        **control,
+    ) -> Session:
+        session = Session(str(tmp_path), ROOT, name, _save)
+        if init:
+            session.init(fixed_scene if fixed is None else fixed)
+            if control:
+                with open(os.path.join(session.info.path, "stub.json"), "w") as f:
+                    json.dump(control, f)
+        return session
+
+    return make
+
+
+@pytest.fixture
+def session_manager(tmp_path) -> SessionManager:
+    """A session manager under a temporary application root."""
+    return SessionManager(str(tmp_path), ROOT, _save)
+
+
+@pytest.fixture
+def make_param() -> Callable[..., Param]:
+    """Make parameters with a frame count and keys spelled with underscores."""
+
+    def make(frames: int = 4, **values) -> Param:
+        param = Param(ROOT).set("frames", frames)
+        for key, value in values.items():
+            param.set(key.replace("_", "-"), value)
+        return param
+
+    return make
+
+
+@pytest.fixture
+def stub_runs() -> Callable[[Session], list[dict]]:
+    """Read the runs the stub solver recorded for a session."""
+
+    def runs(session: Session) -> list[dict]:
+        path = os.path.join(session.info.path, "stub_runs.jsonl")
+        if not os.path.exists(path):
+            return []
+        return [json.loads(line) for line in open(path).read().splitlines()]
+
+    return runs
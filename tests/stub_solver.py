@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+# File: stub_solver.py
+# Author: Ryoichi Ando (ryoichi.ando@zozo.com)
+# License: Apache v2.0
+
+# Stand-in for the solver executable that runs without a GPU, for testing
+# the frontend with program=... It takes the same arguments, writes
+# initialize.out, one vert_N.bin per frame, checkpoints in the solver's
+# layout and finished.txt, prints a line per frame to stdout and pushes
+# the same progress datagrams. The number of frames and the checkpoint
+# interval come from param.toml, and with --resume the run continues after
+# the latest checkpoint.
+#
+# An optional stub.json in the session directory controls a run:
+#   delay  seconds to spend on each frame (default 0.05)
+#   fail   how many runs of the session exit with an error (default 0)
+#   fail_at  the frame after which a failing run exits (default frames / 2),
+#            or before initializing if negative
+#
+# Every run appends a line to stub_runs.jsonl in the session directory with
+# its device, whether it resumed and its start and end times.
+
+import argparse
+import json
+import os
+import socket
+import struct
+import sys
+import time
+from array import array
+
+CHECKPOINT_MAGIC = b"PPFCKPT\0"
+CHECKPOINT_HEADER = struct.Struct("<8sIidfIQ")
+
+
+def read_toml(path: str) -> dict[str, str]:
+    result = {}
+    if os.path.exists(path):
+        for line in open(path).read().splitlines():
+            if " = " in line:
+                key, value = line.split(" = ", 1)
+                result[key.strip()] = value.strip().strip('"')
+    return result
+
+
+def save_checkpoint(output: str, frame: int, time: float, vert: array):
+    path = os.path.join(output, "checkpoint")
+    os.makedirs(path, exist_ok=True)
+    header = CHECKPOINT_HEADER.pack(
+        CHECKPOINT_MAGIC, 1, frame, time, 1e-3, 0, len(vert) // 3
+    )
+    # At rest, so the previous positions are the current ones
+    data = header + vert.tobytes() + vert.tobytes()
+    tmp = os.path.join(path, f"state_{frame}.bin.tmp")
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, os.path.join(path, f"state_{frame}.bin"))
+
+
+def latest_checkpoint(output: str) -> int:
+    path = os.path.join(output, "checkpoint")
+    frames = [
+        int(name[len("state_") : -len(".bin")])
+        for name in os.listdir(path)
+        if name.startswith("state_") and name.endswith(".bin")
+    ]
+    return max(frames)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--path", required=True)
+    parser.add_argument("--output", required=True)
+    parser.add_argument("--resume", action="store_true")
+    parser.add_argument("--progress-socket", default="")
+    args = parser.parse_args()
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+
+    def send(**event):
+        if args.progress_socket:
+            try:
+                sock.sendto(json.dumps(event).encode(), args.progress_socket)
+            except OSError:
+                pass
+
+    start = time.time()
+    runs_path = os.path.join(args.path, "stub_runs.jsonl")
+    runs = len(open(runs_path).readlines()) if os.path.exists(runs_path) else 0
+    control_path = os.path.join(args.path, "stub.json")
+    control = json.load(open(control_path)) if os.path.exists(control_path) else {}
+    param = read_toml(os.path.join(args.path, "param.toml"))
+    frames = int(param.get("frames", 10))
+    interval = int(param.get("checkpoint_interval", 0))
+    dt = float(param.get("dt", 1e-3))
+    n_vert = int(read_toml(os.path.join(args.path, "info.toml")).get("vert", 1))
+    delay = float(control.get("delay", 0.05))
+    failing = runs < int(control.get("fail", 0))
+    fail_at = int(control.get("fail_at", frames // 2))
+
+    data_path = os.path.join(args.output, "data")
+    os.makedirs(data_path, exist_ok=True)
+    init_path = os.path.join(data_path, "initialize.out")
+    run = {
+        "gpu": os.environ.get("CUDA_VISIBLE_DEVICES"),
+        "resume": args.resume,
+        "initialized": os.path.exists(init_path),
+        "start": start,
+    }
+    first = latest_checkpoint(args.output) + 1 if args.resume else 0
+    if failing and fail_at < 0:
+        sys.stderr.write("stub failure before initializing\n")
+        sys.exit(1)
+    open(init_path, "w").close()
+    send(event="start", frame=first - 1, time=(first - 1) * dt, frames=frames)
+
+    for frame in range(first, frames + 1):
+        time.sleep(delay)
+        vert = array("f", [frame] * (3 * n_vert))
+        with open(os.path.join(args.output, f"vert_{frame}.bin"), "wb") as f:
+            vert.tofile(f)
+        print(f"frame {frame}", flush=True)
+        send(
+            event="frame",
+            frame=frame,
+            time=frame * dt,
+            frames=frames,
+            written=True,
+            frame_ms=1000.0 * delay,
+            steps=1,
+            step_ms=1000.0 * delay,
+        )
+        if interval > 0 and frame > 0 and frame % interval == 0:
+            save_checkpoint(args.output, frame, frame * dt, vert)
+        if failing and frame == fail_at:
+            run["end"] = time.time()
+            with open(runs_path, "a") as f:
+                f.write(json.dumps(run) + "\n")
+            message = f"stub failure at frame {frame}"
+            send(event="error", message=message)
+            sys.stderr.write(message + "\n")
+            sys.exit(1)
+
+    open(os.path.join(args.output, "finished.txt"), "w").close()
+    send(event="finished", frame=frames, time=frames * dt)
+    run["end"] = time.time()
+    with open(runs_path, "a") as f:
+        f.write(json.dumps(run) + "\n")
+
+
+if __name__ == "__main__":
+    main()
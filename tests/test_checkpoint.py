@@ -0,0 +1,72 @@
+# File: test_checkpoint.py
+# Author: Ryoichi Ando (ryoichi.ando@zozo.com)
+# License: Apache v2.0
+
+import os
+import shutil
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from frontend._frame_ import Checkpoint
+from frontend._session_ import SessionGet
+
+# Written by the checkpoint_layout test in src/checkpoint.rs: frame 4 at time
+# 2.0 with a previous step of 0.25 and three vertices
+FIXTURE = os.path.join(os.path.dirname(__file__), "data", "checkpoint", "state_4.bin")
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def sample(frame: int) -> tuple[np.ndarray, np.ndarray]:
+    i = np.arange(9, dtype=np.float32)
+    curr = np.float32(frame) + np.float32(0.5) * i
+    prev = np.float32(frame) + np.float32(0.375) * i
+    return curr.reshape(3, 3), prev.reshape(3, 3)
+
+
+def test_checkpoint_reads_solver_layout():
+    assert Checkpoint.HEADER.itemsize == 40
+    checkpoint = Checkpoint.load(FIXTURE)
+    curr, prev = sample(4)
+    assert checkpoint.frame == 4
+    assert checkpoint.time == 2.0
+    assert checkpoint.prev_dt == 0.25
+    np.testing.assert_array_equal(checkpoint.curr, curr)
+    np.testing.assert_array_equal(checkpoint.prev, prev)
+    np.testing.assert_array_equal(checkpoint.velocity, (curr - prev) / 0.25)
+
+
+def test_checkpoint_rejects_damaged_files(tmp_path):
+    with open(FIXTURE, "rb") as f:
+        data = bytearray(f.read())
+    path = str(tmp_path / "state_4.bin")
+    for damaged in [
+        data[:20],
+        data[:-4],
+        b"x" * len(data),
+        data[:8] + b"\2" + data[9:],
+    ]:
+        with open(path, "wb") as f:
+            f.write(damaged)
+        with pytest.raises(ValueError):
+            Checkpoint.load(path)
+
+
+def test_session_checkpoint_skips_damaged_files(tmp_path):
+    path = tmp_path / "output" / "checkpoint"
+    path.mkdir(parents=True)
+    shutil.copy(FIXTURE, path / "state_4.bin")
+    with open(path / "state_6.bin", "wb") as f:
+        f.write(b"garbage")
+    session = SimpleNamespace(_proj_root=ROOT, info=SimpleNamespace(path=str(tmp_path)))
+    get = SessionGet(session)
+
+    assert get.checkpoints() == [4, 6]
+    curr, prev = sample(4)
+    vert, vel, frame = get.checkpoint()
+    assert frame == 4
+    np.testing.assert_array_equal(vert, curr)
+    np.testing.assert_array_equal(vel, (curr - prev) / 0.25)
+    assert get.checkpoint(6) is None
+    assert get.checkpoint(4)[2] == 4
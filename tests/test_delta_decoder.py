@@ -0,0 +1,75 @@
+# File: test_delta_decoder.py
+# Author: Ryoichi Ando (ryoichi.ando@zozo.com)
+# License: Apache v2.0
+
+import os
+import shutil
+
+import numpy as np
+import pytest
+
+from frontend._frame_ import DeltaDecoder
+
+# Written by the codec_round_trip test in src/writer.rs with a step of 1e-3
+# and a keyframe every four frames. Frames 1 and 5 are deltas of blocks with
+# widths 0, 1, 2 and 4, frames 3 and 7 skip a frame, and frame 4 is a keyframe.
+FIXTURE = os.path.join(os.path.dirname(__file__), "data", "codec")
+FRAMES = [0, 1, 3, 4, 5, 7]
+STEP = 1e-3
+
+
+def codec_vertex(frame: int) -> np.ndarray:
+    i = np.arange(900)
+    base = np.float32(0.001) * i.astype(np.float32)
+    offset = np.select(
+        [i < 256, i < 512, i < 768],
+        [
+            np.float32(0.0),
+            np.float32(0.01) * np.float32(frame),
+            np.float32(frame),
+        ],
+        np.float32(40.0 * (frame % 2)),
+    ).astype(np.float32)
+    return (base + offset).reshape(-1, 3)
+
+
+@pytest.fixture
+def codec_dir(tmp_path):
+    path = str(tmp_path / "output")
+    shutil.copytree(FIXTURE, path)
+    return path
+
+
+def test_decoder_reads_encoder_layout(codec_dir):
+    assert DeltaDecoder.HEADER.itemsize == 24
+    assert DeltaDecoder.exists(codec_dir)
+    decoder = DeltaDecoder(codec_dir)
+    assert decoder.index.frames() == FRAMES
+    assert decoder.index.between(1, 5) == [3, 4, 5]
+    assert decoder.index.between(-1, 0) == [0]
+    # In order, backwards, and across the keyframe boundary
+    for frame in FRAMES + FRAMES[::-1] + [7, 1, 5, 3]:
+        vert = decoder.decode(frame)
+        assert vert.shape == (300, 3)
+        assert not vert.flags.writeable
+        error = np.abs(vert - codec_vertex(frame)).max()
+        assert error <= 0.5 * STEP + 1e-5
+
+
+def test_decoder_rejects_broken_chains(codec_dir):
+    decoder = DeltaDecoder(codec_dir)
+    with pytest.raises(FileNotFoundError):
+        decoder.decode(2)
+
+    os.remove(os.path.join(codec_dir, "vert_5.qbin"))
+    assert decoder.index.between(0, 7) == [1, 3, 4, 7]
+    assert decoder.index.between(3, 5) == [4]
+    np.testing.assert_allclose(decoder.decode(4), codec_vertex(4), atol=STEP)
+    with pytest.raises(ValueError):
+        decoder.decode(7)
+
+    path = os.path.join(codec_dir, "vert_1.qbin")
+    with open(path, "r+b") as f:
+        f.truncate(100)
+    with pytest.raises(ValueError):
+        DeltaDecoder(codec_dir).decode(1)
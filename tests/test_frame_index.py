@@ -0,0 +1,148 @@
+# File: test_frame_index.py
+# Author: Ryoichi Ando (ryoichi.ando@zozo.com)
+# License: Apache v2.0
+
+import os
+import pickle
+import shutil
+import sys
+
+import pytest
+
+from frontend._frame_ import (
+    IN_CREATE,
+    IN_DELETE,
+    IN_Q_OVERFLOW,
+    FrameIndex,
+    _Inotify,
+)
+
+
+def touch(path: str, frame: int, prefix: str = "vert_"):
+    open(os.path.join(path, f"{prefix}{frame}.bin"), "wb").close()
+
+
+@pytest.fixture(params=[True, False], ids=["notify", "probe"])
+def index(request, tmp_path) -> FrameIndex:
+    """An index over an empty output directory, with and without inotify."""
+    path = str(tmp_path / "output")
+    os.makedirs(path)
+    index = FrameIndex(path)
+    if not request.param:
+        index._notify = False
+    return index
+
+
+def check(index: FrameIndex, frames: list[int]):
+    assert index.frames() == frames
+    assert index.latest() == (frames[-1] if frames else None)
+    for frame in range(max(frames, default=0) + 2):
+        assert index.exists(frame) == (frame in frames)
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="inotify")
+def test_inotify_reports_changes(tmp_path):
+    watch = _Inotify(str(tmp_path))
+    assert watch.read() == []
+    touch(str(tmp_path), 3)
+    os.rename(tmp_path / "vert_3.bin", tmp_path / "vert_4.bin")
+    os.remove(tmp_path / "vert_4.bin")
+    events = watch.read()
+    assert [name for _, name in events] == [
+        "vert_3.bin",
+        "vert_3.bin",
+        "vert_3.bin",
+        "vert_4.bin",
+        "vert_4.bin",
+    ]
+    assert events[0][0] & IN_CREATE
+    assert events[-1][0] & IN_DELETE
+    watch.close()
+    with pytest.raises(OSError):
+        _Inotify(str(tmp_path / "missing"))
+
+
+def test_appends(index):
+    check(index, [])
+    touch(index.path, 0)
+    check(index, [0])
+    for frame in range(1, 4):
+        touch(index.path, frame)
+    check(index, [0, 1, 2, 3])
+    # Strided output and other files
+    for frame in [5, 10, 15]:
+        touch(index.path, frame)
+    touch(index.path, 20, "record_")
+    open(os.path.join(index.path, "vert_x.bin"), "wb").close()
+    check(index, [0, 1, 2, 3, 5, 10, 15])
+    assert index.between(3, 10) == [5, 10]
+    assert index.path_of(5) == os.path.join(index.path, "vert_5.bin")
+
+
+def test_deletions(index):
+    for frame in range(6):
+        touch(index.path, frame)
+    check(index, [0, 1, 2, 3, 4, 5])
+    os.remove(index.path_of(5))
+    os.remove(index.path_of(2))
+    check(index, [0, 1, 3, 4])
+    # Resuming from a checkpoint discards the later frames and rewrites them
+    for frame in [3, 4]:
+        os.remove(index.path_of(frame))
+    check(index, [0, 1])
+    touch(index.path, 2)
+    os.rename(index.path_of(2), index.path_of(3))
+    check(index, [0, 1, 3])
+
+
+def test_directory_replacement(index):
+    for frame in range(4):
+        touch(index.path, frame)
+    check(index, [0, 1, 2, 3])
+    shutil.rmtree(index.path)
+    check(index, [])
+    os.makedirs(index.path)
+    touch(index.path, 7)
+    check(index, [7])
+
+    # Replaced by a rename, as when a session output is swapped out
+    other = index.path + ".new"
+    os.makedirs(other)
+    for frame in [0, 5]:
+        touch(other, frame)
+    os.rename(index.path, index.path + ".old")
+    os.rename(other, index.path)
+    check(index, [0, 5])
+    touch(index.path, 10)
+    check(index, [0, 5, 10])
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="inotify")
+def test_overflow_rescans(tmp_path):
+    index = FrameIndex(str(tmp_path))
+    check(index, [])
+    assert index._watch is not None
+    touch(str(tmp_path), 0)
+    touch(str(tmp_path), 1)
+
+    class Overflow:
+        def read(self):
+            return [(IN_Q_OVERFLOW, "")]
+
+        def close(self):
+            pass
+
+    # A dropped event queue is answered with a full rescan
+    index._watch = Overflow()
+    check(index, [0, 1])
+    assert isinstance(index._watch, _Inotify)
+    touch(str(tmp_path), 2)
+    check(index, [0, 1, 2])
+
+
+def test_pickle_resets(index):
+    touch(index.path, 0)
+    check(index, [0])
+    loaded = pickle.loads(pickle.dumps(index))
+    touch(index.path, 1)
+    check(loaded, [0, 1])
@@ -0,0 +1,152 @@
+# File: test_frame_store.py
+# Author: Ryoichi Ando (ryoichi.ando@zozo.com)
+# License: Apache v2.0
+
+import os
+import threading
+import time
+
+import numpy as np
+
+from frontend._frame_ import FrameStore
+
+# Bytes of one frame returned by make_store
+FRAME_BYTES = 120
+
+
+def make_store(count: int = 100, **kwargs) -> tuple[FrameStore, list[int]]:
+    """Make a store over frames of ten float32 vertices and log every load."""
+    loads = []
+
+    def locate(n: int):
+        if not 0 <= n < count:
+            return None
+
+        def load():
+            loads.append(n)
+            return np.full((10, 3), n, dtype=np.float32)
+
+        return n, load
+
+    return FrameStore(locate, **kwargs), loads
+
+
+def cached(store: FrameStore) -> list:
+    return list(store._cache.keys())
+
+
+def wait(store: FrameStore):
+    if store._executor is not None:
+        store._executor.shutdown(wait=True)
+        store._executor = None
+
+
+def test_evicts_least_recent_by_bytes():
+    store, loads = make_store(budget=3 * FRAME_BYTES, read_ahead=0)
+    for n in [0, 2, 4]:
+        assert store.get(n)[0, 0] == n
+    assert store.size == 3 * FRAME_BYTES
+    store.get(0)
+    store.get(6)
+    # Frame 2 was used least recently
+    assert cached(store) == [4, 0, 6]
+    assert store.size == 3 * FRAME_BYTES
+    assert (store.hits, store.misses) == (1, 4)
+    store.get(2)
+    assert cached(store) == [0, 6, 2]
+    assert loads == [0, 2, 4, 6, 2]
+    assert store.get(100) is None
+
+
+def test_evicts_by_entry_count():
+    store, _ = make_store(budget=100 * FRAME_BYTES, read_ahead=0, max_entries=2)
+    for n in range(4):
+        store.get(n)
+    assert cached(store) == [2, 3]
+    assert store.capacity(FRAME_BYTES) == 2
+    assert store.capacity(1000 * FRAME_BYTES) == 1
+
+    # A frame larger than the budget is still kept on its own
+    store, _ = make_store(budget=FRAME_BYTES // 2, read_ahead=0)
+    store.get(0)
+    store.get(1)
+    assert cached(store) == [1]
+    store.clear()
+    assert (len(store), store.size) == (0, 0)
+
+
+def test_reads_ahead_sequentially():
+    store, loads = make_store(read_ahead=4)
+    store.get(10)
+    store.get(20)
+    wait(store)
+    assert loads == [10, 20]
+    store.get(21)
+    wait(store)
+    assert sorted(loads) == [10, 20, 21, 22, 23, 24, 25]
+    store.get(22)
+    assert store.hits == 1
+
+
+def test_newer_prefetch_supersedes_older():
+    release = threading.Event()
+    started = threading.Event()
+    loads = []
+
+    def locate(n: int):
+        def load():
+            if n == 0:
+                started.set()
+                release.wait(10)
+            loads.append(n)
+            return np.zeros((10, 3), dtype=np.float32)
+
+        return n, load
+
+    store = FrameStore(locate, read_ahead=0)
+    store.prefetch(range(5), "slider")
+    assert started.wait(10)
+    store.prefetch([2, 3], "coarse")
+    store.prefetch([10, 11], "slider")
+    # The second worker finishes the newer requests while frame 0 blocks
+    deadline = time.time() + 10
+    while len(loads) < 4 and time.time() < deadline:
+        time.sleep(0.01)
+    release.set()
+    wait(store)
+    # The older slider request stops after the frame it was loading
+    assert sorted(loads) == [0, 2, 3, 10, 11]
+    assert sorted(cached(store)) == [0, 2, 3, 10, 11]
+
+
+def test_coarse_to_fine():
+    assert FrameStore.coarse_to_fine(9, 100) == [0, 8, 4, 2, 6, 1, 3, 5, 7]
+    assert FrameStore.coarse_to_fine(9, 3) == [0, 8, 4]
+    assert FrameStore.coarse_to_fine(1, 4) == [0]
+    assert FrameStore.coarse_to_fine(0, 4) == []
+    order = FrameStore.coarse_to_fine(1000, 1000)
+    assert sorted(order) == list(range(1000))
+    assert order[:3] == [0, 512, 256]
+
+
+def test_rewritten_frame_changes_key(session_factory):
+    session = session_factory()
+    path = os.path.join(session.info.path, "output")
+    os.makedirs(path, exist_ok=True)
+    n_vert = len(session._fixed.vertex(False))
+
+    def write(value: float):
+        tmp = os.path.join(path, "vert_0.bin.tmp")
+        np.full((n_vert, 3), value, dtype=np.float32).tofile(tmp)
+        os.replace(tmp, os.path.join(path, "vert_0.bin"))
+
+    write(1.0)
+    vert, _ = session.get.vertex(0)
+    assert vert[0, 0] == 1.0
+    key, _ = session.get._locate(0)
+    assert session.get.vertex(0)[0] is vert
+    # A resumed run rewrites the frame as a new file
+    write(2.0)
+    assert session.get._locate(0)[0] != key
+    assert session.get.vertex(0)[0][0, 0] == 2.0
+    assert vert[0, 0] == 1.0
@@ -0,0 +1,173 @@
+# File: test_scene_build.py
+# Author: Ryoichi Ando (ryoichi.ando@zozo.com)
+# License: Apache v2.0
+
+import pickle
+
+import numpy as np
+import pytest
+
+from frontend._asset_ import AssetManager
+from frontend._plot_ import PlotManager
+from frontend._scene_ import Scene
+
+
+def _sheet(res: int, rng: np.random.Generator) -> tuple[np.ndarray, np.ndarray]:
+    """Make a square sheet with shuffled vertex order."""
+    xs = np.linspace(0, 1, res)
+    x, y = np.meshgrid(xs, xs)
+    vert = np.stack([x.ravel(), y.ravel(), np.zeros(res * res)], axis=1)
+    idx = np.arange(res * res).reshape(res, res)
+    a, b = idx[:-1, :-1].ravel(), idx[1:, :-1].ravel()
+    c, d = idx[:-1, 1:].ravel(), idx[1:, 1:].ravel()
+    tri = np.concatenate([np.stack([a, b, c], 1), np.stack([b, d, c], 1)])
+    perm = rng.permutation(len(vert))
+    return vert[perm], np.argsort(perm)[tri]
+
+
+def _save():
+    pass
+
+
+def make_scene(count: int = 3, res: int = 12) -> Scene:
+    """Make a scene mixing rods, shells, solids, shared assets and a static floor."""
+    rng = np.random.default_rng(0)
+    asset = AssetManager()
+    vert, tri = _sheet(res, rng)
+    asset.add.tri("sheet", vert, tri)
+    asset.add.tri("floor", *_sheet(4, rng))
+    edge = np.stack([np.arange(19), np.arange(1, 20)], axis=1)
+    asset.add.rod("rod", rng.random((20, 3)), edge[rng.permutation(19)])
+    asset.add.tet(
+        "tet",
+        rng.random((30, 3)),
+        rng.integers(0, 20, (40, 3)),
+        rng.integers(0, 30, (50, 4)),
+    )
+    scene = Scene("test", PlotManager(), asset, _save)
+    for i in range(count):
+        obj = scene.add("sheet").at(i, 0, 0).rotate(15 * i, "z")
+        obj.pin(obj.grab([0, 1, 0])).move_by([0, 1, 0], 1.0)
+        scene.add("rod").at(0, i, 0).scale(0.5).velocity(0, 0, 1)
+        scene.add("tet").at(0, 0, i)
+    scene.add("floor").at(0, -1, 0).pin()
+    return scene
+
+
+def reference_build(scene: Scene) -> dict[str, np.ndarray]:
+    """Number the vertices one at a time in first-appearance order, as the solver expects.
+
+    This is the element by element loop that Scene.build replaces with array
+    operations: rod vertices first, then shell vertices, then solid surface
+    vertices, then everything else.
+    """
+    for obj in scene._object.values():
+        obj.update_static()
+    dyn = [(name, obj) for name, obj in scene._object.items() if not obj.static]
+    tag = {name: [-1] * len(obj.get("V")) for name, obj in dyn}
+    count = 0
+
+    def add_entry(map, elm):
+        nonlocal count
+        for e in elm:
+            for vi in e:
+                if map[vi] == -1:
+                    map[vi] = count
+                    count += 1
+
+    for key, solid in [("E", False), ("F", False), ("F", None)]:
+        for name, obj in dyn:
+            elm = obj.get(key)
+            if elm is not None and (solid is None or (obj.get("T") is None) != solid):
+                add_entry(tag[name], elm)
+    for name, obj in dyn:
+        map = tag[name]
+        for i in range(len(map)):
+            if map[i] == -1:
+                map[i] = count
+                count += 1
+
+    def vec_map(map, elm):
+        return [[map[vi] for vi in e] for e in elm]
+
+    vert, vel = np.zeros((count, 3)), np.zeros((count, 3))
+    rod, tri, tet, solid_tri = [], [], [], []
+    for name, obj in dyn:
+        map = tag[name]
+        vert[map] = obj.vertex(False)
+        vel[map] = obj._velocity
+        if obj.get("T") is None:
+            if obj.get("E") is not None:
+                rod.extend(vec_map(map, obj.get("E")))
+            if obj.get("F") is not None:
+                tri.extend(vec_map(map, obj.get("F")))
+        else:
+            solid_tri.extend(vec_map(map, obj.get("F")))
+            tet.extend(vec_map(map, obj.get("T")))
+
+    static_vert, static_tri = [], []
+    for obj in scene._object.values():
+        if obj.static:
+            static_tri.extend(obj.get("F") + len(static_vert))
+            static_vert.extend(obj.apply_transform(obj.get("V"), False))
+
+    return {
+        "vert": vert,
+        "vel": vel,
+        "rod": np.array(rod).reshape(-1, 2),
+        "tri": np.array(tri + solid_tri).reshape(-1, 3),
+        "tet": np.array(tet).reshape(-1, 4),
+        "static_vert": np.array(static_vert),
+        "static_tri": np.array(static_tri),
+    }
+
+
+@pytest.mark.parametrize("count", [1, 3])
+def test_build_matches_reference(count):
+    scene = make_scene(count)
+    fixed = scene.build()
+    ref = reference_build(scene)
+    np.testing.assert_array_equal(fixed._vert[1], ref["vert"])
+    np.testing.assert_array_equal(fixed._vel, ref["vel"])
+    for key in ["rod", "tri", "tet", "static_tri"]:
+        np.testing.assert_array_equal(getattr(fixed, f"_{key}"), ref[key])
+    np.testing.assert_array_equal(fixed._static_vert[1], ref["static_vert"])
+
+
+def test_rebuild_reuses_cached_objects():
+    scene = make_scene()
+    first = scene.build()
+    second = scene.build()
+    assert all(not obj._dirty for obj in scene._object.values())
+    for key in ["_rod", "_tri", "_tet", "_static_tri"]:
+        np.testing.assert_array_equal(getattr(first, key), getattr(second, key))
+    np.testing.assert_array_equal(first._vert[1], second._vert[1])
+
+
+def test_build_after_loading_state_without_cache():
+    scene = make_scene()
+    expected = scene.build()
+    # Pickles saved before the build cache existed have no asset hashes
+    del scene._asset._hash
+    loaded = pickle.loads(pickle.dumps(scene))
+    fixed = loaded.build()
+    np.testing.assert_array_equal(fixed._vert[1], expected._vert[1])
+    np.testing.assert_array_equal(fixed._tri, expected._tri)
+
+
+def test_time_moves_pins_and_velocities():
+    scene = make_scene(count=1)
+    fixed = scene.build()
+    rest = fixed.time(0.0)
+    moved = fixed.time(np.array([0.5, 1.0, 2.0]))
+    pin = np.asarray(fixed._pin[0].index)
+    free = np.ones(len(rest), dtype=bool)
+    free[pin] = False
+    assert np.any(fixed._vel[free])
+    for t, vert in zip([0.5, 1.0, 2.0], moved):
+        # Smooth transition from 0 to 1 over the first second, then held
+        r = min(t, 1.0)
+        r = r * r * (3.0 - 2.0 * r)
+        np.testing.assert_allclose(vert[pin] - rest[pin], [[0, r, 0]] * len(pin))
+        np.testing.assert_allclose(vert[free] - rest[free], t * fixed._vel[free])
+        np.testing.assert_array_equal(fixed.time(t), vert)
@@ -0,0 +1,67 @@
+# File: test_scene_color.py
+# Author: Ryoichi Ando (ryoichi.ando@zozo.com)
+# License: Apache v2.0
+
+import colorsys
+
+import numpy as np
+
+from frontend._asset_ import AssetManager
+from frontend._plot_ import PlotManager
+from frontend._scene_ import EnumColor, Precision, Scene
+
+
+def _save():
+    pass
+
+
+def make_fixed(res: int = 16):
+    xs = np.linspace(0, 1, res)
+    x, y = np.meshgrid(xs, xs)
+    vert = np.stack([x.ravel(), y.ravel(), np.zeros(res * res)], axis=1)
+    idx = np.arange(res * res).reshape(res, res)
+    a, b = idx[:-1, :-1].ravel(), idx[1:, :-1].ravel()
+    c, d = idx[:-1, 1:].ravel(), idx[1:, 1:].ravel()
+    tri = np.concatenate([np.stack([a, b, c], 1), np.stack([b, d, c], 1)])
+    asset = AssetManager()
+    asset.add.tri("sheet", vert, tri)
+    scene = Scene("test", PlotManager(), asset, _save)
+    scene.add("sheet").dyn_color("area")
+    scene.add("sheet", "plain").at(2, 0, 0)
+    return scene.build(Precision(color="float64"))
+
+
+def reference_color(fixed, vert: np.ndarray, max_area: float) -> np.ndarray:
+    """Blend the strain color of each face onto its vertices with numpy."""
+    tri = fixed._tri.astype(np.int64)
+    e0 = vert[tri[:, 1]] - vert[tri[:, 0]]
+    e1 = vert[tri[:, 2]] - vert[tri[:, 0]]
+    rat = 0.5 * np.linalg.norm(np.cross(e0, e1), axis=1) / fixed._area
+    val = np.clip((rat - 1.0) / (max_area - 1.0), 0.0, 1.0)
+    rgb = np.array([colorsys.hsv_to_rgb(h, 0.75, 1.0) for h in 240 * (1 - val) / 360])
+    dyn = fixed._dyn_face_color == EnumColor.AREA.value
+    face = np.hstack([fixed._dyn_face_intensity[:, None], rgb]) * dyn[:, None]
+    count = np.bincount(tri.ravel(), minlength=len(vert))
+    total = np.zeros((len(vert), 4))
+    np.add.at(total, tri.ravel(), np.repeat(face, 3, axis=0))
+    total /= count[:, None] + 0.0001
+    intensity = total[:, :1]
+    return (1.0 - intensity) * fixed._color + intensity * total[:, 1:]
+
+
+def test_color_matches_reference():
+    fixed = make_fixed()
+    rng = np.random.default_rng(0)
+    vert = fixed.vertex(False) * (1.0 + 0.5 * rng.random((len(fixed._vert[1]), 1)))
+    color = fixed.color(vert)
+    np.testing.assert_allclose(color, reference_color(fixed, vert, 2.0), atol=1e-12)
+    np.testing.assert_allclose(
+        fixed.color(vert, {"max-area": 3.0}),
+        reference_color(fixed, vert, 3.0),
+        atol=1e-12,
+    )
+
+    # Faces without dynamic color keep the base color of their vertices
+    plain = np.all(fixed._dyn_face_color[:, None] == 0, axis=1)
+    plain_vert = np.unique(fixed._tri[plain])
+    np.testing.assert_allclose(color[plain_vert], fixed._color[plain_vert])
@@ -0,0 +1,183 @@
+# File: test_scene_instance.py
+# Author: Ryoichi Ando (ryoichi.ando@zozo.com)
+# License: Apache v2.0
+
+import os
+import pickle
+import tomllib
+
+import numpy as np
+import pytest
+
+from frontend._asset_ import AssetManager
+from frontend._plot_ import PlotManager
+from frontend._scene_ import FixedScene, Scene
+
+COLOR = [0.2, 0.4, 0.6]
+
+
+def _save():
+    pass
+
+
+def make_scene(instanced: bool, count: int = 3) -> Scene:
+    """Make a scene of repeated sheets, rods and solids.
+
+    With instancing every copy gets one uniform color so that copies of an
+    asset share it. Without, every copy gets the same color per vertex,
+    which is not instanceable but builds the same arrays. Either way one
+    extra sheet has a distinct per-vertex color and stays out of instancing.
+    """
+    rng = np.random.default_rng(0)
+    asset = AssetManager()
+    xs = np.linspace(0, 1, 6)
+    x, y = np.meshgrid(xs, xs)
+    sheet = np.stack([x.ravel(), y.ravel(), np.zeros(36)], axis=1)
+    idx = np.arange(36).reshape(6, 6)
+    a, b = idx[:-1, :-1].ravel(), idx[1:, :-1].ravel()
+    c, d = idx[:-1, 1:].ravel(), idx[1:, 1:].ravel()
+    tri = np.concatenate([np.stack([a, b, c], 1), np.stack([b, d, c], 1)])
+    asset.add.tri("sheet", sheet, tri[rng.permutation(len(tri))])
+    edge = np.stack([np.arange(9), np.arange(1, 10)], axis=1)
+    asset.add.rod("rod", rng.random((10, 3)), edge[rng.permutation(9)])
+    asset.add.tet(
+        "tet",
+        rng.random((30, 3)),
+        rng.integers(0, 20, (40, 3)),
+        rng.integers(0, 30, (50, 4)),
+    )
+    scene = Scene("test", PlotManager(), asset, _save)
+
+    def paint(obj, n_vert: int):
+        if instanced:
+            return obj.color(*COLOR)
+        else:
+            return obj.vert_color(np.tile(COLOR, (n_vert, 1)))
+
+    for i in range(count):
+        obj = paint(scene.add("sheet"), 36).at(i, 0, 0).rotate(15 * i, "z")
+        obj.pin(obj.grab([0, 1, 0])).move_by([0, 1, 0], 1.0)
+        paint(scene.add("rod"), 10).at(0, i, 0).scale(0.5).velocity(0, 0, 1)
+        paint(scene.add("tet"), 30).at(0, 0, i)
+    scene.add("sheet").at(0, 0, -1).vert_color(rng.random((36, 3)))
+    return scene
+
+
+@pytest.fixture
+def scenes() -> tuple[FixedScene, FixedScene]:
+    return make_scene(True).build(), make_scene(False).build()
+
+
+KEYS = ["_rod", "_tri", "_tet", "_color", "_vel"]
+
+
+def check_same(fixed: FixedScene, expect: FixedScene):
+    np.testing.assert_array_equal(fixed._vert[0], expect._vert[0])
+    np.testing.assert_allclose(fixed._vert[1], expect._vert[1], atol=1e-12)
+    for key in KEYS:
+        np.testing.assert_array_equal(getattr(fixed, key), getattr(expect, key))
+
+
+def test_instanced_build_matches(scenes):
+    fixed, plain = scenes
+    assert [inst.count() for inst in fixed._instance] == [3, 3, 3]
+    assert plain._instance == []
+    check_same(fixed, plain)
+
+
+def test_pickle_round_trip(scenes):
+    fixed, plain = scenes
+    data = pickle.dumps(fixed)
+    # Instanced vertices and elements are stored once per asset
+    assert len(data) < len(pickle.dumps(plain))
+    loaded = pickle.loads(data)
+    assert len(loaded._instance) == 3
+    check_same(loaded, plain)
+    check_same(pickle.loads(pickle.dumps(plain)), plain)
+
+
+def read_export(path: str) -> dict[str, np.ndarray]:
+    """Re-expand an exported scene the way the solver does."""
+    with open(os.path.join(path, "info.toml"), "rb") as f:
+        info = tomllib.load(f)
+    count = info["count"]
+    index = np.dtype(info["precision"]["index"])
+    position = np.dtype(info["precision"]["position"])
+    bin_path = os.path.join(path, "bin")
+
+    def read(name: str, dtype, width: int, dir: str = bin_path) -> np.ndarray:
+        file = os.path.join(dir, name)
+        if not os.path.exists(file):
+            return np.zeros((0, width), dtype=dtype)
+        return np.fromfile(file, dtype=dtype).reshape(-1, width)
+
+    instance = []
+    for i in range(count["instance"]):
+        dir = os.path.join(bin_path, f"instance-{i}")
+        n = info[f"instance-{i}"]["count"]
+        offset = read("offset.bin", np.uint64, 7, dir).astype(np.int64)
+        block = np.fromfile(os.path.join(dir, "block.bin"), dtype=np.uint8)
+        rank = np.fromfile(os.path.join(dir, "rank.bin"), dtype=np.uint64)
+        entry = {
+            "vert": read("vert.bin", np.float64, 3, dir),
+            "transform": read("transform.bin", np.float64, 12, dir).reshape(n, 3, 4),
+            "map": offset[:, block] + rank.astype(np.int64),
+            "elm": offset[:, 4:],
+            "dmap": np.fromfile(os.path.join(dir, "dmap.bin"), dtype=np.uint32),
+            "vel": read("vel.bin", np.float32, 3, dir),
+        }
+        for key, width in [("rod", 2), ("tri", 3), ("tet", 4)]:
+            entry[key] = read(f"{key}.bin", index, width, dir).astype(np.int64)
+        instance.append(entry)
+
+    n_vert = count["vert"]
+    vert = np.zeros((n_vert, 3))
+    vel = np.zeros((n_vert, 3), dtype=np.float32)
+    dmap = np.zeros(n_vert, dtype=np.uint32)
+    filled = np.zeros(n_vert, dtype=bool)
+    for entry in instance:
+        for j, map in enumerate(entry["map"]):
+            a = entry["transform"][j]
+            vert[map] = entry["vert"] @ a[:, :3].T + a[:, 3]
+            vel[map] = entry["vel"][j]
+            dmap[map] = entry["dmap"][j]
+            filled[map] = True
+    vert[~filled] = read("vert.bin", position, 3)
+    vel[~filled] = read("vel.bin", np.float32, 3)
+    dmap[~filled] = np.fromfile(os.path.join(bin_path, "vert_dmap.bin"), np.uint32)
+    result = {"dmap": dmap, "vert": vert, "vel": vel}
+
+    for slot, (key, width) in enumerate([("rod", 2), ("tri", 3), ("tet", 4)]):
+        full = np.zeros((count[key], width), dtype=np.int64)
+        filled = np.zeros(count[key], dtype=bool)
+        for entry in instance:
+            local = entry[key]
+            for map, start in zip(entry["map"], entry["elm"][:, slot]):
+                full[start : start + len(local)] = map[local]
+                filled[start : start + len(local)] = True
+        full[~filled] = read(f"{key}.bin", index, width).astype(np.int64)
+        result[key] = full
+    return result
+
+
+def test_export_re_expands(scenes, tmp_path):
+    fixed, plain = scenes
+    path = str(tmp_path / "instanced")
+    fixed.export_fixed(path, False)
+    assert all(
+        os.path.isdir(os.path.join(path, "bin", f"instance-{i}")) for i in range(3)
+    )
+    # The flat arrays only hold the vertices of the distinct sheet
+    assert os.path.getsize(os.path.join(path, "bin", "vert_dmap.bin")) == 4 * 36
+    result = read_export(path)
+    np.testing.assert_array_equal(result["dmap"], plain._vert[0])
+    np.testing.assert_allclose(result["vert"], plain._vert[1], atol=1e-6)
+    np.testing.assert_allclose(result["vel"], plain._vel, atol=1e-6)
+    for key in ["rod", "tri", "tet"]:
+        np.testing.assert_array_equal(result[key], getattr(plain, f"_{key}"))
+
+    path = str(tmp_path / "plain")
+    plain.export_fixed(path, False)
+    expect = read_export(path)
+    for key, value in result.items():
+        np.testing.assert_allclose(value, expect[key], atol=1e-6)
@@ -0,0 +1,76 @@
+# File: test_scene_pin.py
+# Author: Ryoichi Ando (ryoichi.ando@zozo.com)
+# License: Apache v2.0
+
+import numpy as np
+import pytest
+
+from frontend._asset_ import AssetManager
+from frontend._plot_ import PlotManager
+from frontend._scene_ import Scene
+
+
+def _save():
+    pass
+
+
+def make_scene() -> Scene:
+    xs = np.linspace(0, 1, 6)
+    x, y = np.meshgrid(xs, xs)
+    vert = np.stack([x.ravel(), y.ravel(), np.zeros(36)], axis=1)
+    idx = np.arange(36).reshape(6, 6)
+    a, b = idx[:-1, :-1].ravel(), idx[1:, :-1].ravel()
+    c, d = idx[:-1, 1:].ravel(), idx[1:, 1:].ravel()
+    tri = np.concatenate([np.stack([a, b, c], 1), np.stack([b, d, c], 1)])
+    asset = AssetManager()
+    asset.add.tri("sheet", vert, tri)
+    return Scene("test", PlotManager(), asset, _save)
+
+
+def _pinned(scene: Scene, name: str, t: float) -> np.ndarray:
+    fixed = scene.build()
+    obj = scene._object[name]
+    # Every object in these scenes has exactly one pin
+    pin = fixed._pin[list(scene._object).index(name)]
+    return fixed.time(t)[pin.index] - obj._at
+
+
+@pytest.mark.parametrize("dense", [False, True])
+def test_pin_targets_are_frozen_when_pinning(dense):
+    scene = make_scene()
+    obj = scene.add("sheet").at(1, 2, 3)
+    index = obj.grab([0, 1, 0])
+    rest = obj.vertex(False)[index]
+    delta = np.array([0.0, 1.0, 0.0])
+    pin = obj.pin(index)
+    if dense:
+        pin.move_to(rest + delta, 1.0)
+    else:
+        pin.move_by(delta, 1.0)
+    pin.scale(2.0, 2.0)
+
+    # Transforming the object afterwards moves its rest shape but not the pins
+    obj.rotate(30, "z").scale(1.5)
+    assert not np.allclose(obj.vertex(False)[index], rest)
+    np.testing.assert_allclose(_pinned(scene, "sheet", 0.0), rest, atol=1e-12)
+    np.testing.assert_allclose(_pinned(scene, "sheet", 1.0), rest + delta, atol=1e-12)
+    # Scaling applies to the rest positions, as it always has
+    mean = np.mean(rest, axis=0)
+    expected = 2.0 * (rest - mean) + mean
+    np.testing.assert_allclose(_pinned(scene, "sheet", 2.0), expected, atol=1e-12)
+
+
+def test_affine_pin_matches_dense_pin():
+    scene = make_scene()
+    affine = scene.add("sheet", "affine").rotate(45, "x")
+    dense = scene.add("sheet", "dense").rotate(45, "x")
+    index = affine.grab([1, 0, 0])
+    affine.pin(index).move_by([0.5, 0, 0], 1.0).move_by([0, 0.5, 0], 2.0)
+    rest = dense.vertex(False)[index]
+    dense.pin(index).move_to(rest + [0.5, 0, 0], 1.0).move_to(rest + [0.5, 0.5, 0], 2.0)
+    for obj in [affine, dense]:
+        obj.rotate(-20, "y")
+    for t in [0.0, 0.5, 1.0, 1.5, 2.0, 3.0]:
+        np.testing.assert_allclose(
+            _pinned(scene, "affine", t), _pinned(scene, "dense", t), atol=1e-12
+        )
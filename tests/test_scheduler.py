@@ -0,0 +1,107 @@
+# File: test_scheduler.py
+# Author: Ryoichi Ando (ryoichi.ando@zozo.com)
+# License: Apache v2.0
+
+import time
+
+from frontend._scheduler_ import CANCELLED, FAILED, FINISHED, RUNNING, Scheduler
+
+
+def test_scheduler_runs_concurrently_on_alternating_gpus(
+    session_factory, make_param, stub, stub_runs
+):
+    sessions = [session_factory(f"run-{i}") for i in range(4)]
+    scheduler = Scheduler(gpus=[0, 1], program=stub, poll=0.05)
+    jobs = [scheduler.submit(session, make_param()) for session in sessions]
+    assert scheduler.wait(60)
+
+    assert [job.status for job in jobs] == [FINISHED] * 4
+    assert [job.attempts for job in jobs] == [1] * 4
+    assert [job.returncode for job in jobs] == [0] * 4
+    intervals = []
+    for job, session in zip(jobs, sessions):
+        (run,) = stub_runs(session)
+        assert run["gpu"] == str(job.gpu)
+        assert not run["resume"]
+        intervals.append((run["start"], run["end"], job.gpu))
+        assert session.get.latest_frame() == 4
+    # The first two start together on different devices
+    assert {jobs[0].gpu, jobs[1].gpu} == {0, 1}
+    assert intervals[1][0] < intervals[0][1]
+    for i, (start, end, gpu) in enumerate(intervals):
+        overlap = [
+            other
+            for j, other in enumerate(intervals)
+            if j != i and other[0] < end and start < other[1]
+        ]
+        # Never more than one run per device and two at a time
+        assert len(overlap) <= 1
+        assert all(other[2] != gpu for other in overlap)
+
+    status = scheduler.status()
+    assert list(status["status"]) == [FINISHED] * 4
+    assert status["error"].isna().all()
+
+
+def test_scheduler_retries_from_checkpoint(
+    session_factory, make_param, stub, stub_runs
+):
+    retried = session_factory("retried", fail=1)
+    failed = session_factory("failed", fail=5)
+    scheduler = Scheduler(gpus=[], program=stub, retries=1, poll=0.05)
+    param = make_param(6, checkpoint_interval=2)
+    retried_job = scheduler.submit(retried, param)
+    failed_job = scheduler.submit(failed, param)
+    assert scheduler.wait(60)
+
+    assert retried_job.status == FINISHED
+    assert retried_job.attempts == 2
+    first, second = stub_runs(retried)
+    assert not first["resume"] and first["gpu"] is None
+    # Resumed after the checkpoint at frame 2, with initialize.out removed
+    assert second["resume"] and not second["initialized"]
+    assert retried.get.checkpoints() == [2, 4, 6]
+    assert retried.get.latest_frame() == 6
+
+    assert failed_job.status == FAILED
+    assert failed_job.attempts == 2
+    assert failed_job.returncode == 1
+    assert failed_job.error is None
+
+
+def test_scheduler_cancels_queued_and_running_jobs(
+    session_factory, make_param, stub, stub_runs
+):
+    sessions = [session_factory(name, delay=0.2) for name in ["a", "b", "c"]]
+    scheduler = Scheduler(max_jobs=1, gpus=[0, 1], program=stub, poll=0.05)
+    jobs = [scheduler.submit(session, make_param(20)) for session in sessions]
+    deadline = time.time() + 30
+    while jobs[0].status != RUNNING and time.time() < deadline:
+        time.sleep(0.05)
+    assert jobs[0].status == RUNNING
+
+    assert scheduler.cancel("b")
+    assert jobs[1].status == CANCELLED
+    assert scheduler.cancel(jobs[0])
+    assert jobs[0].wait(30)
+    assert jobs[0].status == CANCELLED
+    assert not scheduler.cancel(jobs[0])
+    assert scheduler.cancel(jobs[2])
+    assert scheduler.wait(30)
+
+    assert [job.status for job in jobs] == [CANCELLED] * 3
+    assert stub_runs(sessions[1]) == []
+    assert not sessions[0].is_running()
+
+
+def test_scheduler_reports_launch_errors(tmp_path, session_factory, make_param):
+    session = session_factory("missing")
+    scheduler = Scheduler(gpus=[], program=str(tmp_path / "missing"), poll=0.05)
+    job = scheduler.submit(session, make_param())
+    assert job.wait(30)
+
+    assert job.status == FAILED
+    assert job.attempts == 0
+    assert isinstance(job.error, ValueError)
+    status = scheduler.status()
+    assert status["error"][0] == "Solver does not exist"
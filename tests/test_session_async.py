@@ -0,0 +1,99 @@
+# File: test_session_async.py
+# Author: Ryoichi Ando (ryoichi.ando@zozo.com)
+# License: Apache v2.0
+
+import asyncio
+import os
+
+import pytest
+
+from frontend._scheduler_ import FINISHED, Scheduler
+
+
+def test_start_and_resume_async(session_factory, make_param, stub, stub_runs):
+    session = session_factory("async", fail=1, fail_at=3)
+    param = make_param(6, checkpoint_interval=2)
+
+    async def run():
+        await session.start_async(param, program=stub)
+        assert session.progress.latest("start") is not None
+        assert await session.wait(30)
+        assert not os.path.exists(os.path.join(session.output.path, "finished.txt"))
+        assert session.get.checkpoints() == [2]
+
+        await session.resume_async(program=stub)
+        assert await session.wait(30)
+
+    asyncio.run(run())
+    assert os.path.exists(os.path.join(session.output.path, "finished.txt"))
+    first, second = stub_runs(session)
+    assert not first["resume"]
+    assert second["resume"] and not second["initialized"]
+    assert session.get.latest_frame() == 6
+
+
+def test_start_async_reports_failure(session_factory, make_param, stub):
+    session = session_factory("broken", fail=1, fail_at=-1)
+    with pytest.raises(ValueError, match="before initializing"):
+        asyncio.run(session.start_async(make_param(2), program=stub))
+    with pytest.raises(ValueError, match="No checkpoint"):
+        asyncio.run(session.resume_async(program=stub))
+
+
+def test_wait_covers_queued_sessions(session_factory, make_param, stub):
+    first = session_factory("first", delay=0.1)
+    second = session_factory("second")
+    scheduler = Scheduler(max_jobs=1, gpus=[], program=stub, poll=0.05)
+    param = make_param(5)
+    scheduler.submit(first, param)
+    job = scheduler.submit(second, param)
+
+    assert not second.is_running()
+    assert not asyncio.run(second.wait(0.1, poll=0.05))
+    assert asyncio.run(second.wait(30, poll=0.05))
+    assert job.status == FINISHED
+    assert second.get.latest_frame() == 5
+    assert scheduler.wait(30)
+
+
+def test_aframes_and_atail_across_sessions(
+    session_factory, make_param, stub, stub_runs
+):
+    sessions = [session_factory(f"run-{i}", delay=0.2) for i in range(3)]
+    failing = session_factory("failing", delay=0.2, fail=1, fail_at=2)
+    param = make_param(6)
+
+    async def collect(iterator) -> list:
+        return [entry async for entry in iterator]
+
+    async def watch(session):
+        await session.start_async(param, program=stub)
+        return await asyncio.gather(
+            collect(session.get.aframes(follow=True)),
+            collect(session.get.log.atail("stdout")),
+            collect(session.get.log.atail("stderr")),
+        )
+
+    async def run():
+        return await asyncio.gather(*(watch(s) for s in sessions + [failing]))
+
+    *results, (frames, stdout, stderr) = asyncio.run(run())
+    for seen, out, err in results:
+        assert [n for n, _ in seen] == list(range(7))
+        assert all((vert == n).all() for n, vert in seen)
+        assert out == [f"frame {n}" for n in range(7)]
+        assert err == []
+    assert [n for n, _ in frames] == [0, 1, 2]
+    assert stdout == ["frame 0", "frame 1", "frame 2"]
+    assert stderr == ["stub failure at frame 2"]
+
+    # The runs were driven from one event loop at the same time
+    runs = [entry for session in sessions + [failing] for entry in stub_runs(session)]
+    assert max(entry["start"] for entry in runs) < min(entry["end"] for entry in runs)
+
+    log = sessions[0].get.log
+    tail = asyncio.run(collect(log.atail(n_lines=2, follow=False)))
+    assert tail == ["frame 5", "frame 6"]
+    assert asyncio.run(collect(log.atail(n_lines=0))) == []
+    with pytest.raises(ValueError, match="Unknown log"):
+        asyncio.run(collect(log.atail("other")))
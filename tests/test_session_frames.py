@@ -0,0 +1,156 @@
+# File: test_session_frames.py
+# Author: Ryoichi Ando (ryoichi.ando@zozo.com)
+# License: Apache v2.0
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import frontend._session_ as session_module
+
+FRAMES = 8
+
+
+@pytest.fixture
+def finished(session_factory, make_param, stub):
+    """A session whose stub solver has written all its frames."""
+    session = session_factory("finished", delay=0.0)
+
+    async def run():
+        await session.start_async(make_param(FRAMES), program=stub)
+        assert await session.wait(30)
+
+    asyncio.run(run())
+    assert session.get.latest_frame() == FRAMES
+    return session
+
+
+def check_frames(result: list, expect: list[int]):
+    assert [frame for frame, _ in result] == expect
+    for frame, vert in result:
+        # The stub solver fills frame N with the value N
+        assert (vert == frame).all()
+
+
+def test_frames_follow_running_solver(session_factory, make_param, stub):
+    session = session_factory("follow", delay=0.1)
+    asyncio.run(session.start_async(make_param(FRAMES), program=stub))
+    assert session.is_running()
+    assert session.get.latest_frame() < FRAMES
+    check_frames(list(session.get.frames(follow=True)), list(range(FRAMES + 1)))
+    assert asyncio.run(session.wait(30))
+
+
+def test_aframes_follow_running_solver(session_factory, make_param, stub):
+    session = session_factory("follow", delay=0.1)
+
+    async def run():
+        await session.start_async(make_param(FRAMES), program=stub)
+        assert session.is_running()
+        result = [entry async for entry in session.get.aframes(step=2, follow=True)]
+        check_frames(result, [0, 2, 4, 6, 8])
+
+    asyncio.run(run())
+
+
+def test_frames_bounds(finished):
+    get = finished.get
+    check_frames(list(get.frames()), list(range(FRAMES + 1)))
+    check_frames(list(get.frames(start=1, stop=7, step=2)), [1, 3, 5])
+    check_frames(list(get.frames(start=5, stop=100)), [5, 6, 7, 8])
+    check_frames(list(get.frames(start=3, step=4, follow=True)), [3, 7])
+    assert list(get.frames(start=20)) == []
+    with pytest.raises(ValueError, match="step"):
+        next(get.frames(step=0))
+
+    async def collect(**kwargs) -> list:
+        return [entry async for entry in get.aframes(**kwargs)]
+
+    check_frames(asyncio.run(collect(start=2, stop=6)), [2, 3, 4, 5])
+    check_frames(asyncio.run(collect(step=3, follow=True)), [0, 3, 6])
+    with pytest.raises(ValueError, match="step"):
+        asyncio.run(collect(step=-1))
+
+
+def test_frames_break_cancels_pending(finished, monkeypatch):
+    executors = []
+
+    class Executor(ThreadPoolExecutor):
+        # One worker, so that frames read ahead wait in the queue
+        def __init__(self, **kwargs):
+            super().__init__(max_workers=1)
+            self.futures = []
+            self.cancel_futures = None
+            executors.append(self)
+
+        def submit(self, fn, *args):
+            future = super().submit(fn, *args)
+            self.futures.append(future)
+            return future
+
+        def shutdown(self, wait=True, *, cancel_futures=False):
+            self.cancel_futures = cancel_futures
+            super().shutdown(wait, cancel_futures=cancel_futures)
+
+    release = threading.Event()
+    fetched = []
+    store = finished.get.store()
+    fetch = store.fetch
+
+    def slow_fetch(n: int):
+        fetched.append(n)
+        if n > 0:
+            release.wait(10)
+        return fetch(n)
+
+    monkeypatch.setattr(session_module, "ThreadPoolExecutor", Executor)
+    monkeypatch.setattr(store, "fetch", slow_fetch)
+    for frame, _ in finished.get.frames(prefetch=4):
+        break
+    assert frame == 0
+    (executor,) = executors
+    assert executor.cancel_futures
+    first, running, *queued = executor.futures
+    assert len(queued) == 2
+    assert all(future.cancelled() for future in queued)
+    release.set()
+    running.result(10)
+    assert fetched == [0, 1]
+
+
+def test_aframes_break_cancels_pending(finished, monkeypatch):
+    release = threading.Event()
+    store = finished.get.store()
+    fetch = store.fetch
+
+    def slow_fetch(n: int):
+        if n > 0:
+            release.wait(10)
+        return fetch(n)
+
+    tasks = []
+    ensure_future = asyncio.ensure_future
+
+    def record_future(awaitable):
+        task = ensure_future(awaitable)
+        tasks.append(task)
+        return task
+
+    monkeypatch.setattr(store, "fetch", slow_fetch)
+    monkeypatch.setattr(asyncio, "ensure_future", record_future)
+
+    async def run():
+        frames = finished.get.aframes(prefetch=4)
+        async for frame, _ in frames:
+            break
+        assert frame == 0
+        await frames.aclose()
+        await asyncio.sleep(0)
+        first, *pending = tasks
+        assert len(pending) == 3
+        assert all(task.cancelled() for task in pending)
+        release.set()
+
+    asyncio.run(run())
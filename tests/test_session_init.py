@@ -0,0 +1,32 @@
+# File: test_session_init.py
+# Author: Ryoichi Ando (ryoichi.ando@zozo.com)
+# License: Apache v2.0
+
+import os
+
+import numpy as np
+import pytest
+
+
+def test_init_starts_from_rest_by_default(session_factory):
+    session = session_factory()
+    assert not os.path.exists(os.path.join(session.info.path, "bin", "init_vert.bin"))
+
+
+def test_init_warm_starts_from_state(session_factory, fixed_scene):
+    session = session_factory(init=False)
+    vert = fixed_scene.vertex(False) + 1.0
+    session.init(fixed_scene, (vert, 7))
+    path = os.path.join(session.info.path, "bin", "init_vert.bin")
+    np.testing.assert_array_equal(np.fromfile(path, dtype=np.float32), vert.ravel())
+    assert not os.path.exists(os.path.join(session.info.path, "bin", "init_vel.bin"))
+
+
+def test_init_rejects_missing_state(session_factory, fixed_scene):
+    session = session_factory(init=False)
+    # What get.vertex() and get.checkpoint() return when there is nothing to read
+    with pytest.raises(ValueError, match="None"):
+        session.init(fixed_scene, None)
+    assert session._fixed is None
+    with pytest.raises(ValueError, match="shape"):
+        session.init(fixed_scene, np.zeros((4, 3)))
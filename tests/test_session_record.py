@@ -0,0 +1,116 @@
+# File: test_session_record.py
+# Author: Ryoichi Ando (ryoichi.ando@zozo.com)
+# License: Apache v2.0
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+from frontend._asset_ import AssetManager
+from frontend._plot_ import PlotManager
+from frontend._scene_ import Scene
+
+# Full snapshots every ten frames, recorded vertices every five
+SNAPSHOT, STRIDE = 10, 5
+RECORD = [0, 2, 4]
+
+
+def _save():
+    pass
+
+
+@pytest.fixture(params=[True, False], ids=["notify", "probe"])
+def notify(request, monkeypatch):
+    """Run with inotify, and with the stat and probe fallback."""
+    if not request.param:
+        monkeypatch.setattr(sys, "platform", "darwin")
+    return request.param
+
+
+def make_fixed(record: bool):
+    vert = np.array([[0.0, 0.0, 0.0], [1.0, 0.0, 0.0], [0.0, 1.0, 0.0]])
+    asset = AssetManager()
+    asset.add.tri("tri", vert, np.array([[0, 1, 2]]))
+    scene = Scene("test", PlotManager(), asset, _save)
+    first = scene.add("tri")
+    second = scene.add("tri").at(2, 0, 0)
+    if record:
+        first.record([0, 2])
+        second.record([1])
+    return scene.build()
+
+
+def vertex(frame: int, n_vert: int) -> np.ndarray:
+    return (frame + np.arange(3 * n_vert, dtype=np.float32)).reshape(-1, 3)
+
+
+def write(session, frame: int, record: bool = False):
+    n_vert = len(session._fixed.vertex(False))
+    vert = vertex(frame, n_vert)
+    name = "vert"
+    if record:
+        vert, name = vert[session.get.record_index()], "record"
+    path = os.path.join(session.info.path, "output", f"{name}_{frame}.bin")
+    vert.tofile(path)
+
+
+def write_strided(session, start: int, end: int):
+    for frame in range(start, end + 1, STRIDE):
+        write(session, frame, frame % SNAPSHOT != 0)
+
+
+def test_record_frames(session_factory, notify, tmp_path):
+    session = session_factory(fixed=make_fixed(True))
+    get = session.get
+    np.testing.assert_array_equal(get.record_index(), RECORD)
+    os.makedirs(os.path.join(session.info.path, "output"), exist_ok=True)
+    write_strided(session, 0, 5)
+    assert get.vertex_frames() == [0]
+    assert get.record_frames() == [0, 5]
+
+    # Appending keeps both indices current at the stride
+    write_strided(session, 10, 25)
+    assert get.vertex_frames() == [0, 10, 20]
+    assert get.record_frames() == [0, 5, 10, 15, 20, 25]
+    assert get.latest_frame() == 20
+    assert get.frame_index().exists(20)
+    assert not get.frame_index().exists(15)
+
+    # Strided frames hold the recorded vertices, snapshots all of them
+    n_vert = len(session._fixed.vertex(False))
+    for frame in get.record_frames():
+        expect = vertex(frame, n_vert)[RECORD]
+        np.testing.assert_array_equal(get.record(frame), expect)
+    assert get.record(7) is None
+    assert get.record(30) is None
+
+    path = session.export.record(str(tmp_path / "record.npz"))
+    data = np.load(path)
+    np.testing.assert_array_equal(data["frame"], [0, 5, 10, 15, 20, 25])
+    np.testing.assert_array_equal(data["index"], RECORD)
+    assert data["vert"].shape == (6, len(RECORD), 3)
+    np.testing.assert_array_equal(data["vert"][3], vertex(15, n_vert)[RECORD])
+
+    os.remove(os.path.join(session.info.path, "output", "vert_20.bin"))
+    assert get.vertex_frames() == [0, 10]
+    assert get.record_frames() == [0, 5, 10, 15, 25]
+
+
+def test_record_without_selection(session_factory, notify, tmp_path):
+    session = session_factory(fixed=make_fixed(False))
+    get = session.get
+    assert len(get.record_index()) == 0
+    os.makedirs(os.path.join(session.info.path, "output"), exist_ok=True)
+    # Without a selection every strided frame is a full frame
+    for frame in range(0, 16, STRIDE):
+        write(session, frame)
+    assert get.vertex_frames() == [0, 5, 10, 15]
+    assert get.record_frames() == [0, 5, 10, 15]
+    n_vert = len(session._fixed.vertex(False))
+    np.testing.assert_array_equal(get.record(10), vertex(10, n_vert))
+
+    data = np.load(session.export.record(str(tmp_path / "record.npz")))
+    np.testing.assert_array_equal(data["frame"], [0, 5, 10, 15])
+    assert data["vert"].shape == (4, n_vert, 3)
@@ -0,0 +1,44 @@
+# File: test_sweep.py
+# Author: Ryoichi Ando (ryoichi.ando@zozo.com)
+# License: Apache v2.0
+
+import os
+
+from frontend._scheduler_ import FINISHED, Scheduler
+
+
+def test_sweep_shares_and_removes_scene_export(
+    tmp_path, session_manager, fixed_scene, make_param, stub
+):
+    manager, fixed = session_manager, fixed_scene
+    scheduler = Scheduler(gpus=[], program=stub, poll=0.05)
+    param = make_param(2)
+    sweep = manager.sweep(fixed, param, {"friction": [0.1, 0.2]}, "sw", scheduler)
+    # A session named like the old export location does not collide with it
+    manager.create(fixed, "sw-scene")
+    assert sweep.wait(60)
+    assert [job.status for job in sweep.jobs] == [FINISHED] * 2
+
+    sweep_dir = tmp_path / "test" / ".sweep"
+    shared = str(sweep_dir / "sw")
+    assert os.path.isfile(os.path.join(shared, "info.toml"))
+    for session in sweep.sessions:
+        link = os.path.join(session.info.path, "info.toml")
+        assert os.path.islink(link) and os.readlink(link).startswith(shared)
+
+    manager.delete("sw-0")
+    assert os.path.isdir(shared)
+    manager.delete("sw-1")
+    assert not os.path.exists(sweep_dir)
+    assert os.path.isdir(manager.list()["sw-scene"].info.path)
+
+    # Sessions re-initialized on their own scene no longer hold the export
+    sweep = manager.sweep(fixed, param, {"friction": [0.1]}, "sw", scheduler)
+    assert sweep.wait(60)
+    sweep.sessions[0].init(fixed)
+    assert not os.path.exists(sweep_dir)
+
+    sweep = manager.sweep(fixed, param, {"friction": [0.1, 0.2]}, "other", scheduler)
+    assert sweep.wait(60)
+    manager.clear()
+    assert os.listdir(tmp_path / "test") == []
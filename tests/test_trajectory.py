@@ -0,0 +1,58 @@
+# File: test_trajectory.py
+# Author: Ryoichi Ando (ryoichi.ando@zozo.com)
+# License: Apache v2.0
+
+import os
+import pickle
+
+import numpy as np
+
+from frontend._frame_ import Trajectory
+
+# Written by the trajectory_layout test in src/writer.rs: four vertices, six
+# preallocated frames, and frames 0, 1 and 3 written at time 0.5 * frame
+FIXTURE = os.path.join(os.path.dirname(__file__), "data", "trajectory.bin")
+
+
+def sample_vertex(frame: int, n_vert: int) -> np.ndarray:
+    value = np.float32(frame) + np.float32(0.25) * np.arange(
+        3 * n_vert, dtype=np.float32
+    )
+    return value.reshape(n_vert, 3)
+
+
+def test_trajectory_reads_writer_layout():
+    assert Trajectory.HEADER.itemsize == 64
+    traj = Trajectory(FIXTURE)
+    assert traj.vert_count == 4
+    assert traj.capacity == 6
+    assert len(traj) == 4
+    assert traj.latest() == 3
+    assert traj.data.shape == (4, 4, 3)
+    np.testing.assert_array_equal(traj.time[[0, 1, 3]], [0.0, 0.5, 1.5])
+    assert np.isnan(traj.time[2])
+    for frame in [0, 1, 3]:
+        np.testing.assert_array_equal(traj.frame(frame), sample_vertex(frame, 4))
+    for frame in [2, 4, 5, -1]:
+        assert traj.frame(frame) is None
+
+
+def test_trajectory_follows_committed_count(tmp_path):
+    path = str(tmp_path / "trajectory.bin")
+    with open(FIXTURE, "rb") as f:
+        data = bytearray(f.read())
+    # Roll the count back as a resumed run does
+    data[32:40] = np.uint64(2).tobytes()
+    data[64 + 8 * 2 : 64 + 8 * 4] = np.full(2, np.nan).tobytes()
+    with open(path, "wb") as f:
+        f.write(data)
+    traj = Trajectory(path)
+    assert len(traj) == 2
+    assert traj.frame(3) is None
+    np.testing.assert_array_equal(traj.frame(1), sample_vertex(1, 4))
+
+    traj = pickle.loads(pickle.dumps(traj))
+    assert len(traj) == 2
+    assert not traj.stale()
+    os.remove(path)
+    assert traj.stale()